@@ -4,10 +4,13 @@ import time
 from typing import Any
 
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from backend.services.llm.groq_client import send_prompt
+from backend.services.chat.service import async_pipeline_enabled
+from backend.services.llm.fast_path import fast_path_stats
+from backend.services.llm.groq_client import asend_prompt, send_prompt
 from backend.services.auth.deps import get_current_user
 from database import get_db
 
@@ -21,7 +24,7 @@ class GenerateRequest(BaseModel):
 
 
 @router.post("/generate")
-def generate_response(
+async def generate_response(
     req: GenerateRequest,
     db: Session = Depends(get_db),
     _current_user=Depends(get_current_user),
@@ -33,12 +36,10 @@ def generate_response(
     """
     start = time.perf_counter()
     try:
-        result = send_prompt(
-            req.prompt,
-            db=db,
-            model=req.model,
-            use_rag=req.use_rag,
-        )
+        if async_pipeline_enabled():
+            result = await asend_prompt(req.prompt, db=db, model=req.model, use_rag=req.use_rag)
+        else:
+            result = await run_in_threadpool(send_prompt, req.prompt, db=db, model=req.model, use_rag=req.use_rag)
 
         timings = {}
         if isinstance(result, dict):
@@ -63,3 +64,8 @@ def generate_response(
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
 
+
+@router.get("/fast-path/stats")
+def fast_path_coverage() -> dict[str, Any]:
+    """Share of chat turns answered by the template fast path, and why the rest fell back to the LLM."""
+    return fast_path_stats()
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from typing import List
+import json
+from typing import Any, AsyncIterator, Dict, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
 from backend.schemas.chat import (
     ConversationCreateRequest,
@@ -14,11 +18,16 @@ from backend.schemas.chat import (
 )
 from backend.services.auth.deps import get_current_user
 from backend.services.chat.service import (
+    asend_message,
+    astream_message,
+    async_pipeline_enabled,
     create_conversation,
     list_conversations,
     list_messages,
     send_message,
+    stream_message,
 )
+from backend.services.chat.summary import refresh_conversation_summary
 from database import get_db
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -54,23 +63,77 @@ def conversation_messages(
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=SendMessageResponse)
-def post_message(
+async def post_message(
     conversation_id: int,
     req: SendMessageRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ) -> SendMessageResponse:
-    result = send_message(
-        db,
+    kwargs = dict(
         user_id=current_user.user_id,
         conversation_id=conversation_id,
         user_text=req.content,
         model=req.model,
         use_rag=req.use_rag,
     )
+    if async_pipeline_enabled():
+        result = await asend_message(db, **kwargs)
+    else:
+        result = await run_in_threadpool(send_message, db, **kwargs)
+    # Fold turns that left the history window into the rolling summary after the response is sent.
+    background_tasks.add_task(refresh_conversation_summary, conversation_id)
+    return _to_response(result)
+
+
+def _to_response(result: Dict[str, Any]) -> SendMessageResponse:
     return SendMessageResponse(
         conversation=ConversationPublic.model_validate(result["conversation"]),
         user_message=MessagePublic.model_validate(result["user_message"]),
         assistant_message=MessagePublic.model_validate(result["assistant_message"]),
+        model=result.get("model"),
+        use_rag=result.get("use_rag"),
+        timings=result.get("timings"),
+        context=result.get("context"),
+    )
+
+
+async def _sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for ev in events:
+        data = ev["data"]
+        if ev["event"] == "done":
+            data = _to_response(data).model_dump(mode="json")
+        yield f"event: {ev['event']}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/conversations/{conversation_id}/messages/stream")
+async def post_message_stream(
+    conversation_id: int,
+    req: SendMessageRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Same as POST /conversations/{id}/messages, but streams the reply as
+    Server-Sent Events: `token` events while the completion runs, then one
+    `done` event shaped like SendMessageResponse (or an `error` event).
+    """
+    kwargs = dict(
+        user_id=current_user.user_id,
+        conversation_id=conversation_id,
+        user_text=req.content,
+        model=req.model,
+        use_rag=req.use_rag,
+    )
+    if async_pipeline_enabled():
+        events = await astream_message(db, **kwargs)
+    else:
+        events = iterate_in_threadpool(await run_in_threadpool(stream_message, db, **kwargs))
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        # Stop proxies (nginx) from buffering the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(refresh_conversation_summary, conversation_id),
     )
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
@@ -9,13 +9,11 @@ from backend.schemas.devices import DeviceNameUpdateRequest
 from backend.services.auth.deps import get_current_user
 from backend.services.devices.service import (
     delete_managed_device,
-    get_device_name_map,
-    host_stable_id,
+    enrich_onos_devices_with_friendly_names,
     list_managed_devices,
     set_device_friendly_name,
-    sync_devices_from_onos,
-    sync_hosts_from_onos,
 )
+from backend.services.devices.sync_worker import topology_sync
 from database import get_db
 
 router = APIRouter(prefix="/devices", tags=["devices"])
@@ -29,17 +27,25 @@ def list_devices(db: Session = Depends(get_db)) -> Dict[str, Any]:
     Shape is intentionally close to ONOS: `{ devices: [...] }`, with each device
     getting an extra `friendly_name` field.
     """
-    onos_payload = sync_devices_from_onos(db)
-    devices: List[Dict[str, Any]] = (onos_payload or {}).get("devices", []) or []
+    # Read-only: the background topology sync keeps the DB and this view current.
+    devices: List[Dict[str, Any]] = topology_sync.current_devices()
+    enrich_onos_devices_with_friendly_names(db, devices)
+    # `stale`: the last sync pass failed, so this is the last good view (see /devices/sync-status).
+    return {"devices": devices, "stale": topology_sync.stale("devices")}
 
-    ids = [d.get("id") for d in devices if d.get("id")]
-    name_map = get_device_name_map(db, ids)
 
-    for d in devices:
-        did = d.get("id")
-        d["friendly_name"] = name_map.get(did) if did else None
+@router.post("/refresh")
+def refresh_topology(_current_user=Depends(get_current_user)) -> Dict[str, Any]:
+    """
+    Force one ONOS -> DB sync pass now (bypassing the ONOS snapshot cache) and
+    return the sync status.
+    """
+    return topology_sync.refresh_now(force=True)
 
-    return {"devices": devices}
+
+@router.get("/sync-status")
+def sync_status() -> Dict[str, Any]:
+    return topology_sync.status()
 
 
 @router.put("/{device_id}/name", status_code=status.HTTP_204_NO_CONTENT)
@@ -49,42 +55,34 @@ def update_device_name(
     db: Session = Depends(get_db),
     _current_user=Depends(get_current_user),
 ) -> Response:
-    # Optional: keep DB in sync with ONOS devices list (best-effort)
-    try:
-        sync_devices_from_onos(db)
-    except Exception:
-        # If ONOS is down, we still allow writing a name for a known device_id.
-        pass
-
     name = req.name.strip() if isinstance(req.name, str) else None
     set_device_friendly_name(db, device_id, name)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+def _is_live(device_id: str, live: Optional[Set[str]]) -> Optional[bool]:
+    return None if live is None else device_id in live
+
+
 @router.get("/managed")
 def managed_devices(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Returns rows from the DB `devices` table, plus whether each row is currently
-    present in ONOS (active).
+    present in ONOS (active). `active` is null when that is unknown: ONOS is
+    unreachable, or the last sync pass failed and the view is stale.
 
     This is meant for the Devices management page.
     """
-    # Refresh live ONOS devices/hosts (best-effort; if ONOS is down, we still return DB rows)
-    live_ids: set[str] = set()
-    live_host_ids: set[str] = set()
+    # Live ONOS ids come from the background sync view (best-effort; if ONOS is down, we still return DB rows)
     try:
-        onos_payload = sync_devices_from_onos(db)
-        live = (onos_payload or {}).get("devices", []) or []
-        live_ids = {d.get("id") for d in live if d.get("id")}
+        live_ids = topology_sync.live_device_ids()
     except Exception:
-        live_ids = set()
+        live_ids = None
 
     try:
-        host_payload = sync_hosts_from_onos(db)
-        live_hosts = (host_payload or {}).get("hosts", []) or []
-        live_host_ids = {host_stable_id(h) for h in live_hosts if host_stable_id(h)}
+        live_host_ids = topology_sync.live_host_ids()
     except Exception:
-        live_host_ids = set()
+        live_host_ids = None
 
     rows = list_managed_devices(db)
     out = []
@@ -94,7 +92,7 @@ def managed_devices(db: Session = Depends(get_db)) -> Dict[str, Any]:
                 "device_id": r.device_id,
                 "name": r.name,
                 "type": r.type,
-                "active": (r.device_id in live_host_ids) if r.type == "host" else (r.device_id in live_ids),
+                "active": _is_live(r.device_id, live_host_ids if r.type == "host" else live_ids),
             }
         )
     return {"devices": out}
@@ -5,7 +5,8 @@ from typing import Any, Dict, List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from backend.services.devices.service import get_device_name_map, host_stable_id, sync_hosts_from_onos
+from backend.services.devices.service import enrich_onos_hosts_with_friendly_names
+from backend.services.devices.sync_worker import topology_sync
 from database import get_db
 
 router = APIRouter(prefix="/hosts", tags=["hosts"])
@@ -19,18 +20,10 @@ def list_hosts(db: Session = Depends(get_db)) -> Dict[str, Any]:
     We store host-friendly names in the existing `devices` table by saving host
     rows with `type='host'` and `device_id=host:<ip>` (stable across topology resets).
     """
-    onos_payload = sync_hosts_from_onos(db)
-    hosts: List[Dict[str, Any]] = (onos_payload or {}).get("hosts", []) or []
-
-    stable_ids = [host_stable_id(h) for h in hosts]
-    ids = [sid for sid in stable_ids if sid]
-    name_map = get_device_name_map(db, ids)
-
-    for h in hosts:
-        sid = host_stable_id(h)
-        h["friendly_name"] = name_map.get(sid) if sid else None
-        # Helpful for debugging / UI operations (optional).
-        h["managed_id"] = sid
-
-    return {"hosts": hosts}
+    # Read-only: the background topology sync keeps the DB and this view current.
+    hosts: List[Dict[str, Any]] = topology_sync.current_hosts()
+    # Adds `friendly_name` and `managed_id` (helpful for debugging / UI operations).
+    enrich_onos_hosts_with_friendly_names(db, hosts)
+    # `stale`: the last sync pass failed, so this is the last good view (see /devices/sync-status).
+    return {"hosts": hosts, "stale": topology_sync.stale("hosts")}
 
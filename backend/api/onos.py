@@ -6,6 +6,7 @@ from fastapi import APIRouter, Body, Depends, HTTPException
 
 from backend.services.onos.onos_client import (
     delete_intent,
+    get_cache_stats,
     get_network_devices,
     get_network_flows,
     get_network_hosts,
@@ -30,6 +31,12 @@ def network_snapshot() -> dict[str, Any]:
     return get_network_info()
 
 
+@router.get("/cache/stats")
+def cache_stats() -> dict[str, Any]:
+    """Hit ratio and staleness (age_seconds) of the in-process ONOS snapshot cache."""
+    return get_cache_stats()
+
+
 @router.get("/devices")
 def devices() -> dict[str, Any]:
     return get_network_devices()
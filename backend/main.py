@@ -1,8 +1,14 @@
 # help to avoid import/type errors
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from backend.api.auth import router as auth_router
 from backend.api.chat import router as chat_router
@@ -13,11 +19,71 @@ from backend.api.hosts import router as hosts_router
 from backend.api.onos import router as onos_router
 from backend.api.tests import router as tests_router
 from backend.api.docs_assets import router as docs_assets_router
+from backend.services.devices.sync_worker import sync_enabled, topology_sync
+from backend.services.llm.groq_client import DEFAULT_MODEL
+from backend.services.llm.tokens import load_tokenizer
+from backend.services.onos.transport import close_session as close_onos_session
+from database.rag.embedded_server import embedding_status, is_ready as embedding_ready, warmup as warmup_embeddings
+from database.rag.memory_index import memory_backend_enabled, memory_index
 import os
 
 
+def _embedding_warmup_mode() -> str:
+    # background (default): serve immediately, load the model in a thread; /ready turns 200 when done.
+    # blocking: finish loading before accepting requests. off: load on the first RAG request.
+    mode = os.getenv("EMBEDDING_WARMUP", "background").strip().lower()
+    return mode if mode in ("background", "blocking", "off") else "background"
+
+
+def _warmup_in_background() -> None:
+    try:
+        warmup_embeddings()
+    except Exception as exc:
+        print(f"Embedding warmup failed: {exc}")
+
+
+def _load_chat_tokenizer() -> None:
+    # Fetch the chat tokenizer now rather than on the first turn; turns estimate
+    # token counts until it is loaded (load_tokenizer never raises).
+    print(f"Chat tokenizer: {load_tokenizer(DEFAULT_MODEL)}")
+
+
+def _load_memory_index() -> None:
+    # Through ensure_loaded so RAG requests arriving meanwhile use pgvector instead of loading again;
+    # a failure is reported by the index itself.
+    if memory_index.ensure_loaded():
+        stats = memory_index.stats()
+        print(f"RAG memory index: {stats['rows']} rows from {stats['loaded_from']} in {stats['load_seconds']:.3f}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    t_start = time.perf_counter()
+    # Keep the devices table + in-memory topology view current in the background,
+    # so request handlers only read.
+    if sync_enabled():
+        topology_sync.start()
+
+    mode = _embedding_warmup_mode()
+    if mode == "blocking":
+        await asyncio.to_thread(warmup_embeddings)
+    elif mode == "background":
+        threading.Thread(target=_warmup_in_background, name="embedding-warmup", daemon=True).start()
+    threading.Thread(target=_load_chat_tokenizer, name="chat-tokenizer", daemon=True).start()
+    if memory_backend_enabled():
+        threading.Thread(target=_load_memory_index, name="rag-memory-index", daemon=True).start()
+    app.state.startup_seconds = time.perf_counter() - t_start
+    print(f"Startup finished in {app.state.startup_seconds:.3f}s (embedding warmup: {mode})")
+    yield
+    topology_sync.stop()
+    # Persist API creates/deletes so the next start maps the snapshot as-is.
+    memory_index.save_if_dirty()
+    # Release pooled keep-alive connections to ONOS.
+    close_onos_session()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="FYP Backend API")
+    app = FastAPI(title="FYP Backend API", lifespan=lifespan)
 
     origins_env = os.getenv("FRONTEND_ORIGINS")
     allow_origins = ["*"] if not origins_env else [o.strip() for o in origins_env.split(",") if o.strip()]
@@ -59,6 +125,19 @@ def create_app() -> FastAPI:
     def root() -> dict[str, str]:
         return {"message": "FYP Backend is running"}
 
+    @app.get("/ready")
+    def ready() -> JSONResponse:
+        """Readiness probe: 503 until the embedding model is loaded and warmed up (unless warmup is off)."""
+        ok = embedding_ready() or _embedding_warmup_mode() == "off"
+        body = {
+            "ready": ok,
+            "startup_seconds": getattr(app.state, "startup_seconds", None),
+            "embedding": embedding_status(),
+        }
+        if memory_backend_enabled():
+            body["rag_memory_index"] = memory_index.stats()
+        return JSONResponse(body, status_code=200 if ok else 503)
+
     return app
 
 
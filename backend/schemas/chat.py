@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any, Dict
 
 from pydantic import BaseModel, Field
 from pydantic.config import ConfigDict
@@ -39,4 +40,10 @@ class SendMessageResponse(BaseModel):
     conversation: ConversationPublic
     user_message: MessagePublic
     assistant_message: MessagePublic
+    model: str | None = None
+    use_rag: bool | None = None
+    # Stage timings in seconds (rag/network/prompt build, llm_ttft_seconds, llm_seconds, ...).
+    timings: Dict[str, Any] | None = None
+    # How the context window was packed (prompt_tokens, history_messages, history_dropped, ...).
+    context: Dict[str, Any] | None = None
 
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
 
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from backend.services.chat.summary import history_turns, summary_enabled
 from backend.services.llm.chat_history import system_prompt
-from backend.services.llm.groq_client import DEFAULT_MODEL, get_samples_json
-from backend.services.onos.onos_client import get_network_info
-from backend.services.devices.service import enrich_onos_devices_with_friendly_names, enrich_onos_hosts_with_friendly_names, sync_devices_from_onos, sync_hosts_from_onos
+from backend.services.llm.groq_client import DEFAULT_MODEL, get_async_client
+from backend.services.llm.fast_path import FastPathResult, fast_path_enabled, fast_path_timings, try_fast_path
+from backend.services.llm.grounding import AsyncGroundingRun, GroundingRun
+from backend.services.llm.response_cache import cache_timings, grounding_meta, lookup_reply, store_reply
+from backend.services.llm.tokens import count_message_tokens, tokenizer_name
+from backend.services.llm.topology_digest import network_context
 from database.models import Conversation, Message
 
 
@@ -20,8 +25,8 @@ def _now() -> datetime:
 
 
 def _context_limit_tokens() -> int:
-    # Rough budget; keep under model limit by default.
-    # You can tune this per model later.
+    # Token budget per request (system + summary + history window + grounded prompt).
+    # Keep under the model limit; you can tune this per model later.
     raw = os.getenv("CHAT_CONTEXT_BUDGET_TOKENS", "6000")
     try:
         return int(raw)
@@ -29,10 +34,31 @@ def _context_limit_tokens() -> int:
         return 6000
 
 
-def _estimate_tokens(text: str) -> int:
-    # Very rough heuristic: ~4 chars per token in English.
-    # Good enough to warn/hard-stop for long chats.
-    return max(1, int(len(text) / 4))
+def _max_concurrency() -> int:
+    raw = os.getenv("CHAT_MAX_CONCURRENCY", "16")
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return 16
+
+
+def async_pipeline_enabled() -> bool:
+    # CHAT_ASYNC_PIPELINE=0 routes chat through the old blocking path (for A/B load tests).
+    return os.getenv("CHAT_ASYNC_PIPELINE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+_llm_slots: asyncio.Semaphore | None = None
+
+
+def _get_llm_slots() -> asyncio.Semaphore:
+    """
+    Caps in-flight LLM completions per worker (CHAT_MAX_CONCURRENCY) on the
+    async path, independently of the threadpool size.
+    """
+    global _llm_slots
+    if _llm_slots is None:
+        _llm_slots = asyncio.Semaphore(_max_concurrency())
+    return _llm_slots
 
 
 def list_conversations(db: Session, *, user_id: int) -> List[Conversation]:
@@ -74,51 +100,25 @@ def list_messages(db: Session, *, user_id: int, conversation_id: int, limit: int
     )
 
 
-def _build_grounded_user_prompt(db: Session, user_text: str, *, use_rag: bool) -> Tuple[str, Dict[str, float]]:
-    timings: Dict[str, float] = {}
-    t_start = time.perf_counter()
-
-    if use_rag:
-        t_rag = time.perf_counter()
-        samples = get_samples_json(user_text, top_k=3)
-        timings["rag_seconds"] = time.perf_counter() - t_rag
-    else:
-        samples = {"summary": [], "raw_samples": [], "note": "RAG disabled by request.", "timings": {}}
-
-    t_net = time.perf_counter()
-    # Refresh devices/hosts in DB so friendly-name enrichment uses latest ONOS ids (MAC can change after resets).
-    try:
-        sync_devices_from_onos(db)
-    except Exception:
-        pass
-    try:
-        sync_hosts_from_onos(db)
-    except Exception:
-        pass
-
-    network_info = get_network_info()
-    # Enrich with DB friendly names for grounding (LLM can map "h1" -> current host.id (MAC-based)).
-    devices = (network_info or {}).get("devices") or []
-    hosts = (network_info or {}).get("hosts") or []
-    if isinstance(devices, dict):
-        devices = devices.get("devices") or []
-    if isinstance(hosts, dict):
-        hosts = hosts.get("hosts") or []
-    if isinstance(devices, list):
-        enrich_onos_devices_with_friendly_names(db, devices)
-    if isinstance(hosts, list):
-        enrich_onos_hosts_with_friendly_names(db, hosts)
-    timings["network_fetch_seconds"] = time.perf_counter() - t_net
-
+def _format_grounded_prompt(
+    user_text: str,
+    samples: Dict[str, Any],
+    network_info: Dict[str, Any],
+    *,
+    use_rag: bool,
+) -> Tuple[str, str]:
+    """Return the grounded prompt and its response-cache metadata (see `grounding_meta`)."""
     samples_summary = samples.get("summary", [])
     samples_raw = samples.get("raw_samples", [])
     samples_note = str(samples.get("note", "Use these samples as guidance."))
-    rag_timings = samples.get("timings") or {}
+    network_text = network_context(network_info, user_text)
+    if network_text is None:
+        network_text = f"{network_info}"
 
     # Put grounding only on the *current* user message.
-    grounded = (
+    prompt = (
         "Here are the current network state:\n"
-        f"{network_info}\n\n"
+        f"{network_text}\n\n"
         f"Here are similar intents and configs retrieved from the library ({'enabled' if use_rag else 'disabled'}):\n"
         f"Summary:\n{samples_summary}\n"
         f"Raw samples:\n{samples_raw}\n"
@@ -126,36 +126,143 @@ def _build_grounded_user_prompt(db: Session, user_text: str, *, use_rag: bool) -
         "Now process this user request and output ONOS Intent config JSON:\n"
         f"{user_text}\n"
     )
+    return prompt, grounding_meta(user_text, samples, network_info, network_text)
+
+
+def _build_grounded_user_prompt(
+    db: Session, run: GroundingRun, user_text: str, *, use_rag: bool
+) -> Tuple[str, Dict[str, float], Dict[str, Any]]:
+    # Friendly names are keyed by stable ids (host:<ip>), so enrichment maps "h1" -> the current MAC-based host.id.
+    samples, network_info, timings = run.finish(db)
+    grounded, cache_meta = _format_grounded_prompt(user_text, samples, network_info, use_rag=use_rag)
+    timings["prompt_build_seconds"] = time.perf_counter() - run.t_start
+    return grounded, timings, cache_meta
 
-    timings["prompt_build_seconds"] = time.perf_counter() - t_start
-    return grounded, {**rag_timings, **timings}
 
+async def _abuild_grounded_user_prompt(
+    db: Session, run: AsyncGroundingRun, user_text: str, *, use_rag: bool
+) -> Tuple[str, Dict[str, float], Dict[str, Any]]:
+    samples, network_info, timings = await run.finish(db)
+    grounded, cache_meta = _format_grounded_prompt(user_text, samples, network_info, use_rag=use_rag)
+    timings["prompt_build_seconds"] = time.perf_counter() - run.t_start
+    return grounded, timings, cache_meta
 
-def _check_context_budget(history: List[Message], current_grounded_prompt: str) -> None:
-    # Estimate budget using system prompt + all history + current grounded prompt.
-    total_tokens = _estimate_tokens(system_prompt) + _estimate_tokens(current_grounded_prompt)
-    for m in history:
-        total_tokens += _estimate_tokens(m.content)
 
-    if total_tokens > _context_limit_tokens():
+def _role(m: Message) -> str:
+    return m.role if m.role in ("user", "assistant", "system") else "user"
+
+
+def _pack_context(
+    history: List[Message],
+    current_grounded_prompt: str,
+    *,
+    model: str,
+    summary: str | None = None,
+) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """
+    Build the Groq messages for one turn within CHAT_CONTEXT_BUDGET_TOKENS.
+
+    The system prompt and the current grounded prompt are always sent, plus the
+    conversation's rolling `summary` (covering turns before `history`) if it
+    fits. Recent history is then added newest-first while it fits (sliding
+    window). Only a grounded prompt that alone exceeds the budget is rejected.
+    """
+    budget = _context_limit_tokens()
+    system_msg = {"role": "system", "content": system_prompt}
+    current_msg = {"role": "user", "content": current_grounded_prompt}
+    fixed_tokens = count_message_tokens(system_msg, model) + count_message_tokens(current_msg, model)
+    if fixed_tokens > budget:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="Conversation context too long. Please start a new chat.",
+            detail="Message and network context exceed the context budget. Please shorten the request.",
         )
 
+    history_msgs = [{"role": _role(m), "content": m.content} for m in history]
+    costs = [count_message_tokens(m, model) for m in history_msgs]
+
+    available = budget - fixed_tokens
+    summary_msg: Dict[str, str] | None = None
+    summary_tokens = 0
+    if summary:
+        summary_msg = {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+        summary_tokens = count_message_tokens(summary_msg, model)
+        if summary_tokens <= available:
+            available -= summary_tokens
+        else:
+            summary_msg, summary_tokens = None, 0
+
+    start = len(history_msgs)
+    used = 0
+    while start > 0 and used + costs[start - 1] <= available:
+        start -= 1
+        used += costs[start]
+    # Don't open the window on a dangling assistant reply.
+    while start < len(history_msgs) and history_msgs[start]["role"] == "assistant":
+        used -= costs[start]
+        start += 1
+
+    kept = history_msgs[start:]
+    messages = [system_msg] + ([summary_msg] if summary_msg else []) + kept + [current_msg]
+    stats = {
+        "budget_tokens": budget,
+        "prompt_tokens": fixed_tokens + summary_tokens + used,
+        "history_messages": len(kept),
+        "history_dropped": start,
+        "summary_used": summary_msg is not None,
+        "tokenizer": tokenizer_name(model),
+    }
+    return messages, stats
 
-def _to_groq_messages(history: List[Message], current_grounded_prompt: str) -> List[Dict[str, str]]:
-    msgs: List[Dict[str, str]] = [{"role": "system", "content": system_prompt}]
-    for m in history:
-        role = m.role
-        if role not in ("user", "assistant", "system"):
-            role = "user"
-        msgs.append({"role": role, "content": m.content})
-    msgs.append({"role": "user", "content": current_grounded_prompt})
-    return msgs
 
+def _groq_client():
+    from groq import Groq  # local import to keep module import light
 
-def send_message(
+    groq_key = os.getenv("GROQ_API_KEY")
+    if not groq_key:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY is not set in environment")
+    return Groq(api_key=groq_key)
+
+
+def _load_history(db: Session, *, user_id: int, conversation_id: int) -> Tuple[Conversation, List[Message]]:
+    convo = get_conversation(db, user_id=user_id, conversation_id=conversation_id)
+    if convo is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+
+    # Load existing messages in this conversation (user-visible only).
+    query = db.query(Message).filter(Message.conversation_id == conversation_id)
+    if not summary_enabled():
+        return convo, query.order_by(Message.message_id.asc()).all()
+
+    # Older turns live in convo.summary; only the last N turns are replayed verbatim.
+    if convo.summary_message_id is not None:
+        query = query.filter(Message.message_id > convo.summary_message_id)
+    recent = query.order_by(Message.message_id.desc()).limit(history_turns() * 2).all()
+    return convo, recent[::-1]
+
+
+def _run_fast_path(user_text: str, network_info: Dict[str, Any]) -> Tuple[FastPathResult, Dict[str, float]]:
+    t_start = time.perf_counter()
+    fast = try_fast_path(user_text, network_info)
+    return fast, {"fast_path_seconds": time.perf_counter() - t_start, **fast_path_timings(fast)}
+
+
+def _fast_path_turn(
+    convo: Conversation, model: str, fast: FastPathResult, fast_timings: Dict[str, float], net_seconds: float
+) -> Dict[str, Any]:
+    # No grounding prompt, no context window, no LLM call: the template reply is final.
+    # The RAG branch that ran alongside the snapshot fetch is dropped by the caller.
+    return {
+        "convo": convo,
+        "model": model,
+        "messages": [],
+        "timings": {"network_fetch_seconds": net_seconds, **fast_timings},
+        "context": None,
+        "ready_reply": fast.reply,
+        "cache_ticket": None,
+    }
+
+
+def _prepare_turn(
     db: Session,
     *,
     user_id: int,
@@ -164,37 +271,99 @@ def send_message(
     model: str | None,
     use_rag: bool,
 ) -> Dict[str, Any]:
-    from groq import Groq  # local import to keep module import light
+    """
+    Everything before the LLM call: load history, try the template fast path,
+    ground the prompt, pack the context window.
+    """
+    convo, history = _load_history(db, user_id=user_id, conversation_id=conversation_id)
+    selected_model = model or DEFAULT_MODEL
 
-    convo = get_conversation(db, user_id=user_id, conversation_id=conversation_id)
-    if convo is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    # RAG starts now, concurrently with the snapshot fetch the fast path needs anyway.
+    run = GroundingRun(user_text, use_rag=use_rag)
+    fast_timings: Dict[str, float] = {}
+    if fast_path_enabled():
+        fast, fast_timings = _run_fast_path(user_text, run.fetch_network(db))
+        if fast.hit:
+            run.abandon()
+            return _fast_path_turn(convo, selected_model, fast, fast_timings, run.net_seconds)
+
+    grounded_prompt, grounding_timings, cache_meta = _build_grounded_user_prompt(db, run, user_text, use_rag=use_rag)
+    grounding_timings.update(fast_timings)
+    summary = convo.summary if summary_enabled() else None
+    messages, context = _pack_context(history, grounded_prompt, model=selected_model, summary=summary)
+    ready_reply, cache_ticket = lookup_reply(user_text, model=selected_model, use_rag=use_rag, meta=cache_meta)
 
-    # Load existing messages in this conversation (user-visible only).
-    history = (
-        db.query(Message)
-        .filter(Message.conversation_id == conversation_id)
-        .order_by(Message.message_id.asc())
-        .all()
-    )
+    return {
+        "convo": convo,
+        "model": selected_model,
+        "messages": messages,
+        "timings": grounding_timings,
+        "context": context,
+        "ready_reply": ready_reply,
+        "cache_ticket": cache_ticket,
+    }
 
-    grounded_prompt, grounding_timings = _build_grounded_user_prompt(db, user_text, use_rag=use_rag)
-    _check_context_budget(history, grounded_prompt)
 
+async def _aprepare_turn(
+    db: Session,
+    *,
+    user_id: int,
+    conversation_id: int,
+    user_text: str,
+    model: str | None,
+    use_rag: bool,
+) -> Dict[str, Any]:
+    """Async `_prepare_turn`; DB work runs in a worker thread, never on the event loop."""
+    convo, history = await asyncio.to_thread(
+        _load_history, db, user_id=user_id, conversation_id=conversation_id
+    )
     selected_model = model or DEFAULT_MODEL
-    messages_for_llm = _to_groq_messages(history, grounded_prompt)
 
-    groq_key = os.getenv("GROQ_API_KEY")
-    if not groq_key:
-        raise HTTPException(status_code=500, detail="GROQ_API_KEY is not set in environment")
+    run = AsyncGroundingRun(user_text, use_rag=use_rag)
+    fast_timings: Dict[str, float] = {}
+    if fast_path_enabled():
+        fast, fast_timings = _run_fast_path(user_text, await run.fetch_network(db))
+        if fast.hit:
+            run.abandon()
+            return _fast_path_turn(convo, selected_model, fast, fast_timings, run.net_seconds)
+
+    grounded_prompt, grounding_timings, cache_meta = await _abuild_grounded_user_prompt(
+        db, run, user_text, use_rag=use_rag
+    )
+    grounding_timings.update(fast_timings)
+    summary = convo.summary if summary_enabled() else None
+    # Token counting runs the HF tokenizer (CPU-bound), so keep it off the event loop.
+    messages, context = await asyncio.to_thread(
+        _pack_context, history, grounded_prompt, model=selected_model, summary=summary
+    )
+    ready_reply, cache_ticket = lookup_reply(user_text, model=selected_model, use_rag=use_rag, meta=cache_meta)
+
+    return {
+        "convo": convo,
+        "model": selected_model,
+        "messages": messages,
+        "timings": grounding_timings,
+        "context": context,
+        "ready_reply": ready_reply,
+        "cache_ticket": cache_ticket,
+    }
 
-    t_llm = time.perf_counter()
-    client = Groq(api_key=groq_key)
-    chat_completion = client.chat.completions.create(messages=messages_for_llm, model=selected_model)
-    llm_seconds = time.perf_counter() - t_llm
 
-    reply = chat_completion.choices[0].message.content
+def _async_groq_client():
+    try:
+        return get_async_client()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
 
+
+def _persist_turn(
+    db: Session,
+    *,
+    convo: Conversation,
+    conversation_id: int,
+    user_text: str,
+    reply: str,
+) -> Tuple[Message, Message]:
     now = _now()
     # Create user-visible rows (raw user text + assistant reply).
     user_msg = Message(conversation_id=conversation_id, role="user", content=user_text, created_at=now)
@@ -211,23 +380,293 @@ def send_message(
     db.refresh(convo)
     db.refresh(user_msg)
     db.refresh(assistant_msg)
+    return user_msg, assistant_msg
 
-    timings = {**grounding_timings, "llm_seconds": llm_seconds}
+
+def send_message(
+    db: Session,
+    *,
+    user_id: int,
+    conversation_id: int,
+    user_text: str,
+    model: str | None,
+    use_rag: bool,
+) -> Dict[str, Any]:
+    turn = _prepare_turn(
+        db,
+        user_id=user_id,
+        conversation_id=conversation_id,
+        user_text=user_text,
+        model=model,
+        use_rag=use_rag,
+    )
+    reply = turn["ready_reply"]
+
+    t_llm = time.perf_counter()
+    if reply is None:
+        # Only the LLM branch needs a client: cached and fast-path replies work without GROQ_API_KEY.
+        client = _groq_client()
+        chat_completion = client.chat.completions.create(messages=turn["messages"], model=turn["model"])
+        reply = chat_completion.choices[0].message.content
+        store_reply(turn["cache_ticket"], reply)
+    llm_seconds = time.perf_counter() - t_llm
+
+    user_msg, assistant_msg = _persist_turn(
+        db, convo=turn["convo"], conversation_id=conversation_id, user_text=user_text, reply=reply
+    )
+
+    # Without streaming the first token reaches the user with the last one.
+    timings = {
+        **turn["timings"],
+        "llm_ttft_seconds": llm_seconds,
+        "llm_seconds": llm_seconds,
+        **cache_timings(turn["cache_ticket"]),
+    }
     return {
-        "conversation": convo,
+        "conversation": turn["convo"],
         "user_message": user_msg,
         "assistant_message": assistant_msg,
-        "model": selected_model,
+        "model": turn["model"],
         "use_rag": use_rag,
         "timings": timings,
+        "context": turn["context"],
     }
 
 
+def stream_message(
+    db: Session,
+    *,
+    user_id: int,
+    conversation_id: int,
+    user_text: str,
+    model: str | None,
+    use_rag: bool,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of `send_message`.
+
+    Grounding and validation run eagerly, so 404/413/500 surface as normal HTTP
+    errors before any bytes are sent. The returned iterator then yields
+    `{"event": "token", "data": {"content": ...}}` per completion delta and ends
+    with one `done` event carrying the persisted messages and timings
+    (including `llm_ttft_seconds`), or an `error` event if the completion fails.
+    Nothing is persisted if the stream fails or the client disconnects.
+    """
+    turn = _prepare_turn(
+        db,
+        user_id=user_id,
+        conversation_id=conversation_id,
+        user_text=user_text,
+        model=model,
+        use_rag=use_rag,
+    )
+    ready = turn["ready_reply"]
+    # Created before the first byte so a missing GROQ_API_KEY is still a plain 500; not needed for ready replies.
+    client = _groq_client() if ready is None else None
+
+    def events() -> Iterator[Dict[str, Any]]:
+        parts: List[str] = []
+        ttft: float | None = None
+        llm_seconds = 0.0
+        if ready is not None:
+            # A cached or fast-path reply goes out as a single token event.
+            parts.append(ready)
+            yield {"event": "token", "data": {"content": ready}}
+        else:
+            t_llm = time.perf_counter()
+            try:
+                stream = client.chat.completions.create(messages=turn["messages"], model=turn["model"], stream=True)
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    if ttft is None:
+                        ttft = time.perf_counter() - t_llm
+                    parts.append(delta)
+                    yield {"event": "token", "data": {"content": delta}}
+            except Exception as exc:
+                yield {"event": "error", "data": {"detail": str(exc)}}
+                return
+            llm_seconds = time.perf_counter() - t_llm
+            store_reply(turn["cache_ticket"], "".join(parts))
+
+        user_msg, assistant_msg = _persist_turn(
+            db, convo=turn["convo"], conversation_id=conversation_id, user_text=user_text, reply="".join(parts)
+        )
+        timings = {
+            **turn["timings"],
+            "llm_ttft_seconds": ttft if ttft is not None else llm_seconds,
+            "llm_seconds": llm_seconds,
+            **cache_timings(turn["cache_ticket"]),
+        }
+        yield {
+            "event": "done",
+            "data": {
+                "conversation": turn["convo"],
+                "user_message": user_msg,
+                "assistant_message": assistant_msg,
+                "model": turn["model"],
+                "use_rag": use_rag,
+                "timings": timings,
+                "context": turn["context"],
+            },
+        }
+
+    return events()
+
+
+async def asend_message(
+    db: Session,
+    *,
+    user_id: int,
+    conversation_id: int,
+    user_text: str,
+    model: str | None,
+    use_rag: bool,
+) -> Dict[str, Any]:
+    """
+    Non-blocking `send_message`: async ONOS fetches, embedding on its own
+    executor, AsyncGroq for the completion and DB work in worker threads.
+    """
+    turn = await _aprepare_turn(
+        db,
+        user_id=user_id,
+        conversation_id=conversation_id,
+        user_text=user_text,
+        model=model,
+        use_rag=use_rag,
+    )
+    reply = turn["ready_reply"]
+
+    queue_seconds = llm_seconds = 0.0
+    if reply is None:
+        client = _async_groq_client()
+        t_wait = time.perf_counter()
+        async with _get_llm_slots():
+            queue_seconds = time.perf_counter() - t_wait
+            t_llm = time.perf_counter()
+            chat_completion = await client.chat.completions.create(messages=turn["messages"], model=turn["model"])
+            llm_seconds = time.perf_counter() - t_llm
+        reply = chat_completion.choices[0].message.content
+        store_reply(turn["cache_ticket"], reply)
+
+    user_msg, assistant_msg = await asyncio.to_thread(
+        _persist_turn, db, convo=turn["convo"], conversation_id=conversation_id, user_text=user_text, reply=reply
+    )
+
+    timings = {
+        **turn["timings"],
+        "llm_queue_seconds": queue_seconds,
+        "llm_ttft_seconds": llm_seconds,
+        "llm_seconds": llm_seconds,
+        **cache_timings(turn["cache_ticket"]),
+    }
+    return {
+        "conversation": turn["convo"],
+        "user_message": user_msg,
+        "assistant_message": assistant_msg,
+        "model": turn["model"],
+        "use_rag": use_rag,
+        "timings": timings,
+        "context": turn["context"],
+    }
+
+
+async def astream_message(
+    db: Session,
+    *,
+    user_id: int,
+    conversation_id: int,
+    user_text: str,
+    model: str | None,
+    use_rag: bool,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async `stream_message`; same events, driven by an AsyncGroq stream."""
+    turn = await _aprepare_turn(
+        db,
+        user_id=user_id,
+        conversation_id=conversation_id,
+        user_text=user_text,
+        model=model,
+        use_rag=use_rag,
+    )
+    ready = turn["ready_reply"]
+    client = _async_groq_client() if ready is None else None
+
+    async def events() -> AsyncIterator[Dict[str, Any]]:
+        parts: List[str] = []
+        ttft: float | None = None
+        queue_seconds = llm_seconds = 0.0
+        if ready is not None:
+            # A cached or fast-path reply goes out as a single token event.
+            parts.append(ready)
+            yield {"event": "token", "data": {"content": ready}}
+        else:
+            t_wait = time.perf_counter()
+            async with _get_llm_slots():
+                queue_seconds = time.perf_counter() - t_wait
+                t_llm = time.perf_counter()
+                try:
+                    stream = await client.chat.completions.create(
+                        messages=turn["messages"], model=turn["model"], stream=True
+                    )
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if not delta:
+                            continue
+                        if ttft is None:
+                            ttft = time.perf_counter() - t_llm
+                        parts.append(delta)
+                        yield {"event": "token", "data": {"content": delta}}
+                except Exception as exc:
+                    yield {"event": "error", "data": {"detail": str(exc)}}
+                    return
+                llm_seconds = time.perf_counter() - t_llm
+            store_reply(turn["cache_ticket"], "".join(parts))
+
+        user_msg, assistant_msg = await asyncio.to_thread(
+            _persist_turn,
+            db,
+            convo=turn["convo"],
+            conversation_id=conversation_id,
+            user_text=user_text,
+            reply="".join(parts),
+        )
+        timings = {
+            **turn["timings"],
+            "llm_queue_seconds": queue_seconds,
+            "llm_ttft_seconds": ttft if ttft is not None else llm_seconds,
+            "llm_seconds": llm_seconds,
+            **cache_timings(turn["cache_ticket"]),
+        }
+        yield {
+            "event": "done",
+            "data": {
+                "conversation": turn["convo"],
+                "user_message": user_msg,
+                "assistant_message": assistant_msg,
+                "model": turn["model"],
+                "use_rag": use_rag,
+                "timings": timings,
+                "context": turn["context"],
+            },
+        }
+
+    return events()
+
+
 __all__ = [
     "list_conversations",
     "create_conversation",
     "get_conversation",
     "list_messages",
     "send_message",
+    "stream_message",
+    "asend_message",
+    "astream_message",
+    "async_pipeline_enabled",
 ]
-
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import List, Set
+
+from sqlalchemy import update
+
+from backend.services.llm.groq_client import DEFAULT_MODEL
+from database import SessionLocal
+from database.models import Conversation, Message
+
+# Rolling per-conversation summaries.
+#
+# After each assistant turn, messages that fell out of the last CHAT_HISTORY_TURNS
+# turns are folded into `Conversation.summary` by one extra (small) LLM call, run
+# as a background task once the response has been sent. `send_message` then
+# sends summary + recent turns instead of replaying the whole conversation.
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a network operator and FYP Agent, "
+    "an assistant that turns intents into ONOS Intent Framework JSON. "
+    "Merge the new messages into the existing summary. Keep host/switch names and ids, IPs, ports, "
+    "priorities, intents that were generated or applied, and the user's stated preferences or constraints. "
+    "Drop pleasantries and full JSON bodies (mention what they did instead). "
+    "Reply with the updated summary only, at most {max_words} words."
+)
+
+# Per-message cap when feeding old turns to the summarizer (assistant replies can be large JSON).
+_MAX_MESSAGE_CHARS = 1500
+
+_inflight: Set[int] = set()
+_inflight_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def history_turns() -> int:
+    # User+assistant pairs sent verbatim on every request.
+    return max(1, _env_int("CHAT_HISTORY_TURNS", 6))
+
+
+def summary_enabled() -> bool:
+    return os.getenv("CHAT_SUMMARY_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _summary_model() -> str:
+    return os.getenv("CHAT_SUMMARY_MODEL") or DEFAULT_MODEL
+
+
+def _format_messages(messages: List[Message]) -> str:
+    lines: List[str] = []
+    for m in messages:
+        content = m.content or ""
+        if len(content) > _MAX_MESSAGE_CHARS:
+            content = content[:_MAX_MESSAGE_CHARS] + " …"
+        lines.append(f"{m.role}: {content}")
+    return "\n\n".join(lines)
+
+
+def _summarize(previous: str | None, messages: List[Message]) -> str:
+    from groq import Groq  # local import to keep module import light
+
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY is not set in environment")
+    max_words = _env_int("CHAT_SUMMARY_MAX_WORDS", 250)
+    completion = Groq(api_key=api_key).chat.completions.create(
+        model=_summary_model(),
+        messages=[
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS.format(max_words=max_words)},
+            {
+                "role": "user",
+                "content": f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{_format_messages(messages)}",
+            },
+        ],
+    )
+    return (completion.choices[0].message.content or "").strip()
+
+
+def refresh_conversation_summary(conversation_id: int) -> bool:
+    """
+    Fold messages older than the last `history_turns()` turns into the summary.
+
+    Safe to call after every turn: it is a no-op when nothing new fell out of
+    the window, runs at most once at a time per conversation in this process,
+    and only writes if no other worker advanced the summary meanwhile.
+    Returns True if the summary was updated.
+    """
+    if not summary_enabled():
+        return False
+    with _inflight_lock:
+        if conversation_id in _inflight:
+            return False
+        _inflight.add(conversation_id)
+
+    db = SessionLocal()
+    try:
+        convo = db.get(Conversation, conversation_id)
+        if convo is None:
+            return False
+        watermark = convo.summary_message_id
+
+        query = db.query(Message).filter(Message.conversation_id == conversation_id)
+        if watermark is not None:
+            query = query.filter(Message.message_id > watermark)
+        pending = query.order_by(Message.message_id.asc()).all()
+
+        keep = history_turns() * 2
+        to_fold = pending[:-keep] if len(pending) > keep else []
+        if not to_fold:
+            return False
+
+        summary = _summarize(convo.summary, to_fold)
+        if not summary:
+            return False
+
+        # Optimistic: only advance from the watermark we read.
+        watermark_matches = (
+            Conversation.summary_message_id.is_(None)
+            if watermark is None
+            else Conversation.summary_message_id == watermark
+        )
+        result = db.execute(
+            update(Conversation)
+            .where(Conversation.conversation_id == conversation_id, watermark_matches)
+            .values(summary=summary, summary_message_id=to_fold[-1].message_id)
+        )
+        db.commit()
+        return result.rowcount == 1
+    except Exception as exc:
+        db.rollback()
+        # Background task: the next turn retries; the chat keeps working on the recent window meanwhile.
+        print(f"Summary refresh failed for conversation {conversation_id}: {exc}")
+        return False
+    finally:
+        db.close()
+        with _inflight_lock:
+            _inflight.discard(conversation_id)
+
+
+__all__ = ["history_turns", "refresh_conversation_summary", "summary_enabled"]
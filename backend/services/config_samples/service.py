@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
 from database.models import ConfigSample
 from database.rag.embedded_server import embed_text
+from database.rag.memory_index import memory_index
 
 
 def list_config_samples(
@@ -16,7 +17,8 @@ def list_config_samples(
     limit: int = 20,
     offset: int = 0,
 ) -> List[ConfigSample]:
-    q = db.query(ConfigSample)
+    # The listing never shows embeddings; don't fetch 768 floats per row.
+    q = db.query(ConfigSample).options(defer(ConfigSample.embedding))
 
     if category:
         q = q.filter(ConfigSample.category.ilike(category))
@@ -49,6 +51,17 @@ def create_config_sample(
     db.add(row)
     db.commit()
     db.refresh(row)
+    # Keep RAG_BACKEND=memory in step without reloading the library (no-op until it is loaded).
+    memory_index.upsert(
+        {
+            "sample_id": row.sample_id,
+            "category": row.category,
+            "intent_text": row.intent_text,
+            "config_json": row.config_json,
+            "extra_metadata": row.extra_metadata,
+        },
+        row.embedding,
+    )
     return row
 
 
@@ -58,6 +71,7 @@ def delete_config_sample(db: Session, sample_id: int) -> bool:
         return False
     db.delete(row)
     db.commit()
+    memory_index.remove(sample_id)
     return True
 
 
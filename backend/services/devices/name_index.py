@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from database.models import Device
+
+
+def _reload_seconds() -> float:
+    # Each uvicorn worker has its own index; a periodic reload picks up names
+    # written by the other workers. 0 disables the periodic reload.
+    raw = os.getenv("DEVICE_NAME_INDEX_RELOAD_SECONDS", "30")
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 30.0
+
+
+_DISCARDED = object()
+
+
+class DeviceNameIndex:
+    """
+    Process-wide `device_id -> friendly name` map for the `devices` table.
+
+    Loaded with one SELECT on first use, then kept current by write-through from
+    `set_device_friendly_name` / `delete_managed_device`. It is rebuilt every
+    DEVICE_NAME_INDEX_RELOAD_SECONDS (other workers' writes) and after a
+    topology sync that inserted or removed rows.
+    """
+
+    def __init__(self, reload_seconds: float | None = None) -> None:
+        self.reload_seconds = _reload_seconds() if reload_seconds is None else reload_seconds
+        self._names: Dict[str, str | None] | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        # Writes made while a reload's SELECT runs, replayed onto its result.
+        self._journals: List[Dict[str, object]] = []
+        # Bumped by invalidate(); a reload that started earlier is returned but not installed.
+        self._generation = 0
+
+    def _stale(self) -> bool:
+        if self._names is None:
+            return True
+        return self.reload_seconds > 0 and time.monotonic() - self._loaded_at >= self.reload_seconds
+
+    def _ensure_loaded(self, db: Session) -> Dict[str, str | None]:
+        with self._lock:
+            if not self._stale():
+                return self._names  # type: ignore[return-value]
+            journal: Dict[str, object] = {}
+            self._journals.append(journal)
+            generation = self._generation
+        try:
+            rows = db.query(Device.device_id, Device.name).all()
+        except BaseException:
+            with self._lock:
+                self._journals.remove(journal)
+            raise
+        names: Dict[str, str | None] = {device_id: name for device_id, name in rows}
+        with self._lock:
+            self._journals.remove(journal)
+            for device_id, name in journal.items():
+                if name is _DISCARDED:
+                    names.pop(device_id, None)
+                else:
+                    names[device_id] = name  # type: ignore[assignment]
+            if generation == self._generation:
+                self._names = names
+                self._loaded_at = time.monotonic()
+        return names
+
+    def lookup(self, db: Session, device_ids: Iterable[str]) -> Dict[str, str | None]:
+        """Same shape as the old `IN (...)` query: only ids that have a DB row."""
+        names = self._ensure_loaded(db)
+        return {did: names[did] for did in device_ids if did in names}
+
+    def set(self, device_id: str, name: str | None) -> None:
+        with self._lock:
+            if self._names is not None:
+                self._names[device_id] = name
+            for journal in self._journals:
+                journal[device_id] = name
+
+    def discard(self, device_id: str) -> None:
+        with self._lock:
+            if self._names is not None:
+                self._names.pop(device_id, None)
+            for journal in self._journals:
+                journal[device_id] = _DISCARDED
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._names = None
+            self._generation += 1
+
+
+name_index = DeviceNameIndex()
+
+
+__all__ = ["DeviceNameIndex", "name_index"]
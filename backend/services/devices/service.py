@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from backend.services.devices.name_index import name_index
 from backend.services.onos.onos_client import get_network_devices, get_network_hosts
 from database.models import Device
 
@@ -33,56 +38,132 @@ def host_stable_id(host: Dict[str, Any]) -> Optional[str]:
     return hid if isinstance(hid, str) and hid else None
 
 
-def sync_devices_from_onos(db: Session) -> Dict[str, Any]:
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """Stable content hash of an ONOS device/host payload (key order independent)."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _new_counts() -> Dict[str, int]:
+    return {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+
+def _upsert_rows(db: Session, rows: List[Dict[str, Any]], *, hosts: bool = False) -> None:
+    """
+    Upsert `devices` rows in one `INSERT ... ON CONFLICT (device_id) DO UPDATE`.
+
+    ONOS metadata (annotations/extra_metadata/content_hash) is refreshed; `name`
+    is the user-set friendly name and is never overwritten. For host rows the
+    existing `type` is kept, and an incoming name only fills rows whose name is
+    NULL/'' (legacy migration). The WHERE guard skips rows whose content hash
+    already matches (e.g. another worker wrote them first).
+    """
+    if not rows:
+        return
+    stmt = pg_insert(Device).values(rows)
+    excluded = stmt.excluded
+    set_: Dict[str, Any] = {
+        "annotations": excluded.annotations,
+        "extra_metadata": excluded.extra_metadata,
+        "content_hash": excluded.content_hash,
+    }
+    changed = Device.content_hash.is_distinct_from(excluded.content_hash)
+    if hosts:
+        set_["type"] = func.coalesce(Device.type, excluded.type)
+        set_["name"] = func.coalesce(func.nullif(Device.name, ""), excluded.name, Device.name)
+        changed = or_(changed, and_(func.nullif(Device.name, "").is_(None), excluded.name.isnot(None)))
+    else:
+        set_["type"] = excluded.type
+    db.execute(stmt.on_conflict_do_update(index_elements=[Device.device_id], set_=set_, where=changed))
+
+
+def sync_devices_from_onos(db: Session, *, counts: Dict[str, int] | None = None) -> Dict[str, Any]:
     """
     Pull devices from ONOS, upsert into DB, and return the ONOS payload.
 
     We intentionally preserve `Device.name` (global friendly name) when refreshing
-    metadata from ONOS.
+    metadata from ONOS. Only rows whose ONOS payload changed (by content hash)
+    are written; pass `counts` to receive inserted/updated/unchanged/deleted.
     """
     onos_payload = get_network_devices()
     onos_devices: List[Dict[str, Any]] = (onos_payload or {}).get("devices", []) or []
+    counts = counts if counts is not None else {}
+    counts.update(_new_counts())
 
+    # Keyed by id: ON CONFLICT cannot touch the same row twice in one statement.
+    rows: Dict[str, Dict[str, Any]] = {}
     for d in onos_devices:
         device_id = d.get("id")
         if not device_id:
             continue
-
-        existing: Device | None = db.query(Device).filter(Device.device_id == device_id).first()
-        if existing is None:
-            db.add(
-                Device(
-                    device_id=device_id,
-                    name=None,
-                    type=d.get("type"),
-                    annotations=d.get("annotations"),
-                    extra_metadata=d,
-                )
-            )
+        rows[device_id] = {
+            "device_id": device_id,
+            "name": None,
+            "type": d.get("type"),
+            "annotations": d.get("annotations"),
+            "extra_metadata": d,
+            "content_hash": payload_hash(d),
+        }
+
+    existing_hashes: Dict[str, str | None] = {}
+    if rows:
+        existing_hashes = dict(
+            db.query(Device.device_id, Device.content_hash).filter(Device.device_id.in_(list(rows))).all()
+        )
+
+    changed: List[Dict[str, Any]] = []
+    for device_id, row in rows.items():
+        if device_id not in existing_hashes:
+            counts["inserted"] += 1
+        elif existing_hashes[device_id] != row["content_hash"]:
+            counts["updated"] += 1
         else:
-            # Preserve friendly name, but keep ONOS metadata fresh.
-            existing.type = d.get("type")
-            existing.annotations = d.get("annotations")
-            existing.extra_metadata = d
+            counts["unchanged"] += 1
+            continue
+        changed.append(row)
 
+    _upsert_rows(db, changed)
     db.commit()
     return onos_payload
 
 
-def sync_hosts_from_onos(db: Session) -> Dict[str, Any]:
+def sync_hosts_from_onos(db: Session, *, counts: Dict[str, int] | None = None) -> Dict[str, Any]:
     """
     Pull hosts from ONOS, upsert into the same `devices` table (type='host').
 
     This lets us reuse the existing `Device.name` column as a friendly-name store
-    for both switches and hosts.
+    for both switches and hosts. Like the device sync, unchanged rows are not
+    rewritten and `counts` (if given) receives the per-outcome row counts.
     """
     onos_payload = get_network_hosts()
     onos_hosts: List[Dict[str, Any]] = (onos_payload or {}).get("hosts", []) or []
+    counts = counts if counts is not None else {}
+    counts.update(_new_counts())
+
+    live_ips: set[str] = set()
+    host_by_id: Dict[str, Dict[str, Any]] = {}
+    for h in onos_hosts:
+        stable_id = host_stable_id(h)
+        if not stable_id:
+            continue
+        ip = _host_primary_ip(h)
+        if ip:
+            live_ips.add(ip)
+        host_by_id[stable_id] = h
+
+    # One prefetch: every host row (for the legacy migration below) plus any row
+    # already stored under a live stable id (e.g. named before its first sync).
+    existing_rows: List[Device] = (
+        db.query(Device)
+        .filter(or_(Device.type == "host", Device.device_id.in_(list(host_by_id))))
+        .all()
+    )
+    existing_by_id: Dict[str, Device] = {r.device_id: r for r in existing_rows}
+    existing_host_rows = [r for r in existing_rows if r.type == "host"]
 
     # Migration helper: older versions stored hosts keyed by ONOS host_id (MAC/VLAN).
     # Build a best-effort mapping from IP -> friendly name from existing DB rows so
     # we can preserve names across topology resets (where host_id changes).
-    existing_host_rows: List[Device] = db.query(Device).filter(Device.type == "host").all()
     legacy_ip_to_name: Dict[str, str] = {}
     for row in existing_host_rows:
         if not row.name:
@@ -95,42 +176,35 @@ def sync_hosts_from_onos(db: Session) -> Dict[str, Any]:
             if isinstance(ip, str) and ip and ip not in legacy_ip_to_name:
                 legacy_ip_to_name[ip] = row.name
 
-    live_stable_ids: set[str] = set()
-    live_ips: set[str] = set()
-
-    for h in onos_hosts:
-        stable_id = host_stable_id(h)
-        if not stable_id:
-            continue
-
+    changed: List[Dict[str, Any]] = []
+    for stable_id, h in host_by_id.items():
         ip = _host_primary_ip(h)
-        if ip:
-            live_ips.add(ip)
-        live_stable_ids.add(stable_id)
-
-        existing: Device | None = db.query(Device).filter(Device.device_id == stable_id).first()
+        # Only used for new rows, or existing rows without a friendly name yet
+        # (never overwrites user edits).
+        name = legacy_ip_to_name.get(ip) if ip else None
+        row = {
+            "device_id": stable_id,
+            "name": name,
+            "type": "host",
+            "annotations": h.get("annotations"),
+            "extra_metadata": h,
+            "content_hash": payload_hash(h),
+        }
+        existing = existing_by_id.get(stable_id)
         if existing is None:
-            initial_name = legacy_ip_to_name.get(ip) if ip else None
-            db.add(
-                Device(
-                    device_id=stable_id,
-                    name=initial_name,
-                    type="host",
-                    annotations=h.get("annotations"),
-                    extra_metadata=h,
-                )
-            )
+            counts["inserted"] += 1
+        elif existing.content_hash != row["content_hash"] or (not existing.name and name):
+            counts["updated"] += 1
         else:
-            existing.type = existing.type or "host"
-            existing.annotations = h.get("annotations")
-            existing.extra_metadata = h
-            # If this row has no friendly name yet but we can migrate one from legacy,
-            # set it once (do not overwrite user edits).
-            if (existing.name is None or existing.name == "") and ip and ip in legacy_ip_to_name:
-                existing.name = legacy_ip_to_name[ip]
+            counts["unchanged"] += 1
+            continue
+        changed.append(row)
+
+    _upsert_rows(db, changed, hosts=True)
 
     # Cleanup legacy host rows keyed by old ONOS host_id (MAC/VLAN) if they correspond
     # to a currently-live IP. This avoids duplicates in the Devices management table.
+    stale_ids: List[str] = []
     for row in existing_host_rows:
         if isinstance(row.device_id, str) and row.device_id.startswith("host:"):
             continue
@@ -139,17 +213,24 @@ def sync_hosts_from_onos(db: Session) -> Dict[str, Any]:
         if not isinstance(ips, list):
             continue
         if any(isinstance(ip, str) and ip in live_ips for ip in ips):
-            db.delete(row)
+            stale_ids.append(row.device_id)
+    if stale_ids:
+        counts["deleted"] = (
+            db.query(Device).filter(Device.device_id.in_(stale_ids)).delete(synchronize_session=False)
+        )
 
     db.commit()
+    if stale_ids or any(row["name"] for row in changed):
+        # Names were migrated/removed in bulk; let the name index reload.
+        name_index.invalidate()
     return onos_payload
 
 
 def get_device_name_map(db: Session, device_ids: List[str]) -> Dict[str, str | None]:
+    # Served from the in-memory name index (no query once loaded).
     if not device_ids:
         return {}
-    rows: List[Device] = db.query(Device).filter(Device.device_id.in_(device_ids)).all()
-    return {r.device_id: r.name for r in rows}
+    return name_index.lookup(db, device_ids)
 
 
 def enrich_onos_hosts_with_friendly_names(db: Session, hosts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -164,8 +245,7 @@ def enrich_onos_hosts_with_friendly_names(db: Session, hosts: List[Dict[str, Any
     stable_ids = [host_stable_id(h) for h in hosts]
     ids = [sid for sid in stable_ids if sid]
     name_map = get_device_name_map(db, ids)
-    for h in hosts:
-        sid = host_stable_id(h)
+    for h, sid in zip(hosts, stable_ids):
         h["managed_id"] = sid
         h["friendly_name"] = name_map.get(sid) if sid else None
     return hosts
@@ -188,6 +268,7 @@ def set_device_friendly_name(db: Session, device_id: str, name: str | None) -> N
     else:
         device.name = name
     db.commit()
+    name_index.set(device_id, name)
 
 
 def delete_managed_device(db: Session, device_id: str) -> bool:
@@ -196,6 +277,7 @@ def delete_managed_device(db: Session, device_id: str) -> bool:
         return False
     db.delete(row)
     db.commit()
+    name_index.discard(device_id)
     return True
 
 
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from backend.services.devices.service import host_stable_id, sync_devices_from_onos, sync_hosts_from_onos
+from backend.services.onos.onos_client import get_network_devices, get_network_hosts, snapshot_cache
+from database import SessionLocal
+
+
+def _sync_interval_seconds() -> float:
+    raw = os.getenv("TOPOLOGY_SYNC_INTERVAL_SECONDS", "10")
+    try:
+        return max(1.0, float(raw))
+    except ValueError:
+        return 10.0
+
+
+def sync_enabled() -> bool:
+    return os.getenv("TOPOLOGY_SYNC_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class TopologySyncWorker:
+    """
+    Single background loop that keeps the `devices` table and an in-memory
+    topology view (ONOS devices + hosts) current.
+
+    Request handlers read from this view instead of calling ONOS and upserting
+    the DB themselves. If the loop is not running (scripts, tests, or
+    TOPOLOGY_SYNC_ENABLED=0), reads fall back to the cached ONOS payloads.
+
+    When a pass fails for a resource, its last good view is still served but
+    marked stale (`stale()`, `status()["stale"]`), and `live_*_ids` return
+    None: the worker no longer knows which of those ids are live.
+    """
+
+    def __init__(self, interval_seconds: float | None = None) -> None:
+        self.interval_seconds = interval_seconds or _sync_interval_seconds()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._run_lock = threading.Lock()
+        self._view_lock = threading.Lock()
+
+        self._devices: Optional[List[Dict[str, Any]]] = None
+        self._hosts: Optional[List[Dict[str, Any]]] = None
+        self._status: Dict[str, Any] = {
+            "last_synced_at": None,
+            "last_duration_seconds": None,
+            "runs": 0,
+            "rows": {},
+            "errors": {},
+            "stale": {"devices": False, "hosts": False},
+            "last_success_at": {"devices": None, "hosts": None},
+        }
+
+    # ---- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="topology-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.refresh_now()
+            self._stop.wait(self.interval_seconds)
+
+    # ---- sync --------------------------------------------------------------
+
+    def refresh_now(self, *, force: bool = False) -> Dict[str, Any]:
+        """
+        Run one sync pass (devices, then hosts) and return the status.
+
+        `force=True` drops the cached ONOS payloads first so the pass reads
+        ONOS live. Overlapping calls (loop + manual refresh) run one at a time.
+        """
+        with self._run_lock:
+            if force:
+                snapshot_cache.invalidate(["devices", "hosts"])
+
+            started = time.perf_counter()
+            errors: Dict[str, str] = {}
+            counts: Dict[str, Dict[str, int]] = {"devices": {}, "hosts": {}}
+            devices: Optional[List[Dict[str, Any]]] = None
+            hosts: Optional[List[Dict[str, Any]]] = None
+
+            db = SessionLocal()
+            try:
+                try:
+                    payload = sync_devices_from_onos(db, counts=counts["devices"])
+                    devices = (payload or {}).get("devices", []) or []
+                except Exception as exc:
+                    db.rollback()
+                    errors["devices"] = str(exc)
+                try:
+                    payload = sync_hosts_from_onos(db, counts=counts["hosts"])
+                    hosts = (payload or {}).get("hosts", []) or []
+                except Exception as exc:
+                    db.rollback()
+                    errors["hosts"] = str(exc)
+            finally:
+                db.close()
+
+            with self._view_lock:
+                now = datetime.now(timezone.utc).isoformat()
+                last_success = dict(self._status["last_success_at"])
+                # Keep the last good view of a resource if this pass failed for it, marked stale.
+                if devices is not None:
+                    self._devices = devices
+                    last_success["devices"] = now
+                if hosts is not None:
+                    self._hosts = hosts
+                    last_success["hosts"] = now
+                self._status = {
+                    "last_synced_at": now,
+                    "last_duration_seconds": time.perf_counter() - started,
+                    "runs": self._status["runs"] + 1,
+                    # Rows inserted/updated/unchanged/deleted by this pass.
+                    "rows": counts,
+                    "errors": errors,
+                    "stale": {"devices": devices is None, "hosts": hosts is None},
+                    "last_success_at": last_success,
+                }
+            return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        with self._view_lock:
+            return {
+                **self._status,
+                "running": self.running,
+                "interval_seconds": self.interval_seconds,
+                "devices": len(self._devices) if self._devices is not None else None,
+                "hosts": len(self._hosts) if self._hosts is not None else None,
+            }
+
+    def stale(self, resource: str) -> bool:
+        """True when the last pass failed for `resource` ("devices" or "hosts")."""
+        with self._view_lock:
+            return bool(self._status["stale"].get(resource))
+
+    # ---- read-only view ----------------------------------------------------
+
+    def current_devices(self) -> List[Dict[str, Any]]:
+        with self._view_lock:
+            devices = self._devices
+        if devices is None:
+            devices = (get_network_devices() or {}).get("devices", []) or []
+        # Callers enrich these dicts in place.
+        return [dict(d) for d in devices]
+
+    def current_hosts(self) -> List[Dict[str, Any]]:
+        with self._view_lock:
+            hosts = self._hosts
+        if hosts is None:
+            hosts = (get_network_hosts() or {}).get("hosts", []) or []
+        return [dict(h) for h in hosts]
+
+    def live_device_ids(self) -> Optional[Set[str]]:
+        """ONOS device ids currently present; None while the devices view is stale."""
+        if self.stale("devices"):
+            return None
+        return {d["id"] for d in self.current_devices() if d.get("id")}
+
+    def live_host_ids(self) -> Optional[Set[str]]:
+        """Stable host ids currently present; None while the hosts view is stale."""
+        if self.stale("hosts"):
+            return None
+        return {sid for sid in (host_stable_id(h) for h in self.current_hosts()) if sid}
+
+
+topology_sync = TopologySyncWorker()
+
+
+__all__ = ["TopologySyncWorker", "topology_sync", "sync_enabled"]
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import os
+import re
+from collections import deque
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+# Intent-aware narrowing of the topology digest.
+#
+# Finds the hosts/switches the user text mentions (friendly names such as "h1"
+# or "VideoConf server", ONOS ids, MACs, IPs), then keeps only those nodes, the
+# switches they attach to, the k-hop switch neighbourhood and the shortest
+# switch paths between them. The digest summarises everything else as counts,
+# so the prompt stays roughly the same size as the network grows.
+
+_TOKEN = re.compile(r"[\w:./\-]+")
+_MAX_NAME_WORDS = 6
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def focus_min_nodes() -> int:
+    # Below this many hosts + switches the full digest is small enough to send as is.
+    return _env_int("TOPOLOGY_FOCUS_MIN_NODES", 64)
+
+
+def focus_hops() -> int:
+    return _env_int("TOPOLOGY_FOCUS_HOPS", 1)
+
+
+def _items(network_info: Dict[str, Any], resource: str) -> List[Dict[str, Any]]:
+    value = (network_info or {}).get(resource) or []
+    if isinstance(value, dict):
+        value = value.get(resource) or []
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def _words(text: str) -> List[str]:
+    return [tok.strip(".:/-") for tok in _TOKEN.findall(text.lower()) if tok.strip(".:/-")]
+
+
+class ContextFocus:
+    """The slice of the topology a request is about."""
+
+    __slots__ = ("host_ids", "switch_ids", "mentions", "paths")
+
+    def __init__(self) -> None:
+        self.host_ids: Set[str] = set()
+        self.switch_ids: Set[str] = set()
+        # Labels as written by the user, in order of appearance.
+        self.mentions: List[str] = []
+        # (from_label, to_label, [switch ids along the shortest path])
+        self.paths: List[Tuple[str, str, List[str]]] = []
+
+
+def _alias_index(hosts: List[Dict[str, Any]], devices: List[Dict[str, Any]]) -> Dict[str, Tuple[str, str]]:
+    """Normalised alias -> ("host" | "switch", ONOS id)."""
+    index: Dict[str, Tuple[str, str]] = {}
+
+    def add(alias: Any, kind: str, node_id: str) -> None:
+        if not alias:
+            return
+        key = " ".join(_words(str(alias)))
+        if key:
+            index.setdefault(key, (kind, node_id))
+
+    for d in devices:
+        did = d.get("id")
+        if did:
+            add(d.get("friendly_name"), "switch", did)
+            add(did, "switch", did)
+    for h in hosts:
+        hid = h.get("id")
+        if not hid:
+            continue
+        add(h.get("friendly_name"), "host", hid)
+        add(hid, "host", hid)
+        add(h.get("mac"), "host", hid)
+        for ip in h.get("ipAddresses") or []:
+            add(ip, "host", hid)
+    return index
+
+
+def _find_mentions(user_text: str, index: Dict[str, Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+    """Longest-match scan over word n-grams; returns (label, kind, id) in text order."""
+    words = _words(user_text)
+    found: List[Tuple[str, str, str]] = []
+    seen: Set[str] = set()
+    i = 0
+    while i < len(words):
+        for n in range(min(_MAX_NAME_WORDS, len(words) - i), 0, -1):
+            key = " ".join(words[i : i + n])
+            hit = index.get(key)
+            if hit is not None:
+                if hit[1] not in seen:
+                    seen.add(hit[1])
+                    found.append((key, hit[0], hit[1]))
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def _switch_graph(links: Iterable[Dict[str, Any]]) -> Dict[str, Set[str]]:
+    graph: Dict[str, Set[str]] = {}
+    for link in links:
+        src = (link.get("src") or {}).get("device")
+        dst = (link.get("dst") or {}).get("device")
+        if src and dst:
+            graph.setdefault(src, set()).add(dst)
+            graph.setdefault(dst, set()).add(src)
+    return graph
+
+
+def _neighbourhood(graph: Dict[str, Set[str]], seeds: Iterable[str], hops: int) -> Set[str]:
+    seen = set(seeds)
+    frontier = set(seen)
+    for _ in range(hops):
+        frontier = {peer for node in frontier for peer in graph.get(node, ())} - seen
+        if not frontier:
+            break
+        seen |= frontier
+    return seen
+
+
+def _shortest_path(graph: Dict[str, Set[str]], src: str, dst: str) -> List[str]:
+    if src == dst:
+        return [src]
+    parent: Dict[str, str | None] = {src: None}
+    queue = deque([src])
+    while queue:
+        node = queue.popleft()
+        for peer in sorted(graph.get(node, ())):
+            if peer in parent:
+                continue
+            parent[peer] = node
+            if peer == dst:
+                path = [dst]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])  # type: ignore[arg-type]
+                return path[::-1]
+            queue.append(peer)
+    return []
+
+
+def mentioned_nodes(network_info: Dict[str, Any], user_text: str | None) -> List[Dict[str, Any]]:
+    """
+    Nodes named in `user_text`, in order: `{"label", "kind", "id", "aliases"}`,
+    where aliases holds the node's id/mac/ip/name as they appear in configs.
+    """
+    if not user_text:
+        return []
+    hosts = _items(network_info, "hosts")
+    devices = _items(network_info, "devices")
+    by_id: Dict[str, Dict[str, Any]] = {h["id"]: h for h in hosts if h.get("id")}
+    by_id.update({d["id"]: d for d in devices if d.get("id")})
+
+    nodes: List[Dict[str, Any]] = []
+    for label, kind, node_id in _find_mentions(user_text, _alias_index(hosts, devices)):
+        node = by_id.get(node_id, {})
+        ips = node.get("ipAddresses") or []
+        aliases = {"id": node_id, "name": node.get("friendly_name"), "mac": node.get("mac"), "ip": ips[0] if ips else None}
+        nodes.append({"label": label, "kind": kind, "id": node_id, "aliases": {k: v for k, v in aliases.items() if v}})
+    return nodes
+
+
+def select_context(
+    network_info: Dict[str, Any],
+    user_text: str | None,
+    *,
+    hops: int | None = None,
+    max_pairs: int = 10,
+) -> ContextFocus | None:
+    """
+    Return the focus for `user_text`, or None when it names no known node
+    (e.g. "every host can reach every other host") and the full digest is needed.
+    """
+    if not user_text:
+        return None
+    hosts = _items(network_info, "hosts")
+    devices = _items(network_info, "devices")
+    mentions = _find_mentions(user_text, _alias_index(hosts, devices))
+    if not mentions:
+        return None
+
+    hops = focus_hops() if hops is None else hops
+    attach: Dict[str, List[str]] = {
+        h["id"]: [loc.get("elementId") for loc in h.get("locations") or [] if isinstance(loc, dict) and loc.get("elementId")]
+        for h in hosts
+        if h.get("id")
+    }
+    graph = _switch_graph(_items(network_info, "links"))
+
+    focus = ContextFocus()
+    anchors: List[Tuple[str, str]] = []  # (label, switch id) used for path search
+    for label, kind, node_id in mentions:
+        focus.mentions.append(label)
+        if kind == "host":
+            focus.host_ids.add(node_id)
+            for sw in attach.get(node_id, []):
+                focus.switch_ids.add(sw)
+                anchors.append((label, sw))
+        else:
+            focus.switch_ids.add(node_id)
+            anchors.append((label, node_id))
+            # Hosts hanging off a switch the user named are part of the question.
+            focus.host_ids.update(hid for hid, sws in attach.items() if node_id in sws)
+
+    focus.switch_ids = _neighbourhood(graph, focus.switch_ids, hops)
+
+    for (a_label, a_sw), (b_label, b_sw) in list(combinations(anchors, 2))[:max_pairs]:
+        if a_label == b_label:
+            continue
+        path = _shortest_path(graph, a_sw, b_sw)
+        if path:
+            focus.paths.append((a_label, b_label, path))
+            focus.switch_ids.update(path)
+    return focus
+
+
+__all__ = ["ContextFocus", "focus_hops", "focus_min_nodes", "mentioned_nodes", "select_context"]
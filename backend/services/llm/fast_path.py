@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Set
+
+from backend.services.llm.context_selector import mentioned_nodes
+
+# Deterministic fast path in front of the LLM.
+#
+# Plain host-to-host connectivity requests ("Make sure h1 can communicate with
+# h2", "connect h3 and h4 with priority 300") are compiled straight into a
+# HostToHostIntent: the two hosts are resolved to their current ONOS ids through
+# the friendly-name enrichment and an optional "priority N" slot is filled.
+#
+# Confidence is the share of request words the template accounts for (host
+# names, connectivity vocabulary, the priority slot). Anything that changes the
+# meaning (negation, blocking, protocols/ports, QoS words, follow-ups) vetoes
+# the fast path outright, and so does a question ("Can h1 reach h2?"), which
+# asks about the network rather than for a config; below CHAT_FAST_PATH_MIN_CONFIDENCE the request goes
+# to the LLM as before.
+
+APP_ID = "org.onosproject.cli"
+DEFAULT_PRIORITY = 100
+
+_ACTION = {
+    "connect", "connected", "connecting", "connection", "connectivity",
+    "communicate", "communicates", "communication", "reach", "reaches", "reachable",
+    "reachability", "allow", "permit", "enable", "link", "ping", "talk", "route",
+    "path", "intent", "hosttohostintent",
+}
+_FILLER = {
+    "a", "an", "the", "and", "to", "from", "with", "between", "each", "other", "can",
+    "could", "should", "would", "be", "able", "is", "are", "make", "sure", "ensure",
+    "please", "set", "up", "create", "add", "install", "establish", "provide", "let",
+    "i", "we", "want", "need", "like", "you", "for", "of", "host", "hosts", "traffic",
+    "data", "transfer", "h2h", "new", "basic", "simple", "two", "both", "bidirectional",
+}
+_VETO = {
+    # Meaning flips or needs other config types.
+    "not", "no", "never", "cannot", "can't", "dont", "don't", "block", "deny", "drop",
+    "prevent", "disable", "stop", "remove", "delete", "isolate", "cut", "without",
+    "except", "unless", "only", "all", "every",
+    # Selectors / QoS the template does not fill.
+    "tcp", "udp", "icmp", "http", "https", "port", "ports", "vlan", "bandwidth",
+    "latency", "qos", "video", "voip", "limit", "throttle", "high", "low", "higher",
+    "lower", "boost", "prioritize", "prioritise", "backup",
+    # Follow-ups that depend on earlier turns.
+    "same", "again", "those", "them", "previous", "above", "earlier", "undo",
+    "revert", "instead",
+}
+# A request starting with one of these, or ending in "?", is a question.
+_QUESTION_START = {
+    "is", "are", "am", "was", "were", "can", "could", "does", "do", "did", "will",
+    "would", "should", "has", "have", "why", "how", "what", "which", "who", "where", "when",
+}
+_TOKEN = re.compile(r"[\w:./'\-]+")
+_PRIORITY = re.compile(r"\bpriority\s*(?:of|=|:|to)?\s*(\d+)\b")
+_MAX_PRIORITY = 65535
+
+
+def _words(text: str) -> List[str]:
+    return [tok.strip(".:/-'") for tok in _TOKEN.findall(text.lower()) if tok.strip(".:/-'")]
+
+
+def intent_keywords(user_text: str) -> frozenset:
+    """
+    The words that decide what a request asks for: each veto word it contains,
+    plus "<action>" if it uses a connect-style verb. Requests with different
+    sets ("block h1 from h2" vs "allow h1 to reach h2") must not share a reply.
+    """
+    words = set(_words(user_text))
+    found = set(_VETO.intersection(words))
+    if _ACTION.intersection(words):
+        found.add("<action>")
+    return frozenset(found)
+
+
+def fast_path_enabled() -> bool:
+    return os.getenv("CHAT_FAST_PATH", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def fast_path_min_confidence() -> float:
+    try:
+        return float(os.getenv("CHAT_FAST_PATH_MIN_CONFIDENCE", "0.9"))
+    except ValueError:
+        return 0.9
+
+
+class FastPathResult:
+    """Outcome of one fast-path attempt; `reply` is None when the LLM must answer."""
+
+    __slots__ = ("template", "confidence", "config", "reply", "reason")
+
+    def __init__(
+        self,
+        *,
+        reason: str,
+        confidence: float = 0.0,
+        template: str | None = None,
+        config: Dict[str, Any] | None = None,
+        reply: str | None = None,
+    ) -> None:
+        self.template = template
+        self.confidence = confidence
+        self.config = config
+        self.reply = reply
+        # "hit", or why the request fell back to the LLM.
+        self.reason = reason
+
+    @property
+    def hit(self) -> bool:
+        return self.reply is not None
+
+
+def _format_reply(config: Dict[str, Any], labels: List[str]) -> str:
+    # Same shape as the LLM replies: a short line, then one ```json block the UI can apply.
+    return (
+        f"HostToHostIntent between {labels[0]} and {labels[1]} (priority {config['priority']}).\n\n"
+        f"```json\n{json.dumps(config, indent=2)}\n```"
+    )
+
+
+def compile_host_to_host(user_text: str, network_info: Dict[str, Any], *, min_confidence: float) -> FastPathResult:
+    words = _words(user_text)
+    if not words:
+        return FastPathResult(reason="empty")
+    if user_text.rstrip().endswith("?") or words[0] in _QUESTION_START:
+        return FastPathResult(reason="question")
+    parts = {p for w in words for p in w.split("-")}  # "high-priority" -> high, priority
+    if _VETO.intersection(parts):
+        return FastPathResult(reason="veto")
+    if not _ACTION.intersection(parts):
+        return FastPathResult(reason="no_template")
+
+    nodes = mentioned_nodes(network_info, user_text)
+    if len(nodes) != 2 or any(n["kind"] != "host" for n in nodes):
+        return FastPathResult(reason="not_two_hosts")
+
+    covered: Set[int] = set()
+    for node in nodes:
+        label = node["label"].split()
+        for i in range(len(words) - len(label) + 1):
+            if words[i : i + len(label)] == label:
+                covered.update(range(i, i + len(label)))
+
+    priority = DEFAULT_PRIORITY
+    match = _PRIORITY.search(" ".join(words))
+    if match:
+        priority = int(match.group(1))
+        if not 0 < priority <= _MAX_PRIORITY:
+            return FastPathResult(reason="bad_priority")
+        covered.update(i for i, w in enumerate(words) if w in ("priority", match.group(1)))
+    for i, w in enumerate(words):
+        if i in covered:
+            continue
+        if w.isdigit():
+            # A number the template did not consume (port, rate, ...).
+            return FastPathResult(reason="unfilled_slot")
+        if w in _ACTION or w in _FILLER:
+            covered.add(i)
+
+    confidence = len(covered) / len(words)
+    if confidence < min_confidence:
+        return FastPathResult(reason="low_confidence", confidence=confidence, template="host_to_host")
+
+    config = {
+        "type": "HostToHostIntent",
+        "appId": APP_ID,
+        "priority": priority,
+        "one": nodes[0]["id"],
+        "two": nodes[1]["id"],
+    }
+    labels = [n["aliases"].get("name") or n["label"] for n in nodes]
+    return FastPathResult(
+        reason="hit",
+        confidence=confidence,
+        template="host_to_host",
+        config=config,
+        reply=_format_reply(config, labels),
+    )
+
+
+class _Coverage:
+    """Process-wide fast-path counters (hits / attempts, fallback reasons)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.hits = 0
+        self.fallbacks: Dict[str, int] = {}
+
+    def record(self, result: FastPathResult) -> None:
+        with self._lock:
+            self.attempts += 1
+            if result.hit:
+                self.hits += 1
+            else:
+                self.fallbacks[result.reason] = self.fallbacks.get(result.reason, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": fast_path_enabled(),
+                "min_confidence": fast_path_min_confidence(),
+                "attempts": self.attempts,
+                "hits": self.hits,
+                "coverage": (self.hits / self.attempts) if self.attempts else None,
+                "fallbacks": dict(self.fallbacks),
+            }
+
+
+_coverage = _Coverage()
+
+
+def try_fast_path(user_text: str, network_info: Dict[str, Any]) -> FastPathResult:
+    """Compile `user_text` without the LLM if a template covers it confidently enough."""
+    result = compile_host_to_host(user_text, network_info, min_confidence=fast_path_min_confidence())
+    _coverage.record(result)
+    return result
+
+
+def fast_path_stats() -> Dict[str, Any]:
+    return _coverage.stats()
+
+
+def fast_path_timings(result: FastPathResult) -> Dict[str, float]:
+    return {
+        "fast_path_hit": 1.0 if result.hit else 0.0,
+        "fast_path_confidence": result.confidence,
+        "fast_path_coverage": _coverage.stats()["coverage"] or 0.0,
+    }
+
+
+__all__ = [
+    "FastPathResult",
+    "compile_host_to_host",
+    "fast_path_enabled",
+    "fast_path_min_confidence",
+    "fast_path_stats",
+    "fast_path_timings",
+    "intent_keywords",
+    "try_fast_path",
+]
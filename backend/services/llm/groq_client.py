@@ -3,89 +3,54 @@ from __future__ import annotations
 import json
 import os
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, Tuple
 
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, Groq
 
 from backend.services.llm.chat_history import add_message, get_history
-from backend.services.onos.onos_client import get_network_info
 from sqlalchemy.orm import Session
 
-from backend.services.devices.service import (
-    enrich_onos_devices_with_friendly_names,
-    enrich_onos_hosts_with_friendly_names,
-    sync_devices_from_onos,
-    sync_hosts_from_onos,
-)
-from database.rag.embedded_client import get_similar_samples
+from backend.services.llm.grounding import agather_grounding, gather_grounding, get_samples_json
+from backend.services.llm.response_cache import cache_timings, grounding_meta, lookup_reply, store_reply
+from backend.services.llm.topology_digest import network_context
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 DEFAULT_MODEL = "openai/gpt-oss-20b"
 
+_async_client: AsyncGroq | None = None
 
-def send_prompt(
-    user_prompt: str,
-    *,
-    db: Session | None = None,
-    model: str | None = None,
-    use_rag: bool = True,
-) -> Dict[str, Any]:
+
+def get_async_client() -> AsyncGroq:
     """
-    Build a grounded prompt with network state and nearby config examples,
-    then send it to the Groq chat completion API.
+    Shared AsyncGroq client (one HTTP connection pool for the whole process).
+    Reads GROQ_API_KEY at call time so tests/ops can set it after import.
     """
-    timings: Dict[str, float] = {}
-    t_start = time.perf_counter()
+    global _async_client
+    api_key = os.getenv("GROQ_API_KEY") or GROQ_API_KEY
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY is not set in environment")
+    if _async_client is None or _async_client.api_key != api_key:
+        _async_client = AsyncGroq(api_key=api_key)
+    return _async_client
 
-    if use_rag:
-        t_rag = time.perf_counter()
-        samples = get_samples_json(user_prompt, top_k=3)
-        timings["rag_seconds"] = time.perf_counter() - t_rag
-    else:
-        samples = {
-            "summary": [],
-            "raw_samples": [],
-            "note": "RAG disabled by request.",
-            "timings": {},
-        }
-
-    t_network = time.perf_counter()
-    if db is not None:
-        # Keep DB rows fresh so host MAC-based IDs match current topology.
-        try:
-            sync_devices_from_onos(db)
-        except Exception:
-            pass
-        try:
-            sync_hosts_from_onos(db)
-        except Exception:
-            pass
-
-    network_info = get_network_info()
-    if db is not None:
-        devices = (network_info or {}).get("devices") or []
-        hosts = (network_info or {}).get("hosts") or []
-        if isinstance(devices, dict):
-            devices = devices.get("devices") or []
-        if isinstance(hosts, dict):
-            hosts = hosts.get("hosts") or []
-        if isinstance(devices, list):
-            enrich_onos_devices_with_friendly_names(db, devices)
-        if isinstance(hosts, list):
-            enrich_onos_hosts_with_friendly_names(db, hosts)
-    timings["network_fetch_seconds"] = time.perf_counter() - t_network
 
+def _build_full_prompt(
+    user_prompt: str, samples: Dict[str, Any], network_info: Dict[str, Any], *, use_rag: bool
+) -> Tuple[str, Dict[str, Any]]:
+    """Return the grounded prompt and its response-cache metadata (see `grounding_meta`)."""
     samples_summary = json.dumps(samples.get("summary", []), indent=2)
     samples_raw = json.dumps(samples.get("raw_samples", []), indent=2)
     samples_note = str(samples.get("note", "Use these samples as guidance."))
-    rag_timings = samples.get("timings") or {}
+    network_text = network_context(network_info, user_prompt)
+    if network_text is None:
+        network_text = json.dumps(network_info, indent=2)
 
-    full_prompt = (
+    prompt = (
         "Here are the current network state:\n"
-        f"{json.dumps(network_info, indent=2)}\n\n"
+        f"{network_text}\n\n"
         f"Here are similar intents and configs retrieved from the library ({'enabled' if use_rag else 'disabled'}):\n"
         "Summary:\n"
         f"{samples_summary}\n"
@@ -95,82 +60,94 @@ def send_prompt(
         "Now process this user request and output ONOS Intent config JSON:\n"
         f"{user_prompt}\n"
     )
+    return prompt, grounding_meta(user_prompt, samples, network_info, network_text)
 
-    add_message("user", full_prompt)
 
-    if not GROQ_API_KEY:
-        raise RuntimeError("GROQ_API_KEY is not set in environment")
+def send_prompt(
+    user_prompt: str,
+    *,
+    db: Session | None = None,
+    model: str | None = None,
+    use_rag: bool = True,
+) -> Dict[str, Any]:
+    """
+    Build a grounded prompt with network state and nearby config examples,
+    then send it to the Groq chat completion API.
+    """
+    t_start = time.perf_counter()
+    samples, network_info, timings = gather_grounding(db, user_prompt, use_rag=use_rag)
+
+    full_prompt, cache_meta = _build_full_prompt(user_prompt, samples, network_info, use_rag=use_rag)
+    add_message("user", full_prompt)
 
-    client = Groq(api_key=GROQ_API_KEY)
     selected_model = model or DEFAULT_MODEL
+    reply, cache_ticket = lookup_reply(user_prompt, model=selected_model, use_rag=use_rag, meta=cache_meta)
 
     t_llm = time.perf_counter()
-    chat_completion = client.chat.completions.create(
-        messages=get_history(),
-        model=selected_model,
-    )
+    if reply is None:
+        # A cached reply needs no client (and no GROQ_API_KEY).
+        if not GROQ_API_KEY:
+            raise RuntimeError("GROQ_API_KEY is not set in environment")
+        client = Groq(api_key=GROQ_API_KEY)
+        chat_completion = client.chat.completions.create(
+            messages=get_history(),
+            model=selected_model,
+        )
+        reply = chat_completion.choices[0].message.content
+        store_reply(cache_ticket, reply)
     timings["llm_seconds"] = time.perf_counter() - t_llm
     timings["total_seconds"] = time.perf_counter() - t_start
+    timings.update(cache_timings(cache_ticket))
 
-    reply = chat_completion.choices[0].message.content
     add_message("assistant", reply)
 
     return {
         "content": reply,
         "model": selected_model,
         "use_rag": use_rag,
-        "timings": {**rag_timings, **timings},
+        "timings": timings,
     }
 
 
-def get_samples_json(user_prompt: str, *, top_k: int = 3) -> Dict[str, Any]:
-    """
-    Query pgvector for the closest config samples to the given intent and
-    return both a human-readable summary and the raw configs.
-    """
-    try:
-        result = get_similar_samples(user_prompt, top_k=top_k)
-    except Exception as exc:  # pragma: no cover - defensive path
-        return {
-            "summary": [],
-            "raw_samples": [],
-            "note": f"RAG lookup failed: {exc}",
-        }
-
-    matches: List[Dict[str, Any]] = result.get("matches", []) or []
-    summary: List[Dict[str, Any]] = []
-    raw_samples: List[Dict[str, Any]] = []
-
-    for match in matches:
-        summary.append(
-            {
-                "sample_id": match.get("sample_id"),
-                "category": match.get("category"),
-                "intent_text": match.get("intent_text"),
-            }
-        )
-        raw_samples.append(
-            {
-                "intent_text": match.get("intent_text"),
-                "config_json": match.get("config_json"),
-                "extra_metadata": match.get("extra_metadata"),
-            }
+async def asend_prompt(
+    user_prompt: str,
+    *,
+    db: Session | None = None,
+    model: str | None = None,
+    use_rag: bool = True,
+) -> Dict[str, Any]:
+    """Async `send_prompt`: non-blocking grounding and an AsyncGroq completion."""
+    t_start = time.perf_counter()
+    samples, network_info, timings = await agather_grounding(db, user_prompt, use_rag=use_rag)
+
+    full_prompt, cache_meta = _build_full_prompt(user_prompt, samples, network_info, use_rag=use_rag)
+    add_message("user", full_prompt)
+
+    selected_model = model or DEFAULT_MODEL
+    reply, cache_ticket = lookup_reply(user_prompt, model=selected_model, use_rag=use_rag, meta=cache_meta)
+
+    t_llm = time.perf_counter()
+    if reply is None:
+        client = get_async_client()
+        chat_completion = await client.chat.completions.create(
+            messages=get_history(),
+            model=selected_model,
         )
+        reply = chat_completion.choices[0].message.content
+        store_reply(cache_ticket, reply)
+    timings["llm_seconds"] = time.perf_counter() - t_llm
+    timings["total_seconds"] = time.perf_counter() - t_start
+    timings.update(cache_timings(cache_ticket))
 
-    note = (
-        "Retrieved similar samples from config_samples."
-        if summary
-        else "No similar samples found; proceed with general knowledge."
-    )
+    add_message("assistant", reply)
 
     return {
-        "summary": summary,
-        "raw_samples": raw_samples,
-        "note": note,
-        "timings": result.get("timings"),
+        "content": reply,
+        "model": selected_model,
+        "use_rag": use_rag,
+        "timings": timings,
     }
 
 
 # __all__ is a module-level variable that specifies the names can be exported when someone imports this module.
-__all__ = ["send_prompt"]
-
+__all__ = ["send_prompt", "asend_prompt", "get_async_client", "get_samples_json"]
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.services.devices.service import (
+    enrich_onos_devices_with_friendly_names,
+    enrich_onos_hosts_with_friendly_names,
+)
+from backend.services.onos.onos_client import aget_network_info, get_network_info
+from database.rag.embedded_client import aget_similar_samples, get_similar_samples
+
+# Shared grounding stage for `send_prompt` (/generate) and chat `send_message`:
+# retrieve similar config samples (RAG) and a friendly-name-enriched ONOS snapshot.
+
+
+_grounding_pool: ThreadPoolExecutor | None = None
+
+
+def _get_grounding_pool() -> ThreadPoolExecutor:
+    global _grounding_pool
+    if _grounding_pool is None:
+        # One slot per concurrent chat turn; the embedding itself is bounded by EMBEDDING_WORKERS.
+        workers = int(os.getenv("GROUNDING_WORKERS", "8"))
+        _grounding_pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="grounding")
+    return _grounding_pool
+
+
+def _rag_disabled() -> Dict[str, Any]:
+    return {"summary": [], "raw_samples": [], "note": "RAG disabled by request.", "timings": {}}
+
+
+def _samples_from_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    matches: List[Dict[str, Any]] = result.get("matches", []) or []
+    summary: List[Dict[str, Any]] = []
+    raw_samples: List[Dict[str, Any]] = []
+
+    for match in matches:
+        summary.append(
+            {
+                "sample_id": match.get("sample_id"),
+                "category": match.get("category"),
+                "intent_text": match.get("intent_text"),
+            }
+        )
+        raw_samples.append(
+            {
+                "intent_text": match.get("intent_text"),
+                "config_json": match.get("config_json"),
+                "extra_metadata": match.get("extra_metadata"),
+            }
+        )
+
+    note = (
+        "Retrieved similar samples from config_samples."
+        if summary
+        else "No similar samples found; proceed with general knowledge."
+    )
+
+    return {
+        "summary": summary,
+        "raw_samples": raw_samples,
+        "note": note,
+        "timings": result.get("timings"),
+        "embedding": result.get("embedding"),
+    }
+
+
+def get_samples_json(user_prompt: str, *, top_k: int = 3) -> Dict[str, Any]:
+    """
+    Query pgvector for the closest config samples to the given intent and
+    return both a human-readable summary and the raw configs.
+    """
+    try:
+        result = get_similar_samples(user_prompt, top_k=top_k)
+    except Exception as exc:  # pragma: no cover - defensive path
+        return {
+            "summary": [],
+            "raw_samples": [],
+            "note": f"RAG lookup failed: {exc}",
+        }
+    return _samples_from_result(result)
+
+
+async def aget_samples_json(user_prompt: str, *, top_k: int = 3) -> Dict[str, Any]:
+    try:
+        result = await aget_similar_samples(user_prompt, top_k=top_k)
+    except Exception as exc:  # pragma: no cover - defensive path
+        return {
+            "summary": [],
+            "raw_samples": [],
+            "note": f"RAG lookup failed: {exc}",
+        }
+    return _samples_from_result(result)
+
+
+def enrich_network_info(db: Session, network_info: Dict[str, Any]) -> None:
+    """
+    Attach DB friendly names to the snapshot's devices/hosts in place, so the
+    LLM can map "h1" -> the current (MAC-based) ONOS host.id.
+    """
+    devices = (network_info or {}).get("devices") or []
+    hosts = (network_info or {}).get("hosts") or []
+    if isinstance(devices, dict):
+        devices = devices.get("devices") or []
+    if isinstance(hosts, dict):
+        hosts = hosts.get("hosts") or []
+    if isinstance(devices, list):
+        enrich_onos_devices_with_friendly_names(db, devices)
+    if isinstance(hosts, list):
+        enrich_onos_hosts_with_friendly_names(db, hosts)
+
+
+def _rag_branch(user_text: str, use_rag: bool) -> Tuple[Dict[str, Any], float]:
+    t0 = time.perf_counter()
+    samples = get_samples_json(user_text, top_k=3) if use_rag else _rag_disabled()
+    return samples, time.perf_counter() - t0
+
+
+def _network_branch(db: Session | None) -> Tuple[Dict[str, Any], float]:
+    t0 = time.perf_counter()
+    # DB rows are kept fresh by the background topology sync (backend/services/devices/sync_worker.py).
+    network_info = get_network_info()
+    if db is not None:
+        enrich_network_info(db, network_info)
+    return network_info, time.perf_counter() - t0
+
+
+async def _anetwork_branch(db: Session | None) -> Tuple[Dict[str, Any], float]:
+    t0 = time.perf_counter()
+    network_info = await aget_network_info()
+    if db is not None:
+        # The name index may need one SELECT on first use / reload.
+        await asyncio.to_thread(enrich_network_info, db, network_info)
+    return network_info, time.perf_counter() - t0
+
+
+def _merge_timings(
+    samples: Dict[str, Any],
+    rag_seconds: float,
+    net_seconds: float,
+    critical_path: float,
+    use_rag: bool,
+) -> Dict[str, float]:
+    timings: Dict[str, float] = dict(samples.get("timings") or {})
+    if use_rag:
+        timings["rag_seconds"] = rag_seconds
+    timings["network_fetch_seconds"] = net_seconds
+    # Wall time of the grounding stage; ~max(rag, network) when the branches overlap.
+    timings["grounding_seconds"] = critical_path
+    timings["grounding_overlap_seconds"] = max(0.0, rag_seconds + net_seconds - critical_path)
+    return timings
+
+
+class GroundingRun:
+    """
+    One turn's grounding, in two steps so a caller can act on the ONOS snapshot
+    before the RAG result is needed (the chat fast path).
+
+    RAG retrieval (embedding + pgvector, own DB session) is submitted to the
+    grounding pool on construction; `fetch_network` fetches and enriches the
+    snapshot on the calling thread with `db`, so the request session is only
+    ever used from that thread; `finish` waits for RAG. A caller that no longer
+    needs the samples just drops the run (a queued RAG branch is cancelled, a
+    running one finishes unobserved).
+    """
+
+    __slots__ = ("use_rag", "t_start", "network_info", "net_seconds", "_rag_future")
+
+    def __init__(self, user_text: str, *, use_rag: bool) -> None:
+        self.use_rag = use_rag
+        self.t_start = time.perf_counter()
+        self.network_info: Dict[str, Any] | None = None
+        self.net_seconds = 0.0
+        self._rag_future = _get_grounding_pool().submit(_rag_branch, user_text, use_rag) if use_rag else None
+
+    def fetch_network(self, db: Session | None) -> Dict[str, Any]:
+        if self.network_info is None:
+            self.network_info, self.net_seconds = _network_branch(db)
+        return self.network_info
+
+    def abandon(self) -> None:
+        if self._rag_future is not None:
+            self._rag_future.cancel()
+
+    def finish(self, db: Session | None) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float]]:
+        network_info = self.fetch_network(db)
+        if self._rag_future is not None:
+            samples, rag_seconds = self._rag_future.result()
+        else:
+            samples, rag_seconds = _rag_disabled(), 0.0
+        critical_path = time.perf_counter() - self.t_start
+        timings = _merge_timings(samples, rag_seconds, self.net_seconds, critical_path, self.use_rag)
+        return samples, network_info, timings
+
+
+class AsyncGroundingRun:
+    """Async `GroundingRun`: the RAG branch is a task on the running event loop."""
+
+    __slots__ = ("use_rag", "t_start", "network_info", "net_seconds", "_rag_task")
+
+    def __init__(self, user_text: str, *, use_rag: bool) -> None:
+        self.use_rag = use_rag
+        self.t_start = time.perf_counter()
+        self.network_info: Dict[str, Any] | None = None
+        self.net_seconds = 0.0
+        self._rag_task = asyncio.ensure_future(self._rag(user_text))
+
+    async def _rag(self, user_text: str) -> Tuple[Dict[str, Any], float]:
+        t0 = time.perf_counter()
+        samples = await aget_samples_json(user_text, top_k=3) if self.use_rag else _rag_disabled()
+        return samples, time.perf_counter() - t0
+
+    async def fetch_network(self, db: Session | None) -> Dict[str, Any]:
+        if self.network_info is None:
+            self.network_info, self.net_seconds = await _anetwork_branch(db)
+        return self.network_info
+
+    def abandon(self) -> None:
+        # Not cancelled: the embedding may already be in a shared micro-batch. Its result is dropped.
+        self._rag_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def finish(self, db: Session | None) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float]]:
+        network_info = await self.fetch_network(db)
+        samples, rag_seconds = await self._rag_task
+        critical_path = time.perf_counter() - self.t_start
+        timings = _merge_timings(samples, rag_seconds, self.net_seconds, critical_path, self.use_rag)
+        return samples, network_info, timings
+
+
+def gather_grounding(
+    db: Session | None,
+    user_text: str,
+    *,
+    use_rag: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float]]:
+    """
+    Return `(samples, network_info, timings)` for one user turn; RAG and the
+    ONOS snapshot are fetched concurrently (see `GroundingRun`).
+    """
+    return GroundingRun(user_text, use_rag=use_rag).finish(db)
+
+
+async def agather_grounding(
+    db: Session | None,
+    user_text: str,
+    *,
+    use_rag: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float]]:
+    """Async `gather_grounding`: both branches run concurrently on the event loop."""
+    return await AsyncGroundingRun(user_text, use_rag=use_rag).finish(db)
+
+
+__all__ = [
+    "AsyncGroundingRun",
+    "GroundingRun",
+    "get_samples_json",
+    "aget_samples_json",
+    "enrich_network_info",
+    "gather_grounding",
+    "agather_grounding",
+]
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple
+
+from backend.services.llm.context_selector import mentioned_nodes
+from backend.services.llm.fast_path import intent_keywords
+from backend.services.llm.semantic_cache import request_numbers, semantic_cache, semantic_cache_enabled
+from backend.services.llm.topology_digest import topology_fingerprint
+
+# Cache of LLM replies in front of the Groq call (chat and /generate).
+#
+# Key = normalised user text + model + use_rag + grounding fingerprint, where the
+# fingerprint hashes the retrieved sample ids and the exact network context that
+# went into the prompt (the topology digest). When the topology changes the
+# digest changes, so old entries simply stop matching and age out (TTL / LRU).
+#
+# Follow-ups that lean on earlier turns ("do the same for h3", "undo that") are
+# never cached: their meaning depends on the conversation, not just the text.
+#
+# On an exact miss, the semantic cache (semantic_cache.py) may still answer a
+# paraphrase. `lookup_reply` / `store_reply` drive both tiers.
+
+_REFERENTIAL = re.compile(
+    r"\b(same|again|those|them|previous|above|earlier|undo|revert|instead)\b",
+    re.IGNORECASE,
+)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def response_cache_enabled() -> bool:
+    return os.getenv("LLM_RESPONSE_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def normalize_intent(text: str) -> str:
+    """Case/whitespace/trailing-punctuation insensitive form of the request."""
+    return re.sub(r"\s+", " ", text.strip().lower()).rstrip(" .!?")
+
+
+def is_cacheable(text: str) -> bool:
+    return bool(text.strip()) and not _REFERENTIAL.search(text)
+
+
+def _sample_ids(samples: Dict[str, Any]) -> Iterable[str]:
+    return sorted(str(s.get("sample_id")) for s in samples.get("summary") or [] if isinstance(s, dict))
+
+
+def grounding_fingerprint(samples: Dict[str, Any], network_text: str) -> str:
+    payload = json.dumps([list(_sample_ids(samples)), network_text], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def response_key(user_text: str, *, model: str, use_rag: bool, fingerprint: str) -> str | None:
+    """Cache key for this request, or None when it must not be cached."""
+    if not response_cache_enabled() or not is_cacheable(user_text):
+        return None
+    payload = json.dumps([normalize_intent(user_text), model, bool(use_rag), fingerprint], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU with a per-entry TTL."""
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] >= self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: str) -> None:
+        if not value:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=int(_env_float("LLM_RESPONSE_CACHE_MAX_ENTRIES", 512)),
+    ttl_seconds=_env_float("LLM_RESPONSE_CACHE_TTL_SECONDS", 600),
+)
+
+
+def grounding_meta(
+    user_text: str, samples: Dict[str, Any], network_info: Dict[str, Any], network_text: str
+) -> Dict[str, Any]:
+    """What the cache tiers need to know about one grounded request."""
+    return {
+        "fingerprint": grounding_fingerprint(samples, network_text),
+        "topology": topology_fingerprint(network_info),
+        "embedding": samples.get("embedding"),
+        "nodes": mentioned_nodes(network_info, user_text),
+    }
+
+
+def lookup_reply(
+    user_text: str, *, model: str, use_rag: bool, meta: Dict[str, Any]
+) -> Tuple[str | None, Dict[str, Any]]:
+    """
+    Return `(cached reply or None, ticket)`. Pass the ticket to `store_reply`
+    after an LLM call and to `cache_timings` for the response.
+    """
+    ticket: Dict[str, Any] = {
+        "key": response_key(user_text, model=model, use_rag=use_rag, fingerprint=meta["fingerprint"]),
+        "semantic": None,
+    }
+    if ticket["key"] is None:
+        return None, ticket
+
+    reply = response_cache.get(ticket["key"])
+    ticket["hit"] = reply is not None
+    if reply is not None:
+        return reply, ticket
+
+    if semantic_cache_enabled() and meta.get("embedding") is not None:
+        nodes = meta["nodes"]
+        ticket["semantic"] = {
+            "embedding": meta["embedding"],
+            "scope": (model, bool(use_rag), meta["topology"]),
+            "nodes": nodes,
+            "numbers": request_numbers(user_text, nodes),
+            "keywords": intent_keywords(user_text),
+        }
+        found = semantic_cache.lookup(
+            meta["embedding"],
+            scope=ticket["semantic"]["scope"],
+            nodes=nodes,
+            numbers=ticket["semantic"]["numbers"],
+            keywords=ticket["semantic"]["keywords"],
+        )
+        ticket["semantic_hit"] = found is not None
+        if found is not None:
+            reply, ticket["semantic_similarity"] = found
+            response_cache.put(ticket["key"], reply)
+            return reply, ticket
+    return None, ticket
+
+
+def store_reply(ticket: Dict[str, Any] | None, reply: str | None) -> None:
+    """Remember a freshly generated reply in both tiers."""
+    if not reply or ticket is None or ticket["key"] is None:
+        return
+    response_cache.put(ticket["key"], reply)
+    semantic = ticket.get("semantic")
+    if semantic is not None:
+        semantic_cache.store(
+            semantic["embedding"],
+            scope=semantic["scope"],
+            nodes=semantic["nodes"],
+            numbers=semantic["numbers"],
+            keywords=semantic["keywords"],
+            reply=reply,
+        )
+
+
+def cache_timings(ticket: Dict[str, Any] | None) -> Dict[str, float]:
+    """`timings` fields for one request; empty when the request bypassed the cache."""
+    if ticket is None or ticket.get("key") is None:
+        return {}
+    out = {
+        "response_cache_hit": 1.0 if ticket.get("hit") else 0.0,
+        "response_cache_hit_ratio": response_cache.stats()["hit_ratio"] or 0.0,
+    }
+    if "semantic_hit" in ticket:
+        out["semantic_cache_hit"] = 1.0 if ticket["semantic_hit"] else 0.0
+        if ticket["semantic_hit"]:
+            out["semantic_cache_similarity"] = ticket["semantic_similarity"]
+    return out
+
+
+__all__ = [
+    "ResponseCache",
+    "cache_timings",
+    "grounding_fingerprint",
+    "grounding_meta",
+    "is_cacheable",
+    "lookup_reply",
+    "normalize_intent",
+    "response_cache",
+    "response_cache_enabled",
+    "response_key",
+    "store_reply",
+]
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Near-duplicate ("paraphrase") reply cache.
+#
+# Each generated reply is stored with the RAG query embedding of its request
+# (all-mpnet-base-v2, already computed by embedded_client), the nodes the
+# request mentioned, the numbers it contained and its action/negation keywords
+# (fast_path.intent_keywords). A later request under the same scope (model,
+# use_rag, topology fingerprint) whose embedding is within
+# LLM_SEMANTIC_CACHE_THRESHOLD cosine similarity, mentions the same kinds of
+# nodes in the same order, carries the same numbers (priorities, ports, ...) and
+# the same keywords (so "block h1 from h2" never reuses "allow h1 to reach h2",
+# which embeds just as close) is answered from the stored reply with the old nodes' ids/MACs/IPs/names
+# swapped for the new ones ("h1 <-> h2" becomes "h3 <-> h4").
+
+_NUMBER = re.compile(r"(?<![\w.:])\d+(?:\.\d+)?(?![\w.:])")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def semantic_cache_enabled() -> bool:
+    return os.getenv("LLM_SEMANTIC_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _replace_token(text: str, old: str, new: str) -> str:
+    # Whole-token replace: "h1" must not touch "h10", "10.0.0.1" not "10.0.0.12".
+    return re.sub(rf"(?<![\w.:]){re.escape(old)}(?![\w])", lambda _: new, text)
+
+
+def request_numbers(user_text: str, nodes: Sequence[Dict[str, Any]]) -> Tuple[str, ...]:
+    """Numeric literals in the request that are not part of a node label (h1, 10.0.0.1)."""
+    text = user_text.lower()
+    for node in nodes:
+        text = _replace_token(text, node["label"], " ")
+    return tuple(sorted(_NUMBER.findall(text)))
+
+
+def substitute_nodes(
+    reply: str, old_nodes: Sequence[Dict[str, Any]], new_nodes: Sequence[Dict[str, Any]]
+) -> str:
+    """Rewrite `reply` from the old request's nodes to the new ones (pairwise, in mention order)."""
+    pairs: List[Tuple[str, str]] = []
+    for old, new in zip(old_nodes, new_nodes):
+        for field in ("id", "mac", "ip", "name"):
+            a, b = old["aliases"].get(field), new["aliases"].get(field)
+            if a and b and a != b:
+                pairs.append((a, b))
+    # Longest first (a host id contains its MAC), via placeholders so swaps (h1<->h2) don't collide.
+    pairs.sort(key=lambda p: len(p[0]), reverse=True)
+    out = reply
+    for i, (old, _) in enumerate(pairs):
+        out = _replace_token(out, old, f"\x00{i}\x00")
+    for i, (_, new) in enumerate(pairs):
+        out = out.replace(f"\x00{i}\x00", new)
+    return out
+
+
+class _Entry:
+    __slots__ = ("vector", "scope", "kinds", "numbers", "keywords", "nodes", "reply", "stored_at")
+
+    def __init__(self, vector, scope, kinds, numbers, keywords, nodes, reply) -> None:
+        self.vector = vector
+        self.scope = scope
+        self.kinds = kinds
+        self.numbers = numbers
+        self.keywords = keywords
+        self.nodes = nodes
+        self.reply = reply
+        self.stored_at = time.monotonic()
+
+
+class SemanticCache:
+    """In-process LRU of (embedding, nodes, reply) with TTL and a cosine threshold."""
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float, threshold: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> np.ndarray | None:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else None
+
+    def lookup(
+        self,
+        embedding: Sequence[float],
+        *,
+        scope: Tuple[Any, ...],
+        nodes: Sequence[Dict[str, Any]],
+        numbers: Tuple[str, ...],
+        keywords: frozenset,
+    ) -> Tuple[str, float] | None:
+        """Return `(reply rewritten for nodes, similarity)` for the best match, or None."""
+        query = self._unit(embedding)
+        if query is None:
+            return None
+        kinds = tuple(n["kind"] for n in nodes)
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if now - e.stored_at >= self.ttl_seconds]:
+                del self._entries[key]
+            candidates = [
+                (key, e)
+                for key, e in self._entries.items()
+                if e.scope == scope and e.kinds == kinds and e.numbers == numbers and e.keywords == keywords
+            ]
+            if not candidates:
+                self.misses += 1
+                return None
+            sims = np.stack([e.vector for _, e in candidates]) @ query
+            best = int(np.argmax(sims))
+            similarity = float(sims[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return substitute_nodes(entry.reply, entry.nodes, nodes), similarity
+
+    def store(
+        self,
+        embedding: Sequence[float],
+        *,
+        scope: Tuple[Any, ...],
+        nodes: Sequence[Dict[str, Any]],
+        numbers: Tuple[str, ...],
+        keywords: frozenset,
+        reply: str,
+    ) -> None:
+        vector = self._unit(embedding)
+        if vector is None or not reply:
+            return
+        entry = _Entry(vector, scope, tuple(n["kind"] for n in nodes), numbers, keywords, list(nodes), reply)
+        with self._lock:
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
+
+
+semantic_cache = SemanticCache(
+    max_entries=int(_env_float("LLM_SEMANTIC_CACHE_MAX_ENTRIES", 512)),
+    ttl_seconds=_env_float("LLM_RESPONSE_CACHE_TTL_SECONDS", 600),
+    threshold=_env_float("LLM_SEMANTIC_CACHE_THRESHOLD", 0.92),
+)
+
+
+__all__ = [
+    "SemanticCache",
+    "request_numbers",
+    "semantic_cache",
+    "semantic_cache_enabled",
+    "substitute_nodes",
+]
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Mapping, Tuple
+
+# Token counting for context budgeting.
+#
+# Counts with the chat model's own Hugging Face tokenizer (`tokenizers`), fetched
+# from the Hub once per model and cached like the embedding model. The app loads
+# it at startup in a thread (`load_tokenizer`); counting never waits for a load
+# in progress. Until the tokenizer is available (still loading, or offline) it
+# falls back to ~4 chars per token, and a failed load is retried after a backoff.
+#
+# CHAT_TOKENIZER overrides the choice: a Hub repo id or a local tokenizer.json.
+
+# Chat-format overhead per message (role + separators), as in OpenAI's cookbook.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Substring of the Groq model id -> Hub repo with the same tokenizer (ungated).
+_TOKENIZER_REPOS = (
+    ("gpt-oss", "openai/gpt-oss-20b"),
+    ("llama", "NousResearch/Meta-Llama-3-8B-Instruct"),
+    ("qwen", "Qwen/Qwen3-32B"),
+)
+_DEFAULT_REPO = "openai/gpt-oss-20b"
+
+# After a failed load, retry after 30 s, doubling up to an hour.
+_RETRY_SECONDS = 30.0
+_MAX_RETRY_SECONDS = 3600.0
+
+_encoders: Dict[str, Callable[[str], int]] = {}
+_failures: Dict[str, Tuple[float, float]] = {}  # source -> (monotonic retry time, backoff)
+_lock = threading.Lock()
+
+
+def _heuristic(text: str) -> int:
+    # Very rough: ~4 chars per token in English.
+    return max(1, int(len(text) / 4))
+
+
+def _tokenizer_source(model: str | None) -> str:
+    override = os.getenv("CHAT_TOKENIZER")
+    if override:
+        return override
+    name = (model or "").lower()
+    for needle, repo in _TOKENIZER_REPOS:
+        if needle in name:
+            return repo
+    return _DEFAULT_REPO
+
+
+def _load_encoder(source: str) -> Callable[[str], int] | None:
+    try:
+        from tokenizers import Tokenizer
+
+        if Path(source).is_file():
+            tokenizer = Tokenizer.from_file(source)
+        else:
+            tokenizer = Tokenizer.from_pretrained(source)
+    except Exception as exc:
+        print(f"Tokenizer {source} unavailable, estimating tokens from length: {exc}")
+        return None
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def _retry_due(source: str) -> bool:
+    failed = _failures.get(source)
+    return failed is None or time.monotonic() >= failed[0]
+
+
+def _encoder(model: str | None, *, wait: bool = False) -> Callable[[str], int] | None:
+    """
+    The loaded encoder for `model`, loading it if needed. With `wait=False`
+    returns None instead of blocking while another thread is loading.
+    """
+    source = _tokenizer_source(model)
+    encode = _encoders.get(source)
+    if encode is not None:
+        return encode
+    if not _retry_due(source) or not _lock.acquire(blocking=wait):
+        return None
+    try:
+        if source not in _encoders and _retry_due(source):
+            encode = _load_encoder(source)
+            if encode is not None:
+                _encoders[source] = encode
+                _failures.pop(source, None)
+            else:
+                previous = _failures.get(source)
+                backoff = min(_MAX_RETRY_SECONDS, 2 * previous[1]) if previous else _RETRY_SECONDS
+                _failures[source] = (time.monotonic() + backoff, backoff)
+                print(f"Retrying tokenizer {source} in {backoff:.0f}s")
+        return _encoders.get(source)
+    finally:
+        _lock.release()
+
+
+def load_tokenizer(model: str | None) -> str:
+    """Load `model`'s tokenizer now (blocking; run it off the event loop) and return `tokenizer_name`."""
+    _encoder(model, wait=True)
+    return tokenizer_name(model)
+
+
+def tokenizer_name(model: str | None) -> str:
+    """Which tokenizer `count_tokens` uses for `model` ("heuristic" until it is loaded)."""
+    return _tokenizer_source(model) if _encoders.get(_tokenizer_source(model)) is not None else "heuristic"
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    if not text:
+        return 0
+    encode = _encoder(model)
+    return encode(text) if encode is not None else _heuristic(text)
+
+
+def count_message_tokens(message: Mapping[str, Any], model: str | None = None) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + count_tokens(str(message.get("content") or ""), model)
+
+
+def count_messages_tokens(messages: Iterable[Mapping[str, Any]], model: str | None = None) -> int:
+    return sum(count_message_tokens(m, model) for m in messages)
+
+
+__all__ = [
+    "MESSAGE_OVERHEAD_TOKENS",
+    "count_message_tokens",
+    "count_messages_tokens",
+    "count_tokens",
+    "load_tokenizer",
+    "tokenizer_name",
+]
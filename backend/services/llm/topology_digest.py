@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Tuple
+
+from backend.services.llm.context_selector import ContextFocus, focus_min_nodes, select_context
+
+# Compact, deterministic text view of an ONOS snapshot for LLM grounding.
+#
+# The raw snapshot (every device annotation, every flow) dominates the prompt on
+# a real network. The digest keeps what intent generation actually needs:
+# host ids/IPs/attachment points, the switch adjacency list and a one-line
+# summary per intent. Flows are only included when the request is about them.
+# On larger networks (TOPOLOGY_FOCUS_MIN_NODES) the digest is narrowed to the
+# nodes the request mentions, see context_selector.py.
+#
+# Output is sorted, so the same topology always renders to the same text.
+
+_FLOW_KEYWORDS = re.compile(
+    r"\b(flows?|flow[- ]?rules?|rules?|tables?|packets?|bytes?|counters?|statistics|stats|"
+    r"drop(?:ped|s)?|troubleshoot\w*|debug\w*)\b",
+    re.IGNORECASE,
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def digest_enabled() -> bool:
+    # TOPOLOGY_DIGEST=0 sends the raw ONOS snapshot instead (for accuracy A/B runs).
+    return os.getenv("TOPOLOGY_DIGEST", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _caps() -> Dict[str, int]:
+    return {
+        "hosts": _env_int("TOPOLOGY_DIGEST_MAX_HOSTS", 256),
+        "switches": _env_int("TOPOLOGY_DIGEST_MAX_SWITCHES", 128),
+        "intents": _env_int("TOPOLOGY_DIGEST_MAX_INTENTS", 64),
+        "flows": _env_int("TOPOLOGY_DIGEST_MAX_FLOWS", 32),
+        "chars": _env_int("TOPOLOGY_DIGEST_MAX_CHARS", 12000),
+    }
+
+
+def needs_flows(user_text: str | None) -> bool:
+    """Flows are only worth their size when the user asks about rules/counters."""
+    return bool(user_text) and bool(_FLOW_KEYWORDS.search(user_text or ""))
+
+
+def _items(network_info: Dict[str, Any], resource: str) -> List[Dict[str, Any]]:
+    value = (network_info or {}).get(resource) or []
+    if isinstance(value, dict):
+        value = value.get(resource) or []
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def _natural_key(value: str | None) -> Tuple[Any, ...]:
+    # "h2" < "h10"; None sorts last.
+    if not value:
+        return (1,)
+    return (0, *[(0, int(tok)) if tok.isdigit() else (1, tok) for tok in re.split(r"(\d+)", value) if tok])
+
+
+def _cap(lines: List[str], limit: int, what: str) -> List[str]:
+    if len(lines) <= limit:
+        return lines
+    return lines[:limit] + [f"... {len(lines) - limit} more {what} omitted"]
+
+
+def _criteria(selector: Dict[str, Any] | None) -> str:
+    parts: List[str] = []
+    for c in (selector or {}).get("criteria") or []:
+        ctype = c.get("type", "?")
+        values = [str(v) for k, v in sorted(c.items()) if k != "type"]
+        parts.append(f"{ctype}={','.join(values)}" if values else ctype)
+    return " ".join(parts) or "*"
+
+
+def _instructions(treatment: Dict[str, Any] | None) -> str:
+    parts: List[str] = []
+    for i in (treatment or {}).get("instructions") or []:
+        itype = i.get("type", "?")
+        values = [str(v) for k, v in sorted(i.items()) if k != "type"]
+        parts.append(f"{itype}:{','.join(values)}" if values else itype)
+    return " ".join(parts) or "DROP"
+
+
+def build_topology_digest(
+    network_info: Dict[str, Any],
+    *,
+    include_flows: bool = False,
+    focus: ContextFocus | None = None,
+) -> str:
+    """
+    Render `network_info` (as returned by `get_network_info` and enriched with
+    friendly names) as a compact, line-oriented digest.
+
+    With a `focus` (see context_selector.py) only the focused hosts/switches,
+    the intents touching them and their flows are listed; the rest is counted.
+    """
+    caps = _caps()
+    devices = _items(network_info, "devices")
+    hosts = _items(network_info, "hosts")
+    links = _items(network_info, "links")
+    intents = _items(network_info, "intents")
+
+    switch_name: Dict[str, str] = {}
+    for d in devices:
+        if d.get("id"):
+            switch_name[d["id"]] = d.get("friendly_name") or d["id"]
+    host_name: Dict[str, str] = {}
+    for h in hosts:
+        if h.get("id"):
+            host_name[h["id"]] = h.get("friendly_name") or h["id"]
+
+    def sw(device_id: str | None) -> str:
+        return switch_name.get(device_id or "", device_id or "?")
+
+    def in_focus_host(host_id: str | None) -> bool:
+        return focus is None or host_id in focus.host_ids
+
+    def in_focus_switch(device_id: str | None) -> bool:
+        return focus is None or device_id in focus.switch_ids
+
+    out: List[str] = []
+    omitted: Dict[str, int] = {}
+    if focus is not None:
+        out.append("# focus: " + ", ".join(focus.mentions))
+        for a, b, path in focus.paths:
+            out.append(f"path {a} -> {b}: " + " ".join(sw(p) for p in path))
+
+    # Hosts: the id (MAC/VLAN) is what HostToHostIntent one/two expect.
+    out.append("# hosts: name id(MAC/VLAN) ips switch/port")
+    host_lines: List[Tuple[Tuple[Any, ...], str]] = []
+    for h in hosts:
+        if not in_focus_host(h.get("id")):
+            omitted["hosts"] = omitted.get("hosts", 0) + 1
+            continue
+        hid = h.get("id") or "?"
+        ips = ",".join(sorted(h.get("ipAddresses") or [])) or "-"
+        locations = h.get("locations") or []
+        attach = ",".join(
+            sorted(f"{sw(loc.get('elementId'))}/{loc.get('port', '?')}" for loc in locations if isinstance(loc, dict))
+        ) or "-"
+        name = h.get("friendly_name") or "-"
+        host_lines.append(((_natural_key(h.get("friendly_name")), hid), f"{name} {hid} {ips} {attach}"))
+    out.extend(_cap([line for _, line in sorted(host_lines)], caps["hosts"], "hosts"))
+
+    # Switches + adjacency: "port>peer/peer_port" per outgoing link.
+    adjacency: Dict[str, List[Tuple[str, str, str, str]]] = {}
+    for link in links:
+        src = link.get("src") or {}
+        dst = link.get("dst") or {}
+        if not src.get("device") or not dst.get("device"):
+            continue
+        adjacency.setdefault(src["device"], []).append(
+            (str(src.get("port", "?")), sw(dst["device"]), str(dst.get("port", "?")), dst["device"])
+        )
+
+    out.append("# switches: name id state | port>peer/port")
+    switch_lines: List[Tuple[Tuple[Any, ...], str]] = []
+    for d in devices:
+        did = d.get("id")
+        if not did:
+            continue
+        if not in_focus_switch(did):
+            omitted["switches"] = omitted.get("switches", 0) + 1
+            continue
+        state = "up" if d.get("available", True) else "down"
+        name = d.get("friendly_name") or "-"
+        edges = sorted(adjacency.get(did, []), key=lambda e: (_natural_key(e[0]), e[1], e[2]))
+        shown = [e for e in edges if in_focus_switch(e[3])]
+        links_txt = " ".join(f"{p}>{peer}/{pp}" for p, peer, pp, _ in shown) or "-"
+        if len(shown) < len(edges):
+            links_txt += f" +{len(edges) - len(shown)} links"
+        switch_lines.append(((_natural_key(d.get("friendly_name")), did), f"{name} {did} {state} | {links_txt}"))
+    out.extend(_cap([line for _, line in sorted(switch_lines)], caps["switches"], "switches"))
+
+    out.append("# intents: key type state app endpoints")
+    intent_lines: List[str] = []
+    for it in intents:
+        raw_endpoints = [str(r) for r in (it.get("resources") or [])]
+        raw_endpoints += [str(it[field]) for field in ("one", "two") if it.get(field)]
+        if focus is not None and not any(r in focus.host_ids for r in raw_endpoints):
+            omitted["intents"] = omitted.get("intents", 0) + 1
+            continue
+        endpoints = [host_name.get(r, r) for r in raw_endpoints]
+        intent_lines.append(
+            f"{it.get('key') or it.get('id') or '?'} {it.get('type', '?')} {it.get('state', '?')} "
+            f"{it.get('appId', '?')} {','.join(endpoints) or '-'}"
+        )
+    out.extend(_cap(sorted(intent_lines, key=_natural_key), caps["intents"], "intents"))
+
+    if include_flows:
+        flows = _items(network_info, "flows")
+        per_device: Dict[str, Dict[str, int]] = {}
+        detail: List[Tuple[Tuple[Any, ...], str]] = []
+        for f in flows:
+            if not in_focus_switch(f.get("deviceId")):
+                omitted["flows"] = omitted.get("flows", 0) + 1
+                continue
+            device = sw(f.get("deviceId"))
+            state = str(f.get("state", "?")).lower()
+            counts = per_device.setdefault(device, {})
+            counts[state] = counts.get(state, 0) + 1
+            # Core flows are ONOS' own LLDP/ARP punts; list only the interesting ones.
+            if f.get("appId") == "org.onosproject.core":
+                continue
+            line = (
+                f"{device} p{f.get('priority', '?')} {f.get('appId', '?')} {state} "
+                f"{_criteria(f.get('selector'))} -> {_instructions(f.get('treatment'))} "
+                f"pkts={f.get('packets', 0)} bytes={f.get('bytes', 0)}"
+            )
+            detail.append(((_natural_key(device), -int(f.get("priority") or 0), line), line))
+
+        out.append("# flows per switch: name state=count")
+        for device in sorted(per_device, key=_natural_key):
+            counts = per_device[device]
+            out.append(f"{device} " + " ".join(f"{k}={counts[k]}" for k in sorted(counts)))
+        out.append("# flows (non-core): switch priority app state selector -> treatment counters")
+        out.extend(_cap([line for _, line in sorted(detail)], caps["flows"], "flows"))
+
+    if omitted:
+        out.append("# not shown (outside focus): " + " ".join(f"{k}={omitted[k]}" for k in sorted(omitted)))
+
+    errors = (network_info or {}).get("errors") or {}
+    if errors:
+        out.append("# unavailable: " + "; ".join(f"{k}: {errors[k]}" for k in sorted(errors)))
+
+    text = "\n".join(out)
+    if caps["chars"] and len(text) > caps["chars"]:
+        text = text[: caps["chars"]].rsplit("\n", 1)[0] + "\n... digest truncated"
+    return text
+
+
+def topology_fingerprint(network_info: Dict[str, Any]) -> str:
+    """
+    Stable hash of the fabric itself (switches, links, host ids/IPs/attachment
+    points). Unlike the digest it ignores intents and flows, which change every
+    time a config is applied.
+    """
+    devices = sorted((d.get("id") or "", bool(d.get("available", True))) for d in _items(network_info, "devices"))
+    links = sorted(
+        (
+            (l.get("src") or {}).get("device") or "",
+            str((l.get("src") or {}).get("port", "")),
+            (l.get("dst") or {}).get("device") or "",
+            str((l.get("dst") or {}).get("port", "")),
+        )
+        for l in _items(network_info, "links")
+    )
+    hosts = sorted(
+        (
+            h.get("id") or "",
+            sorted(h.get("ipAddresses") or []),
+            sorted(f"{loc.get('elementId')}/{loc.get('port')}" for loc in h.get("locations") or [] if isinstance(loc, dict)),
+        )
+        for h in _items(network_info, "hosts")
+    )
+    payload = json.dumps([devices, links, hosts], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def network_context(network_info: Dict[str, Any], user_text: str | None) -> str | None:
+    """Digest for the prompt, or None when TOPOLOGY_DIGEST=0 (caller renders the raw snapshot)."""
+    if not digest_enabled():
+        return None
+    focus = None
+    nodes = len(_items(network_info, "hosts")) + len(_items(network_info, "devices"))
+    if nodes >= focus_min_nodes():
+        focus = select_context(network_info, user_text)
+    return build_topology_digest(network_info, include_flows=needs_flows(user_text), focus=focus)
+
+
+__all__ = [
+    "build_topology_digest",
+    "digest_enabled",
+    "needs_flows",
+    "network_context",
+    "topology_fingerprint",
+]
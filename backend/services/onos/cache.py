@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Mapping
+
+
+def _detach(payload: Any) -> Any:
+    """
+    Return a copy that callers may mutate without touching the cached value.
+
+    ONOS payloads look like `{"hosts": [{...}, ...]}` and our callers only add
+    top-level keys to the item dicts (friendly_name, managed_id), so copying two
+    levels is enough and much cheaper than a deepcopy of every flow.
+    """
+    if not isinstance(payload, dict):
+        return payload
+    out: Dict[str, Any] = {}
+    for key, value in payload.items():
+        if isinstance(value, list):
+            out[key] = [dict(item) if isinstance(item, dict) else item for item in value]
+        else:
+            out[key] = value
+    return out
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "inflight", "generation", "hits", "stale_hits", "misses", "coalesced", "errors")
+
+    def __init__(self) -> None:
+        self.value: Any = None
+        self.fetched_at: float | None = None
+        self.inflight: Future | None = None
+        # Bumped by invalidate(); a fetch started under an older generation is not cached.
+        self.generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+
+class SnapshotCache:
+    """
+    In-process TTL cache for ONOS resources (devices, links, hosts, ...).
+
+    - Fresh entries (age < ttl) are served from memory.
+    - Concurrent misses for the same resource are coalesced: one caller fetches,
+      the others wait on the same future.
+    - With `stale_seconds > 0` (stale-while-revalidate), an expired entry that
+      is still within `ttl + stale_seconds` is returned immediately while a
+      single background refresh runs.
+    - `invalidate()` also detaches any fetch already in flight: its waiters
+      still get its result, but it is not cached and later callers refetch.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[..., Any],
+        *,
+        ttls: Mapping[str, float],
+        stale_seconds: float = 0.0,
+    ) -> None:
+        self._loader = loader
+        self._ttls = dict(ttls)
+        self._stale_seconds = stale_seconds
+        self._entries: Dict[str, _Entry] = {name: _Entry() for name in self._ttls}
+        self._lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="onos-cache-refresh")
+
+    def get(self, resource: str, *, timeout: float | None = None) -> Any:
+        now = time.monotonic()
+        ttl = self._ttls.get(resource, 0.0)
+        leader = False
+        with self._lock:
+            entry = self._entries.setdefault(resource, _Entry())
+            age = (now - entry.fetched_at) if entry.fetched_at is not None else None
+
+            if age is not None and age < ttl:
+                entry.hits += 1
+                return _detach(entry.value)
+
+            if age is not None and self._stale_seconds > 0 and age < ttl + self._stale_seconds:
+                entry.stale_hits += 1
+                if entry.inflight is None:
+                    entry.inflight = Future()
+                    self._refresh_pool.submit(self._fill, resource, entry.inflight, timeout, entry.generation)
+                return _detach(entry.value)
+
+            if entry.inflight is not None:
+                entry.coalesced += 1
+                future = entry.inflight
+            else:
+                entry.misses += 1
+                future = entry.inflight = Future()
+                generation = entry.generation
+                leader = True
+
+        if leader:
+            self._fill(resource, future, timeout, generation)
+        return _detach(future.result(timeout=timeout))
+
+    def _fill(self, resource: str, future: Future, timeout: float | None, generation: int) -> None:
+        try:
+            value = self._loader(resource, timeout=timeout)
+        except BaseException as exc:
+            with self._lock:
+                entry = self._entries[resource]
+                entry.errors += 1
+                if entry.inflight is future:
+                    entry.inflight = None
+            future.set_exception(exc)
+            return
+        with self._lock:
+            entry = self._entries[resource]
+            if entry.generation == generation:
+                entry.value = value
+                entry.fetched_at = time.monotonic()
+            if entry.inflight is future:
+                entry.inflight = None
+        future.set_result(value)
+
+    def invalidate(self, resources: Iterable[str] | None = None) -> None:
+        with self._lock:
+            for name in (resources if resources is not None else list(self._entries)):
+                entry = self._entries.get(name)
+                if entry is not None:
+                    entry.fetched_at = None
+                    entry.value = None
+                    # A fetch that started before the change may return pre-change data.
+                    entry.generation += 1
+                    entry.inflight = None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        out: Dict[str, Any] = {"stale_while_revalidate_seconds": self._stale_seconds, "resources": {}}
+        total_served = total_lookups = 0
+        with self._lock:
+            for name, entry in self._entries.items():
+                served = entry.hits + entry.stale_hits + entry.coalesced
+                lookups = served + entry.misses
+                total_served += served
+                total_lookups += lookups
+                out["resources"][name] = {
+                    "ttl_seconds": self._ttls.get(name, 0.0),
+                    "hits": entry.hits,
+                    "stale_hits": entry.stale_hits,
+                    "coalesced": entry.coalesced,
+                    "misses": entry.misses,
+                    "errors": entry.errors,
+                    "hit_ratio": (served / lookups) if lookups else None,
+                    "age_seconds": (now - entry.fetched_at) if entry.fetched_at is not None else None,
+                }
+        out["hit_ratio"] = (total_served / total_lookups) if total_lookups else None
+        return out
+
+
+__all__ = ["SnapshotCache"]
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
-from typing import Any, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Mapping, Optional
 
 import requests
 from dotenv import load_dotenv
 
+from backend.services.onos import transport
+from backend.services.onos.cache import SnapshotCache
+from backend.services.onos.transport import env_float, env_int, read_timeout
+
 load_dotenv()
 
 # Keep current default, but allow override via env.
@@ -13,57 +21,179 @@ ONOS_API_URL = os.getenv("ONOS_API_URL", "http://10.100.10.122:8181/onos/v1/")
 ONOS_USER = os.getenv("ONOS_USER", "onos")
 ONOS_PASS = os.getenv("ONOS_PASS", "rocks")
 
+# Resources that make up a full network snapshot (also the ONOS payload keys).
+NETWORK_RESOURCES = ("devices", "links", "hosts", "intents", "flows")
+
+_snapshot_pool: ThreadPoolExecutor | None = None
+
+
+def _resource_timeout(resource: str) -> float:
+    # e.g. ONOS_TIMEOUT_FLOWS=3 overrides ONOS_SNAPSHOT_TIMEOUT for the flows call only.
+    default = env_float("ONOS_SNAPSHOT_TIMEOUT", read_timeout())
+    return env_float(f"ONOS_TIMEOUT_{resource.upper()}", default)
+
+
+def _get_snapshot_pool() -> ThreadPoolExecutor:
+    global _snapshot_pool
+    if _snapshot_pool is None:
+        # Shared across requests; sized so a few concurrent snapshots don't queue behind each other.
+        workers = env_int("ONOS_SNAPSHOT_WORKERS", 16)
+        _snapshot_pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="onos-snapshot")
+    return _snapshot_pool
+
 
 def _auth() -> tuple[str, str]:
     return (ONOS_USER, ONOS_PASS)
 
-def _request(method: str, path: str, *, json: Any | None = None) -> requests.Response:
+def _request(method: str, path: str, *, json: Any | None = None, timeout: float | None = None) -> requests.Response:
     url = f"{ONOS_API_URL}{path.lstrip('/')}"
-    return requests.request(method, url, auth=_auth(), timeout=10, json=json)
-
-
-def get_network_info() -> Dict[str, Any]:
-    return {
-        "devices": get_network_devices(),
-        "links": get_network_links(),
-        "hosts": get_network_hosts(),
-        "intents": get_network_intents(),
-        "flows": get_network_flows(),
-    }
+    # Pooled keep-alive session with bounded, jittered retries (see transport.py).
+    return transport.request(method, url, auth=_auth(), timeout=timeout, json=json)
 
 
-def get_network_devices() -> Dict[str, Any]:
-    response = _request("GET", "devices")
+def _get_resource(resource: str, *, timeout: float | None = None) -> Dict[str, Any]:
+    response = _request("GET", resource, timeout=timeout)
     response.raise_for_status()
     return response.json()
 
 
-def get_network_links() -> Dict[str, Any]:
-    response = _request("GET", "links")
-    response.raise_for_status()
-    return response.json()
+def _cache_ttl(resource: str) -> float:
+    # e.g. ONOS_CACHE_TTL_FLOWS=1 overrides ONOS_CACHE_TTL for flows; 0 disables caching.
+    return env_float(f"ONOS_CACHE_TTL_{resource.upper()}", env_float("ONOS_CACHE_TTL", 3.0))
+
+
+# Shared by every caller in this process, so N dashboard tabs polling /onos/*,
+# /devices and /hosts cost ONOS one fetch per resource per TTL.
+snapshot_cache = SnapshotCache(
+    _get_resource,
+    ttls={r: _cache_ttl(r) for r in NETWORK_RESOURCES},
+    stale_seconds=env_float("ONOS_CACHE_STALE_SECONDS", 0.0),
+)
+
+
+def _get_cached(resource: str, *, timeout: float | None = None, fresh: bool = False) -> Dict[str, Any]:
+    if fresh:
+        snapshot_cache.invalidate([resource])
+    return snapshot_cache.get(resource, timeout=timeout)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    return snapshot_cache.stats()
+
 
+def get_network_info(
+    *,
+    concurrent: bool = True,
+    timeouts: Mapping[str, float] | None = None,
+    fresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Snapshot devices, links, hosts, intents and flows.
 
-def get_network_hosts() -> Dict[str, Any]:
-    response = _request("GET", "hosts")
-    response.raise_for_status()
-    return response.json()
+    With `concurrent=True` (default) all five calls are issued at once, so the
+    snapshot takes as long as the slowest call instead of the sum. Each resource
+    has its own deadline (`timeouts`, else ONOS_TIMEOUT_<RESOURCE> /
+    ONOS_SNAPSHOT_TIMEOUT). A resource that fails or times out is returned empty
+    (`{"flows": []}`) and its error is reported under `errors`; if every call
+    fails, the first error is raised so callers still see "ONOS is down".
 
+    `concurrent=False` keeps the old sequential, fail-fast behaviour.
 
-def get_network_intents() -> Dict[str, Any]:
-    response = _request("GET", "intents")
-    response.raise_for_status()
-    return response.json()
+    Every resource goes through `snapshot_cache`; pass `fresh=True` to skip
+    cached values.
+    """
+    limits = {r: (timeouts or {}).get(r) or _resource_timeout(r) for r in NETWORK_RESOURCES}
 
+    if not concurrent:
+        return {r: _get_cached(r, timeout=limits[r], fresh=fresh) for r in NETWORK_RESOURCES}
 
-def get_network_flows() -> Dict[str, Any]:
-    response = _request("GET", "flows")
-    response.raise_for_status()
-    return response.json()
+    pool = _get_snapshot_pool()
+    started = time.perf_counter()
+    futures = {r: pool.submit(_get_cached, r, timeout=limits[r], fresh=fresh) for r in NETWORK_RESOURCES}
+
+    results: Dict[str, Any] = {}
+    for resource, future in futures.items():
+        remaining = max(0.0, started + limits[resource] - time.perf_counter())
+        try:
+            results[resource] = future.result(timeout=remaining)
+        except Exception as exc:
+            # On timeout the worker keeps running until its own socket timeout; we just stop waiting.
+            results[resource] = exc
+    return _assemble_snapshot(results, limits)
+
+
+async def aget_network_info(
+    *,
+    timeouts: Mapping[str, float] | None = None,
+    fresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Async counterpart of `get_network_info(concurrent=True)`.
+
+    The blocking HTTP calls run on the shared snapshot pool, so awaiting this
+    never blocks the event loop; per-resource deadlines and partial results
+    behave exactly as in the sync version.
+    """
+    limits = {r: (timeouts or {}).get(r) or _resource_timeout(r) for r in NETWORK_RESOURCES}
+    loop = asyncio.get_running_loop()
+    pool = _get_snapshot_pool()
+
+    async def fetch(resource: str) -> Any:
+        call = functools.partial(_get_cached, resource, timeout=limits[resource], fresh=fresh)
+        return await asyncio.wait_for(loop.run_in_executor(pool, call), timeout=limits[resource])
+
+    values = await asyncio.gather(*(fetch(r) for r in NETWORK_RESOURCES), return_exceptions=True)
+    return _assemble_snapshot(dict(zip(NETWORK_RESOURCES, values)), limits)
+
+
+def _assemble_snapshot(results: Mapping[str, Any], limits: Mapping[str, float]) -> Dict[str, Any]:
+    """Turn per-resource payloads/exceptions into a (possibly partial) snapshot."""
+    snapshot: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    first_exc: BaseException | None = None
+    for resource in NETWORK_RESOURCES:
+        value = results[resource]
+        if not isinstance(value, BaseException):
+            snapshot[resource] = value
+            continue
+        snapshot[resource] = {resource: []}
+        if isinstance(value, TimeoutError):
+            errors[resource] = f"timed out after {limits[resource]:g}s"
+        else:
+            errors[resource] = str(value) or value.__class__.__name__
+        first_exc = first_exc or value
+
+    if first_exc is not None and len(errors) == len(NETWORK_RESOURCES):
+        raise first_exc
+    if errors:
+        snapshot["errors"] = errors
+    return snapshot
+
+
+def get_network_devices(*, fresh: bool = False) -> Dict[str, Any]:
+    return _get_cached("devices", fresh=fresh)
+
+
+def get_network_links(*, fresh: bool = False) -> Dict[str, Any]:
+    return _get_cached("links", fresh=fresh)
+
+
+def get_network_hosts(*, fresh: bool = False) -> Dict[str, Any]:
+    return _get_cached("hosts", fresh=fresh)
+
+
+def get_network_intents(*, fresh: bool = False) -> Dict[str, Any]:
+    return _get_cached("intents", fresh=fresh)
+
+
+def get_network_flows(*, fresh: bool = False) -> Dict[str, Any]:
+    return _get_cached("flows", fresh=fresh)
 
 
 def post_intent(payload: Dict[str, Any]) -> Dict[str, Any] | None:
     response = _request("POST", "intents", json=payload)
+    # Intents (and the flows they compile to) changed; don't serve the old view.
+    snapshot_cache.invalidate(["intents", "flows"])
     if not response.ok:
         response.raise_for_status()
     if not response.text:
@@ -73,13 +203,18 @@ def post_intent(payload: Dict[str, Any]) -> Dict[str, Any] | None:
 
 def delete_intent(app_id: str, key: str) -> bool:
     response = _request("DELETE", f"intents/{app_id}/{key}")
+    snapshot_cache.invalidate(["intents", "flows"])
     if not response.ok:
         response.raise_for_status()
     return True
 
 
 __all__ = [
+    "NETWORK_RESOURCES",
+    "snapshot_cache",
+    "get_cache_stats",
     "get_network_info",
+    "aget_network_info",
     "get_network_devices",
     "get_network_links",
     "get_network_hosts",
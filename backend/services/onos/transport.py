@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One pooled, keep-alive session shared by every ONOS caller (proxy routes,
+# device/host sync, chat grounding). Tunables are read once, on first use.
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    return int(env_float(name, default))
+
+
+def connect_timeout() -> float:
+    return env_float("ONOS_CONNECT_TIMEOUT", 3.0)
+
+
+def read_timeout() -> float:
+    return env_float("ONOS_READ_TIMEOUT", 10.0)
+
+
+def _retry_policy() -> Retry:
+    retries = env_int("ONOS_RETRIES", 2)
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        # Only idempotent calls are retried; a POST /intents is never replayed.
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "DELETE"}),
+        status_forcelist=(502, 503, 504),
+        backoff_factor=env_float("ONOS_RETRY_BACKOFF", 0.2),
+        backoff_jitter=env_float("ONOS_RETRY_JITTER", 0.1),
+        backoff_max=env_float("ONOS_RETRY_BACKOFF_MAX", 2.0),
+        raise_on_status=False,
+    )
+
+
+def _build_session(auth: tuple[str, str]) -> requests.Session:
+    session = requests.Session()
+    session.auth = auth
+    session.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+    adapter = HTTPAdapter(
+        pool_connections=env_int("ONOS_POOL_CONNECTIONS", 4),
+        pool_maxsize=env_int("ONOS_POOL_MAXSIZE", 32),
+        # Block instead of opening throwaway connections when the pool is exhausted.
+        pool_block=True,
+        max_retries=_retry_policy(),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(auth: tuple[str, str]) -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(auth)
+    return _session
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    auth: tuple[str, str],
+    timeout: float | None = None,
+    json: Any | None = None,
+) -> requests.Response:
+    """
+    Send one request through the shared session.
+
+    `timeout` overrides the read timeout only; the connect timeout always comes
+    from ONOS_CONNECT_TIMEOUT so a dead controller fails fast.
+    """
+    return get_session(auth).request(
+        method,
+        url,
+        timeout=(connect_timeout(), timeout or read_timeout()),
+        json=json,
+    )
+
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+__all__ = [
+    "get_session",
+    "request",
+    "close_session",
+    "connect_timeout",
+    "read_timeout",
+    "env_float",
+    "env_int",
+]
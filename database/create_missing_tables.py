@@ -1,8 +1,9 @@
 """
 create_missing_tables.py
 ------------------------
-Creates any missing tables defined in `database/models.py` without dropping
-existing data.
+Creates any missing tables defined in `database/models.py` (and adds columns
+introduced after a table was created) without dropping existing data, then
+ensures the pgvector ANN index on `config_samples.embedding`.
 
 This is a lightweight alternative to Alembic for small projects.
 
@@ -21,15 +22,40 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from sqlalchemy import text  # noqa: E402
+
 from database import Base, engine  # noqa: E402
 
 # Import models so SQLAlchemy registers all table metadata.
 import database.models  # noqa: F401, E402
+from database.rag.vector_index import distance_metric, ensure_vector_index, normalize_stored_embeddings  # noqa: E402
+
+# `create_all` never alters existing tables, so columns added to models.py after
+# a table was first created are listed here and added in place.
+MISSING_COLUMNS = [
+    ("devices", "content_hash", "VARCHAR(64)"),
+    ("conversations", "summary", "TEXT"),
+    ("conversations", "summary_message_id", "INTEGER"),
+]
+
+
+def add_missing_columns() -> None:
+    with engine.begin() as conn:
+        for table, column, ddl_type in MISSING_COLUMNS:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {ddl_type}"))
 
 
 def main() -> None:
     print("🚀 Creating missing tables (no drops)...")
     Base.metadata.create_all(bind=engine)
+    print("🚀 Adding missing columns...")
+    add_missing_columns()
+    print("🚀 Normalising stored embeddings and ensuring the config_samples vector index...")
+    with engine.begin() as conn:
+        rescaled = normalize_stored_embeddings(conn)
+        index_name = ensure_vector_index(conn)
+    print(f"   rescaled {rescaled} embedding(s) to unit length")
+    print(f"   index: {index_name or 'none (RAG_INDEX_TYPE=none)'} (metric: {distance_metric()})")
     print("✅ Done.")
 
 
@@ -17,7 +17,11 @@ if str(ROOT) not in sys.path:
 
 from database import Base, engine  # noqa: E402
 import database.models  # noqa: F401, E402
+from database.rag.vector_index import ensure_vector_index, normalize_stored_embeddings  # noqa: E402
 
 print("🚀 Initializing database and creating tables...")
 Base.metadata.create_all(bind=engine)
-print("✅ Tables created successfully in PostgreSQL!")
+with engine.begin() as conn:
+    normalize_stored_embeddings(conn)
+    index_name = ensure_vector_index(conn)
+print(f"✅ Tables created successfully in PostgreSQL! (vector index: {index_name or 'none'})")
@@ -7,7 +7,8 @@ Each class corresponds to a table, and each attribute corresponds to a column.
 There are relationships, constraints, and JSON/vector fields.
 """
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, TIMESTAMP
+import numpy as np
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, TIMESTAMP, func
 from sqlalchemy.orm import relationship
 # from sqlalchemy.dialects.postgresql import VECTOR
 from database import Base
@@ -15,26 +16,51 @@ from sqlalchemy.types import UserDefinedType
 
 # Define custom pgvector column type
 class Vector(UserDefinedType):
+    """
+    pgvector column as a NumPy float32 array.
+
+    Reads go over the wire in pgvector's binary format (`vector_send`: int16 dim,
+    int16 unused, then big-endian float4s) and are decoded with one
+    `np.frombuffer`, instead of printing 768 floats as text and splitting them
+    back into Python floats. psycopg2 has no binary parameter path, so writes
+    still send the `[x,y,...]` literal, built from float32 values (lists, tuples
+    and arrays are all accepted).
+    """
+
+    cache_ok = True
+
+    def __init__(self, dim: int = 768):
+        self.dim = dim
+
     def get_col_spec(self, **kw):
-        # Default to 768 dimensions, adjust if needed
-        return "vector(768)"
+        return f"vector({self.dim})"
+
+    def column_expression(self, col):
+        return func.vector_send(col, type_=self)
 
     def bind_processor(self, dialect):
         def process(value):
-            if value is not None:
-                # Ensure vector values are stored as text "[0.1, 0.2, ...]"
-                return str(value)
-            return value
+            if value is None or isinstance(value, str):
+                return value
+            return vector_literal(value)
         return process
 
     def result_processor(self, dialect, coltype):
         def process(value):
-            if value is not None:
-                # Convert back from string to Python list
-                return [float(x) for x in value.strip("[]").split(",")]
-            return value
+            if value is None:
+                return value
+            if isinstance(value, str):
+                # Text form, e.g. a raw `SELECT embedding` mapped onto this type.
+                return np.fromstring(value.strip("[]"), dtype=np.float32, sep=",")
+            return np.frombuffer(value, dtype=">f4", offset=4).astype(np.float32)
         return process
 
+
+def vector_literal(value) -> str:
+    """pgvector text literal for a sequence of floats."""
+    vec = np.asarray(value, dtype=np.float32).ravel()
+    return "[" + ",".join(map(str, vec.tolist())) + "]"
+
 # 1️⃣ User Table
 class User(Base):
     __tablename__ = "users"
@@ -73,6 +99,9 @@ class Conversation(Base):
     title = Column(String(200), nullable=True)
     created_at = Column(TIMESTAMP)
     updated_at = Column(TIMESTAMP)
+    # Rolling summary of every message up to and including summary_message_id.
+    summary = Column(Text, nullable=True)
+    summary_message_id = Column(Integer, nullable=True)
 
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
@@ -115,6 +144,8 @@ class Device(Base):
     type = Column(String(50))
     annotations = Column(JSON)
     extra_metadata = Column(JSON)  
+    # sha256 of the last ONOS payload written; lets the sync skip unchanged rows.
+    content_hash = Column(String(64))
 
 # 5️⃣ Config Samples Table (for vector-based retrieval)
 
@@ -0,0 +1,199 @@
+"""
+bulk_ingest.py
+--------------
+Bulk loader for the `config_samples` RAG library.
+
+Rows are streamed from a JSON array or JSONL file (never loaded whole), their
+intent texts are embedded `batch_size` at a time in one `model.encode` call,
+and each batch is written with a single multi-row
+`INSERT ... ON CONFLICT (sample_id) DO UPDATE`. Rows without a sample_id are
+plain inserts that take the next id from the sequence.
+
+Used by `database/seed_data.py`; callers own the session and the commit.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+
+from sqlalchemy import column, table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .embedded_server import embed_texts
+
+_READ_CHUNK = 1 << 16
+
+_config_samples = table(
+    "config_samples",
+    column("sample_id"),
+    column("category"),
+    column("intent_text"),
+    column("config_json"),
+    column("extra_metadata"),
+    column("embedding"),
+)
+
+_SYNC_SEQUENCE_SQL = text(
+    """
+    SELECT setval(
+        pg_get_serial_sequence('config_samples', 'sample_id'),
+        GREATEST(COALESCE((SELECT MAX(sample_id) FROM config_samples), 0), 1)
+    )
+    """
+)
+
+
+def _iter_json_array(handle: TextIO, chunk_size: int = _READ_CHUNK) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array, decoding one chunk at a time.
+
+    An element is only accepted once the "," or "]" after it has been read: a
+    number cut off at the end of a chunk ("12" of "123", "1" of "1e5") would
+    otherwise decode as a different value.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    eof = False
+    started = False
+    while True:
+        stripped = buf.lstrip()
+        if not started:
+            if stripped.startswith("["):
+                buf, started = stripped[1:], True
+                continue
+            if stripped:
+                raise ValueError("expected a JSON array of samples")
+        else:
+            stripped = stripped.lstrip(",").lstrip()
+            if stripped.startswith("]"):
+                return
+            if stripped:
+                try:
+                    item, end = decoder.raw_decode(stripped)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    rest = stripped[end:].lstrip()
+                    if rest.startswith((",", "]")):
+                        buf = rest
+                        yield item
+                        continue
+                    if eof:
+                        raise ValueError(f"expected ',' or ']' after an array element, got {rest[:20]!r}")
+            buf = stripped
+        if eof:
+            raise ValueError("unexpected end of file in JSON array")
+        chunk = handle.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+
+
+def iter_samples(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """Stream sample dicts from `*.jsonl` (one object per line) or a JSON array file."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8") as handle:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for lineno, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    raise ValueError(f"{path}:{lineno}: {exc}") from exc
+        else:
+            yield from _iter_json_array(handle)
+
+
+def _json(value: Any) -> str | None:
+    return json.dumps(value) if value is not None else None
+
+
+def _payload(row: Dict[str, Any], vector: List[float]) -> Dict[str, Any]:
+    sample_id = row.get("sample_id")
+    return {
+        "sample_id": int(sample_id) if sample_id is not None else None,
+        "category": row.get("category"),
+        "intent_text": row.get("intent_text"),
+        # Plain psycopg2 parameters: JSON and pgvector values go over as text literals.
+        "config_json": _json(row.get("config_json")),
+        "extra_metadata": _json(row.get("extra_metadata")),
+        "embedding": str(vector),
+    }
+
+
+def _write_batch(session: Session, payloads: List[Dict[str, Any]]) -> None:
+    with_id = [p for p in payloads if p["sample_id"] is not None]
+    without_id = [{k: v for k, v in p.items() if k != "sample_id"} for p in payloads if p["sample_id"] is None]
+    if with_id:
+        # Last row wins if a batch repeats a sample_id (ON CONFLICT cannot touch a row twice).
+        with_id = list({p["sample_id"]: p for p in with_id}.values())
+        stmt = insert(_config_samples).values(with_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sample_id"],
+            set_={name: stmt.excluded[name] for name in ("category", "intent_text", "config_json", "extra_metadata", "embedding")},
+        )
+        session.execute(stmt)
+    if without_id:
+        session.execute(_SYNC_SEQUENCE_SQL)
+        session.execute(insert(_config_samples).values(without_id))
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        if not row.get("intent_text"):
+            continue
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ingest_config_samples(
+    session: Session,
+    rows: Iterable[Dict[str, Any]],
+    *,
+    batch_size: int = 64,
+    progress: bool = False,
+) -> Dict[str, float]:
+    """
+    Upsert `rows` into config_samples and return throughput stats
+    (`rows`, `seconds`, `rows_per_second`, `embedding_seconds`, `write_seconds`).
+    Rows without an intent_text are skipped. Does not commit.
+    """
+    batch_size = max(1, batch_size)
+    stats = {"rows": 0.0, "embedding_seconds": 0.0, "write_seconds": 0.0}
+    t_start = time.perf_counter()
+
+    for n, batch in enumerate(_batches(rows, batch_size), start=1):
+        t0 = time.perf_counter()
+        vectors = embed_texts([str(r["intent_text"]) for r in batch], batch_size=batch_size)
+        t1 = time.perf_counter()
+        _write_batch(session, [_payload(r, v) for r, v in zip(batch, vectors)])
+        t2 = time.perf_counter()
+
+        stats["rows"] += len(batch)
+        stats["embedding_seconds"] += t1 - t0
+        stats["write_seconds"] += t2 - t1
+        if progress and n % 10 == 0:
+            elapsed = t2 - t_start
+            print(f"   … {int(stats['rows'])} rows ({stats['rows'] / elapsed:.1f} rows/s)")
+
+    if stats["rows"]:
+        # Explicit ids bypass the serial; keep it ahead so API inserts don't collide.
+        session.execute(_SYNC_SEQUENCE_SQL)
+
+    stats["seconds"] = time.perf_counter() - t_start
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
+
+
+__all__ = ["ingest_config_samples", "iter_samples"]
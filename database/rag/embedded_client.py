@@ -7,19 +7,57 @@ instance and fetch the most similar configuration samples from PostgreSQL.
 This module relies on:
     - `rag.embedded_server.embed_text` for computing 768-d embeddings
     - `database.SessionLocal` for DB access
-    - pgvector's `<->` operator to order by cosine distance
+    - pgvector's distance operator for RAG_DISTANCE_METRIC (cosine `<=>` by
+      default, `<#>` inner product, `<->` L2), matching the ANN index opclass
+      from `rag.vector_index` (ef_search / probes tunable per query)
+    - or, with RAG_BACKEND=memory, the in-process index from `rag.memory_index`
+      (pgvector stays the fallback if it cannot load)
 """
 
 from __future__ import annotations
 
+import asyncio
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Sequence
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
-from .embedded_server import embed_text
+from .embedded_server import aembed_text, embed_text
+from .memory_index import memory_backend_enabled, memory_index
+from .vector_index import apply_search_settings, default_ef_search, distance_operator
+
+
+_SIMILAR_SQL = text(
+    f"""
+    SELECT
+        sample_id,
+        category,
+        intent_text,
+        config_json,
+        extra_metadata
+    FROM config_samples
+    ORDER BY embedding {distance_operator()} CAST(:query_vec AS vector)
+    LIMIT :limit
+    """
+)
+
+_embedding_executor: ThreadPoolExecutor | None = None
+
+
+def _get_embedding_executor() -> ThreadPoolExecutor:
+    """
+    Dedicated pool for the CPU-bound transformer pass, so embeddings never
+    compete with (or starve) the request threadpool used for DB/ONOS I/O.
+    """
+    global _embedding_executor
+    if _embedding_executor is None:
+        workers = int(os.getenv("EMBEDDING_WORKERS", "2"))
+        _embedding_executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="embedding")
+    return _embedding_executor
 
 
 def _vectorize(text_value: str) -> List[float]:
@@ -27,56 +65,107 @@ def _vectorize(text_value: str) -> List[float]:
     return embed_text(text_value)
 
 
+def _query_pgvector(
+    query_vec: List[float],
+    top_k: int,
+    ef_search: int | None = None,
+    probes: int | None = None,
+) -> Sequence[Dict[str, Any]]:
+    session: Session | None = None
+    try:
+        session = SessionLocal()
+        # HNSW returns at most ef_search rows, so never search a narrower list than top_k.
+        ef = max(top_k, ef_search if ef_search is not None else default_ef_search())
+        apply_search_settings(session, ef_search=ef, probes=probes)
+        return session.execute(
+            _SIMILAR_SQL,
+            {"query_vec": query_vec, "limit": top_k},
+        ).mappings().all()
+    finally:
+        if session is not None:
+            session.close()
+
+
+def _query_similar(
+    query_vec: List[float],
+    top_k: int,
+    ef_search: int | None = None,
+    probes: int | None = None,
+) -> Sequence[Dict[str, Any]]:
+    if memory_backend_enabled():
+        # Exact search, so ef_search / probes do not apply. None while the index is
+        # loading or after a failed load (reported once by the index itself).
+        rows = memory_index.search(query_vec, top_k)
+        if rows is not None:
+            return rows
+    return _query_pgvector(query_vec, top_k, ef_search, probes)
+
+
 def get_similar_samples(
     query_text: str,
     *,
     top_k: int = 3,
+    ef_search: int | None = None,
+    probes: int | None = None,
 ) -> Dict[str, Any]:
     """
     Encode the user intent, query pgvector for the nearest config samples,
     and return both the matches and timing metrics.
+
+    `ef_search` (HNSW) / `probes` (IVFFlat) override RAG_HNSW_EF_SEARCH /
+    RAG_IVFFLAT_PROBES for this query: higher means better recall, slower.
     """
-    session: Session | None = None
     timings: Dict[str, float] = {}
-    try:
-        session = SessionLocal()
 
-        t0 = time.perf_counter()
-        query_vec = _vectorize(query_text)
-        timings["embedding_seconds"] = time.perf_counter() - t0
-
-        sql = text(
-            """
-            SELECT
-                sample_id,
-                category,
-                intent_text,
-                config_json,
-                extra_metadata
-            FROM config_samples
-            ORDER BY embedding <-> CAST(:query_vec AS vector)
-            LIMIT :limit
-            """
-        )
-
-        t1 = time.perf_counter()
-        rows: Sequence[Dict[str, Any]] = session.execute(
-            sql,
-            {"query_vec": query_vec, "limit": top_k},
-        ).mappings().all()
-        timings["db_query_seconds"] = time.perf_counter() - t1
+    t0 = time.perf_counter()
+    query_vec = _vectorize(query_text)
+    timings["embedding_seconds"] = time.perf_counter() - t0
 
-        return {
-            "query": query_text,
-            "matches": [dict(row) for row in rows],
-            "timings": timings,
-        }
-    finally:
-        if session is not None:
-            session.close()
+    t1 = time.perf_counter()
+    rows = _query_similar(query_vec, top_k, ef_search, probes)
+    timings["db_query_seconds"] = time.perf_counter() - t1
+
+    return {
+        "query": query_text,
+        # Reused by the semantic response cache, so the intent is embedded once per request.
+        "embedding": query_vec,
+        "matches": [dict(row) for row in rows],
+        "timings": timings,
+    }
+
+
+async def aget_similar_samples(
+    query_text: str,
+    *,
+    top_k: int = 3,
+    ef_search: int | None = None,
+    probes: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Async `get_similar_samples`: the embedding is awaited from the micro-batcher
+    (or the dedicated EMBEDDING_WORKERS executor when EMBEDDING_BATCHING=0), the
+    pgvector query runs on the default threadpool.
+    """
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    query_vec = await aembed_text(query_text, executor=_get_embedding_executor())
+    timings["embedding_seconds"] = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    rows = await asyncio.to_thread(_query_similar, query_vec, top_k, ef_search, probes)
+    timings["db_query_seconds"] = time.perf_counter() - t1
+
+    return {
+        "query": query_text,
+        # Reused by the semantic response cache, so the intent is embedded once per request.
+        "embedding": query_vec,
+        "matches": [dict(row) for row in rows],
+        "timings": timings,
+    }
 
 
-__all__ = ["get_similar_samples"]
+__all__ = ["get_similar_samples", "aget_similar_samples"]
 
 if __name__ == "__main__":
     print(get_similar_samples("Allocate 1Gbps bandwidth between HostA and HostB"))
@@ -1,7 +1,184 @@
-from sentence_transformers import SentenceTransformer
+"""
+embedded_server.py
+------------------
+Process-wide SentenceTransformer used for RAG embeddings.
+
+The model is loaded lazily on first use (or by `warmup()` from the FastAPI
+lifespan), so importing this module -- from the backend, `seed_data.py` or a
+benchmark script -- costs nothing until an embedding is actually needed.
+`embed_text` goes through the LRU in embedding_cache.py first; misses are
+encoded through the micro-batcher in embedding_batcher.py.
+
+All vectors are L2-normalised (unit length), for stored samples and queries
+alike, so cosine, inner product and L2 rank identically (see vector_index.py).
+
+Environment:
+    EMBEDDING_MODEL          model name/path (default all-mpnet-base-v2, 768-d)
+    EMBEDDING_DEVICE         "cpu", "cuda", "mps", ... (default: let the library pick)
+    EMBEDDING_TORCH_THREADS  intra-op threads for torch on CPU (default: torch's own)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, List
+
+from .embedding_batcher import batching_enabled, make_batcher
+from .embedding_cache import cache_key, embedding_cache
+
+DEFAULT_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+
+_model: Any = None
+_lock = threading.Lock()
+_load_seconds: float | None = None
+_warmup_seconds: float | None = None
+_load_error: str | None = None
+
+
+def model_name() -> str:
+    return os.getenv("EMBEDDING_MODEL") or DEFAULT_MODEL_NAME
+
+
+def _device() -> str | None:
+    return os.getenv("EMBEDDING_DEVICE") or None
+
+
+def _torch_threads() -> int | None:
+    try:
+        value = int(os.getenv("EMBEDDING_TORCH_THREADS", "0"))
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def _load() -> Any:
+    global _load_seconds, _load_error
+    t0 = time.perf_counter()
+    try:
+        from sentence_transformers import SentenceTransformer  # heavy: pulls in torch
+
+        threads = _torch_threads()
+        if threads is not None:
+            import torch
+
+            torch.set_num_threads(threads)
+        model = SentenceTransformer(model_name(), device=_device())
+    except Exception as exc:
+        _load_error = str(exc)
+        raise
+    _load_error = None
+    _load_seconds = time.perf_counter() - t0
+    return model
+
+
+def get_model() -> Any:
+    """Return the shared model, loading it on first call (thread-safe, loads once)."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _model = _load()
+    return _model
+
+
+def warmup() -> float:
+    """
+    Load the model and run one encode so the first real request does not pay
+    for lazy kernel/tokenizer initialisation. Returns the seconds spent.
+    """
+    global _warmup_seconds
+    t0 = time.perf_counter()
+    get_model().encode("warmup", convert_to_numpy=True)
+    _warmup_seconds = time.perf_counter() - t0
+    return _warmup_seconds
+
+
+def is_ready() -> bool:
+    return _model is not None and _warmup_seconds is not None
+
+
+def embedding_status() -> Dict[str, Any]:
+    return {
+        "model": model_name(),
+        "device": _device() or "auto",
+        "torch_threads": _torch_threads(),
+        "loaded": _model is not None,
+        "ready": is_ready(),
+        "load_seconds": _load_seconds,
+        "warmup_seconds": _warmup_seconds,
+        "error": _load_error,
+        "cache": embedding_cache.stats(),
+        "batching": _batcher.stats(),
+    }
+
+
+def _cache_namespace() -> str:
+    # Tagged so vectors cached (on disk) before normalisation are never served.
+    return f"{model_name()}#unit"
+
+
+def _encode_batch(texts: List[str]) -> List[List[float]]:
+    vectors = get_model().encode(
+        texts, convert_to_numpy=True, batch_size=len(texts), normalize_embeddings=True
+    ).tolist()
+    namespace = _cache_namespace()
+    for text, vector in zip(texts, vectors):
+        embedding_cache.put(cache_key(namespace, text), vector)
+    return vectors
+
+
+_batcher = make_batcher(_encode_batch)
+
+
+def _encode(text: str) -> list[float]:
+    if batching_enabled():
+        return _batcher.submit(text).result()
+    return _encode_batch([text])[0]
 
-model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
 
 def embed_text(text: str) -> list[float]:
-    return model.encode(text, convert_to_numpy=True).tolist()
+    vector = embedding_cache.get(cache_key(_cache_namespace(), text))
+    return vector if vector is not None else _encode(text)
+
+
+def embed_texts(texts: List[str], *, batch_size: int = 64) -> List[List[float]]:
+    """Bulk encode for ingestion: one model call, bypassing the query cache and the batcher."""
+    if not texts:
+        return []
+    return get_model().encode(
+        texts, convert_to_numpy=True, batch_size=max(1, batch_size), normalize_embeddings=True
+    ).tolist()
+
+
+async def aembed_text(text: str, *, executor: Executor | None = None) -> list[float]:
+    """
+    Async `embed_text`: memory hits return on the loop, disk lookups run in a
+    worker thread, and misses await the batcher's future directly (or, with
+    batching off, encode on `executor`).
+    """
+    key = cache_key(_cache_namespace(), text)
+    vector = embedding_cache.get_memory(key)
+    if vector is None and embedding_cache.has_disk:
+        vector = await asyncio.to_thread(embedding_cache.get_disk, key)
+    if vector is not None:
+        return vector
+    if embedding_cache.enabled:
+        embedding_cache.record_miss()
+    if batching_enabled():
+        return await asyncio.wrap_future(_batcher.submit(text))
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _encode, text)
+
+
+def __getattr__(name: str) -> Any:
+    # Backward compatibility: `from rag.embedded_server import model` still works, lazily.
+    if name == "model":
+        return get_model()
+    raise AttributeError(name)
+
 
+__all__ = ["aembed_text", "embed_text", "embed_texts", "embedding_status", "get_model", "is_ready", "model_name", "warmup"]
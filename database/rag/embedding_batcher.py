@@ -0,0 +1,136 @@
+"""
+embedding_batcher.py
+--------------------
+Micro-batching dispatcher for the shared SentenceTransformer.
+
+Callers submit one text and get a Future. A single worker thread takes the
+first pending text, waits at most EMBEDDING_BATCH_WINDOW_MS for more (up to
+EMBEDDING_BATCH_MAX), runs one `model.encode(batch)` and resolves every
+caller's future. Requests that arrive while a batch is encoding form the next
+batch, so under concurrent load the transformer runs full batches instead of
+many single-sentence passes; a lone request only pays the (few ms) window.
+
+Environment:
+    EMBEDDING_BATCHING         1 (default) / 0 to encode per call as before
+    EMBEDDING_BATCH_MAX        texts per encode call (default 32)
+    EMBEDDING_BATCH_WINDOW_MS  how long to wait for companions (default 2)
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def batching_enabled() -> bool:
+    return os.getenv("EMBEDDING_BATCHING", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class EmbeddingBatcher:
+    """Collects single-text requests and encodes them together on one worker thread."""
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], List[List[float]]],
+        *,
+        max_batch: int,
+        window_seconds: float,
+    ) -> None:
+        self._encode_batch = encode_batch
+        self.max_batch = max(1, max_batch)
+        self.window_seconds = window_seconds
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.max_seen = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window_seconds
+        while len(batch) < self.max_batch:
+            # Take whatever queued up during the previous encode without waiting.
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            pending = [(text, fut) for text, fut in batch if fut.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            # Identical texts in one window (retries, double clicks) are encoded once.
+            unique = list(dict.fromkeys(text for text, _ in pending))
+            try:
+                vectors = dict(zip(unique, self._encode_batch(unique)))
+            except Exception as exc:
+                for _, fut in pending:
+                    fut.set_exception(exc)
+                continue
+            for text, fut in pending:
+                fut.set_result(vectors[text])
+            with self._stats_lock:
+                self.batches += 1
+                self.texts += len(pending)
+                self.max_seen = max(self.max_seen, len(pending))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "enabled": batching_enabled(),
+                "max_batch": self.max_batch,
+                "window_ms": self.window_seconds * 1000.0,
+                "batches": self.batches,
+                "texts": self.texts,
+                "mean_batch_size": (self.texts / self.batches) if self.batches else None,
+                "max_batch_seen": self.max_seen,
+                "queued": self._queue.qsize(),
+            }
+
+
+def make_batcher(encode_batch: Callable[[List[str]], List[List[float]]]) -> EmbeddingBatcher:
+    return EmbeddingBatcher(
+        encode_batch,
+        max_batch=int(_env_number("EMBEDDING_BATCH_MAX", 32)),
+        window_seconds=_env_number("EMBEDDING_BATCH_WINDOW_MS", 2) / 1000.0,
+    )
+
+
+__all__ = ["EmbeddingBatcher", "batching_enabled", "make_batcher"]
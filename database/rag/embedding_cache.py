@@ -0,0 +1,185 @@
+"""
+embedding_cache.py
+------------------
+Bounded LRU of text embeddings, keyed by (model name, normalised text), with
+an optional on-disk SQLite tier that survives restarts.
+
+Retries, "regenerate" clicks and repeated intents embed the same string again;
+a hit skips the transformer pass entirely.
+
+Environment:
+    EMBEDDING_CACHE_SIZE  in-memory entries (default 2048, 0 disables the cache)
+    EMBEDDING_CACHE_PATH  SQLite file for the second tier (default: memory only)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+
+def normalize_text(text: str) -> str:
+    # Whitespace only: the tokenizer is case-sensitive, so "H1" and "h1" may embed differently.
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """key -> float32 blob in one SQLite table; failures disable the tier instead of failing requests."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+        self._conn.commit()
+
+    def _disable(self, exc: Exception) -> None:
+        print(f"Embedding disk cache disabled ({self.path}): {exc}")
+        self._conn = None
+
+    def get(self, key: str) -> List[float] | None:
+        import numpy as np
+
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as exc:
+                self._disable(exc)
+                return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist() if row else None
+
+    def put(self, key: str, vector: List[float]) -> None:
+        import numpy as np
+
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)", (key, blob))
+                self._conn.commit()
+            except sqlite3.Error as exc:
+                self._disable(exc)
+
+
+class EmbeddingCache:
+    """Thread-safe LRU (+ optional disk tier) with hit counters."""
+
+    def __init__(self, *, max_entries: int, disk_path: str | None = None) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: _DiskTier | None = None
+        if disk_path:
+            try:
+                self._disk = _DiskTier(disk_path)
+            except sqlite3.Error as exc:
+                print(f"Embedding disk cache unavailable ({disk_path}): {exc}")
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @property
+    def has_disk(self) -> bool:
+        return self.enabled and self._disk is not None
+
+    def get_memory(self, key: str) -> List[float] | None:
+        """Memory tier only; cheap enough to call on the event loop. Misses are not counted."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return list(vector)
+
+    def get_disk(self, key: str) -> List[float] | None:
+        """Disk tier only (blocking I/O); a hit is promoted to memory. Misses are not counted."""
+        if not self.has_disk:
+            return None
+        vector = self._disk.get(key)  # type: ignore[union-attr]
+        if vector is None:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, vector)
+        return vector
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def get(self, key: str) -> List[float] | None:
+        """Both tiers; counts a miss when neither has `key`."""
+        if not self.enabled:
+            return None
+        vector = self.get_memory(key)
+        if vector is None:
+            vector = self.get_disk(key)
+        if vector is None:
+            self.record_miss()
+        return vector
+
+    def put(self, key: str, vector: List[float]) -> None:
+        if not self.enabled:
+            return
+        self._remember(key, vector)
+        if self._disk is not None:
+            self._disk.put(key, vector)
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = tuple(vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_path": self._disk.path if self._disk is not None else None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": ((self.hits + self.disk_hits) / lookups) if lookups else None,
+            }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+embedding_cache = EmbeddingCache(
+    max_entries=_env_int("EMBEDDING_CACHE_SIZE", 2048),
+    disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+)
+
+
+__all__ = ["EmbeddingCache", "cache_key", "embedding_cache", "normalize_text"]
@@ -0,0 +1,334 @@
+"""
+memory_index.py
+---------------
+In-process nearest-neighbour search over `config_samples`, an optional
+replacement for the pgvector query in `embedded_client`.
+
+All embeddings live in one contiguous (n, 768) float32 matrix; a query is one
+matrix-vector product plus `np.argpartition` for the top k. Stored and query
+vectors are unit-length (see embedded_server.py), so the dot product ranks the
+same as cosine, inner-product and L2 distance, and the search is exact. For a
+library of a few thousand samples that is well under a millisecond, cheaper
+than the PostgreSQL round trip it replaces.
+
+The index loads on the first query (or at startup, see backend/main.py) and is
+kept current by `create_config_sample` / `delete_config_sample`. While another
+thread is loading it, or after a failed load (until `load()` is called again),
+`search` returns None and the caller uses pgvector. Each process
+holds its own copy: with several workers, an API change only reaches the other
+workers when they restart.
+
+With RAG_MEMORY_INDEX_PATH set, the matrix is saved as `.npy` (sample ids in
+`*.ids.npy` next to it) and memory-mapped on the next start; only rows added or
+removed in the meantime are read from the database. A changed embedding under
+an existing sample_id is not detected, so seed_data.py deletes the snapshot.
+
+Environment:
+    RAG_BACKEND             pgvector (default) | memory
+    RAG_MEMORY_INDEX_PATH   .npy snapshot of the matrix (default: not persisted)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+DIM = 768
+ROW_FIELDS = ("sample_id", "category", "intent_text", "config_json", "extra_metadata")
+
+
+def memory_backend_enabled() -> bool:
+    return os.getenv("RAG_BACKEND", "pgvector").strip().lower() == "memory"
+
+
+def _ids_path(path: Path) -> Path:
+    return path.with_name(path.stem + ".ids.npy")
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    # Write-then-rename: a running process may still have the old file mapped.
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as handle:
+        np.save(handle, array)
+    os.replace(tmp, path)
+
+
+class MemoryIndex:
+    """
+    Thread-safe: searches read an immutable (matrix, ids, rows) view and never
+    lock; mutations build the next view under a lock and publish it in one
+    assignment. Appends fill spare capacity, so a search never copies.
+    """
+
+    def __init__(self, *, path: str | Path | None = None, dim: int = DIM) -> None:
+        self.path = Path(path) if path else None
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._buffer = np.empty((0, dim), dtype=np.float32)
+        self._id_buffer = np.empty(0, dtype=np.int64)
+        self._view: Tuple[np.ndarray, np.ndarray, Dict[int, Dict[str, Any]]] = (
+            self._buffer,
+            self._id_buffer,
+            {},
+        )
+        self._loaded = False
+        self._dirty = False
+        self.loaded_from: str | None = None
+        self.load_seconds: float | None = None
+        self.load_error: str | None = None
+        self.searches = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Current (n, dim) embeddings, row-aligned with the sample ids; do not modify."""
+        return self._view[0]
+
+    def __len__(self) -> int:
+        return len(self._view[1])
+
+    # ----- building -----
+
+    def replace(self, ids: Sequence[int] | np.ndarray, matrix: np.ndarray, rows: Mapping[int, Mapping[str, Any]]) -> None:
+        """Swap in a whole library; `matrix[i]` is the unit-length embedding of `ids[i]`."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if matrix.ndim != 2 or matrix.shape != (len(ids), self.dim):
+            raise ValueError(f"expected a ({len(ids)}, {self.dim}) matrix, got {matrix.shape}")
+        if matrix.dtype != np.float32:
+            matrix = matrix.astype(np.float32)
+        with self._lock:
+            self._publish(matrix, ids, {int(k): dict(v) for k, v in rows.items()})
+            self._loaded = True
+
+    def _publish(self, matrix: np.ndarray, ids: np.ndarray, rows: Dict[int, Dict[str, Any]]) -> None:
+        self._buffer, self._id_buffer = matrix, ids
+        self._view = (matrix, ids, rows)
+
+    def _read_snapshot(self) -> Tuple[np.ndarray, np.ndarray] | None:
+        if self.path is None or not self.path.exists() or not _ids_path(self.path).exists():
+            return None
+        try:
+            matrix = np.load(self.path, mmap_mode="r")
+            ids = np.load(_ids_path(self.path))
+        except (OSError, ValueError) as exc:
+            print(f"Ignoring RAG index snapshot {self.path}: {exc}")
+            return None
+        if matrix.dtype != np.float32 or matrix.ndim != 2 or matrix.shape != (len(ids), self.dim):
+            print(f"Ignoring RAG index snapshot {self.path}: shape {matrix.shape} does not match {len(ids)} ids")
+            return None
+        return matrix, ids.astype(np.int64, copy=False)
+
+    def load(self) -> Dict[str, Any]:
+        """
+        (Re)build from config_samples, starting from the .npy snapshot when there
+        is one. A failure is remembered (`load_error`) and re-raised; searches
+        then fall back without retrying until the next explicit `load()`.
+        """
+        try:
+            stats = self._load()
+        except Exception as exc:
+            self.load_error = f"{type(exc).__name__}: {exc}"
+            print(f"RAG memory index load failed, using pgvector until it is reloaded: {self.load_error}")
+            raise
+        self.load_error = None
+        return stats
+
+    def _load(self) -> Dict[str, Any]:
+        from sqlalchemy import select
+
+        from database import SessionLocal
+        from database.models import ConfigSample
+
+        with self._lock:
+            t0 = time.perf_counter()
+            session = SessionLocal()
+            try:
+                has_embedding = ConfigSample.embedding.isnot(None)
+                meta = session.execute(
+                    select(*(getattr(ConfigSample, f) for f in ROW_FIELDS)).where(has_embedding)
+                ).mappings().all()
+                rows = {int(r["sample_id"]): dict(r) for r in meta}
+
+                snapshot = self._read_snapshot()
+                if snapshot is not None:
+                    matrix, ids = snapshot
+                    keep = np.isin(ids, np.fromiter(rows, dtype=np.int64, count=len(rows)))
+                    if not keep.all():
+                        matrix, ids = matrix[keep], ids[keep]
+                    missing = sorted(set(rows) - set(ids.tolist()))
+                    changed = bool(missing) or not keep.all()
+                    source = "snapshot"
+                else:
+                    matrix, ids = np.empty((0, self.dim), dtype=np.float32), np.empty(0, dtype=np.int64)
+                    missing = sorted(rows)
+                    changed = True
+                    source = "database"
+
+                if missing:
+                    # Vectors come back as float32 arrays over pgvector's binary format (models.Vector).
+                    query = select(ConfigSample.sample_id, ConfigSample.embedding).where(has_embedding)
+                    if snapshot is not None:
+                        query = query.where(ConfigSample.sample_id.in_(missing))
+                    fetched = session.execute(query).all()
+                    if fetched:
+                        matrix = np.concatenate([matrix, np.stack([vec for _, vec in fetched])])
+                        ids = np.concatenate([ids, np.array([sid for sid, _ in fetched], dtype=np.int64)])
+            finally:
+                session.close()
+
+            self._publish(matrix, ids, rows)
+            self._loaded = True
+            self._dirty = changed
+            self.loaded_from = source
+            self.load_seconds = time.perf_counter() - t0
+        if changed:
+            self.save()
+        return self.stats()
+
+    def ensure_loaded(self, *, wait: bool = True) -> bool:
+        """
+        Load once; True when the index is usable. Does not retry after a failed
+        load, and with `wait=False` returns False instead of blocking while
+        another thread is loading.
+        """
+        if self._loaded:
+            return True
+        if self.load_error is not None or not self._load_lock.acquire(blocking=wait):
+            return False
+        try:
+            if not self._loaded and self.load_error is None:
+                try:
+                    self.load()
+                except Exception:
+                    return False
+            return self._loaded
+        finally:
+            self._load_lock.release()
+
+    # ----- incremental updates -----
+
+    def upsert(self, row: Mapping[str, Any], vector: Sequence[float] | np.ndarray) -> None:
+        """Add or replace one sample. A no-op until the index is loaded (the load reads the table)."""
+        vec = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        sample_id = int(row["sample_id"])
+        with self._lock:
+            if not self._loaded:
+                return
+            matrix, ids, rows = self._view
+            rows = dict(rows)
+            rows[sample_id] = {f: row.get(f) for f in ROW_FIELDS}
+            (pos,) = np.nonzero(ids == sample_id)
+            if len(pos):
+                matrix = matrix.copy()  # live searches may hold the old view
+                matrix[pos[0]] = vec
+                self._publish(matrix, ids, rows)
+            else:
+                n = len(ids)
+                buffer, id_buffer = self._buffer, self._id_buffer
+                if n >= len(buffer) or not buffer.flags.writeable:
+                    capacity = max(64, 2 * n)
+                    buffer = np.empty((capacity, self.dim), dtype=np.float32)
+                    buffer[:n] = matrix
+                    id_buffer = np.empty(capacity, dtype=np.int64)
+                    id_buffer[:n] = ids
+                # Row n is beyond every published view, so writing it is invisible until publish.
+                buffer[n] = vec
+                id_buffer[n] = sample_id
+                self._buffer, self._id_buffer = buffer, id_buffer
+                self._view = (buffer[: n + 1], id_buffer[: n + 1], rows)
+            self._dirty = True
+
+    def remove(self, sample_id: int) -> bool:
+        with self._lock:
+            matrix, ids, rows = self._view
+            (pos,) = np.nonzero(ids == int(sample_id))
+            if not len(pos):
+                return False
+            rows = dict(rows)
+            rows.pop(int(sample_id), None)
+            self._publish(np.delete(matrix, pos, axis=0), np.delete(ids, pos), rows)
+            self._dirty = True
+            return True
+
+    # ----- persistence -----
+
+    def save(self) -> bool:
+        if self.path is None:
+            return False
+        with self._lock:
+            matrix, ids, _ = self._view
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                _save_array(self.path, np.ascontiguousarray(matrix))
+                _save_array(_ids_path(self.path), ids)
+            except OSError as exc:
+                print(f"Could not save RAG index snapshot to {self.path}: {exc}")
+                return False
+            self._dirty = False
+            return True
+
+    def save_if_dirty(self) -> bool:
+        return self._dirty and self.save()
+
+    # ----- querying -----
+
+    def search(self, query_vec: Sequence[float] | np.ndarray, top_k: int) -> List[Dict[str, Any]] | None:
+        """
+        The `top_k` nearest samples, best first, as dicts of ROW_FIELDS; None
+        while the index is unavailable (being loaded elsewhere, or failed).
+        """
+        if not self.ensure_loaded(wait=False):
+            return None
+        matrix, ids, rows = self._view
+        n = len(ids)
+        k = min(int(top_k), n)
+        self.searches += 1
+        if k <= 0:
+            return []
+        scores = matrix @ np.asarray(query_vec, dtype=np.float32)
+        top = np.argpartition(scores, n - k)[n - k :] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [dict(rows[int(ids[i])]) for i in top]
+
+    def stats(self) -> Dict[str, Any]:
+        matrix = self.matrix
+        return {
+            "loaded": self._loaded,
+            "rows": len(self),
+            "bytes": int(matrix.nbytes),
+            "memory_mapped": isinstance(matrix, np.memmap),
+            "path": str(self.path) if self.path else None,
+            "loaded_from": self.loaded_from,
+            "load_seconds": self.load_seconds,
+            "load_error": self.load_error,
+            "searches": self.searches,
+            "unsaved_changes": self._dirty,
+        }
+
+
+def discard_snapshot(path: str | Path | None = None) -> bool:
+    """Delete the .npy snapshot so the next load re-reads every embedding."""
+    path = path or os.getenv("RAG_MEMORY_INDEX_PATH")
+    if not path:
+        return False
+    removed = False
+    for target in (Path(path), _ids_path(Path(path))):
+        if target.exists():
+            target.unlink()
+            removed = True
+    return removed
+
+
+memory_index = MemoryIndex(path=os.getenv("RAG_MEMORY_INDEX_PATH") or None)
+
+
+__all__ = ["MemoryIndex", "discard_snapshot", "memory_backend_enabled", "memory_index"]
@@ -0,0 +1,178 @@
+"""
+vector_index.py
+---------------
+pgvector ANN index on `config_samples.embedding` and the per-query knobs that
+trade recall for latency.
+
+Without an index `ORDER BY embedding <=> :q LIMIT k` is an exact sequential
+scan over every 768-d vector. `ensure_vector_index` (called by init_db.py and
+create_missing_tables.py) builds an HNSW index by default, or IVFFlat, with the
+operator class of the configured metric; `get_similar_samples` orders by the
+matching operator, otherwise Postgres silently ignores the index.
+
+Embeddings are stored unit-length (see embedded_server.py), so all three
+metrics rank identically; `ip` is the cheapest to compute.
+
+Environment:
+    RAG_DISTANCE_METRIC       cosine (default, `<=>`) | ip (`<#>`) | l2 (`<->`)
+    RAG_INDEX_TYPE            hnsw (default) | ivfflat | none
+    RAG_HNSW_M                graph degree at build time (default 16)
+    RAG_HNSW_EF_CONSTRUCTION  build-time candidate list (default 64)
+    RAG_HNSW_EF_SEARCH        query-time candidate list (default 40; must be >= top_k)
+    RAG_IVFFLAT_LISTS         number of lists (default: rows / 1000, at least 1)
+    RAG_IVFFLAT_PROBES        lists scanned per query (default 10)
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TABLE = "config_samples"
+COLUMN = "embedding"
+
+# metric -> (ORDER BY operator, index operator class); the two must agree.
+METRICS = {
+    "cosine": ("<=>", "vector_cosine_ops"),
+    "ip": ("<#>", "vector_ip_ops"),
+    "l2": ("<->", "vector_l2_ops"),
+}
+INDEX_TYPES = ("hnsw", "ivfflat")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def distance_metric() -> str:
+    value = os.getenv("RAG_DISTANCE_METRIC", "cosine").strip().lower()
+    return value if value in METRICS else "cosine"
+
+
+def distance_operator() -> str:
+    return METRICS[distance_metric()][0]
+
+
+def opclass() -> str:
+    return METRICS[distance_metric()][1]
+
+
+def index_name(kind: str, metric: str) -> str:
+    return f"{TABLE}_{COLUMN}_{kind}_{metric}_idx"
+
+
+def index_type() -> str:
+    value = os.getenv("RAG_INDEX_TYPE", "hnsw").strip().lower()
+    return value if value in ("hnsw", "ivfflat", "none") else "hnsw"
+
+
+def default_ef_search() -> int:
+    return _env_int("RAG_HNSW_EF_SEARCH", 40)
+
+
+def default_probes() -> int:
+    return _env_int("RAG_IVFFLAT_PROBES", 10)
+
+
+def _ivfflat_lists(conn: Connection) -> int:
+    configured = os.getenv("RAG_IVFFLAT_LISTS")
+    if configured:
+        return _env_int("RAG_IVFFLAT_LISTS", 1)
+    # pgvector guidance: rows / 1000 up to 1M rows. Lists are fixed at build time,
+    # so rebuild (drop the index, rerun create_missing_tables) after a big import.
+    rows = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar() or 0
+    return max(1, rows // 1000)
+
+
+def _index_ddl(kind: str, conn: Connection) -> str:
+    name = index_name(kind, distance_metric())
+    if kind == "hnsw":
+        params = f"m = {_env_int('RAG_HNSW_M', 16)}, ef_construction = {_env_int('RAG_HNSW_EF_CONSTRUCTION', 64)}"
+    else:
+        params = f"lists = {_ivfflat_lists(conn)}"
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {TABLE} USING {kind} ({COLUMN} {opclass()}) WITH ({params})"
+
+
+def normalize_stored_embeddings(conn: Connection, *, batch_size: int = 500) -> int:
+    """
+    Rescale stored vectors that are not unit-length (rows written before
+    embeddings were normalised). Returns the number of rows updated.
+    """
+    import numpy as np
+
+    rows = conn.execute(
+        text(
+            f"SELECT sample_id, {COLUMN}::text FROM {TABLE} "
+            f"WHERE {COLUMN} IS NOT NULL AND abs(vector_norm({COLUMN}) - 1) > 1e-3"
+        )
+    ).all()
+    updates = []
+    for sample_id, raw in rows:
+        vec = np.array([float(x) for x in raw.strip("[]").split(",")], dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            updates.append({"id": sample_id, "v": str((vec / norm).tolist())})
+    update_sql = text(f"UPDATE {TABLE} SET {COLUMN} = CAST(:v AS vector) WHERE sample_id = :id")
+    for start in range(0, len(updates), batch_size):
+        conn.execute(update_sql, updates[start : start + batch_size])
+    return len(updates)
+
+
+def ensure_vector_index(conn: Connection) -> str | None:
+    """
+    Create the ANN index for the configured type and metric if it is missing and
+    drop any index built for another type/metric. Returns the index name in use
+    (None for RAG_INDEX_TYPE=none).
+    """
+    kind = index_type()
+    wanted = index_name(kind, distance_metric()) if kind != "none" else None
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    for other_kind in INDEX_TYPES:
+        for metric in METRICS:
+            name = index_name(other_kind, metric)
+            if name != wanted:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    # Metric-less names used before RAG_DISTANCE_METRIC existed.
+    for other_kind in INDEX_TYPES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {TABLE}_{COLUMN}_{other_kind}_idx"))
+    if wanted is None:
+        return None
+    conn.execute(text(_index_ddl(kind, conn)))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+    return wanted
+
+
+def apply_search_settings(conn: Any, *, ef_search: int | None = None, probes: int | None = None) -> Dict[str, int]:
+    """
+    Set the ANN knobs for the current transaction only (`set_config(..., true)`
+    is SET LOCAL that accepts bind parameters). Both are harmless when the other
+    index type, or no index, is in use.
+    """
+    settings = {
+        "hnsw.ef_search": ef_search if ef_search is not None else default_ef_search(),
+        "ivfflat.probes": probes if probes is not None else default_probes(),
+    }
+    for name, value in settings.items():
+        conn.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": str(int(value))})
+    return settings
+
+
+__all__ = [
+    "METRICS",
+    "apply_search_settings",
+    "default_ef_search",
+    "default_probes",
+    "distance_metric",
+    "distance_operator",
+    "ensure_vector_index",
+    "index_name",
+    "index_type",
+    "normalize_stored_embeddings",
+    "opclass",
+]
@@ -7,6 +7,10 @@ upsert rows based on each table's primary key.
 
 Usage:
     python3 database/seed_data.py
+    python3 database/seed_data.py --samples-only --samples big_library.jsonl --batch-size 128
+
+Config samples are streamed (JSON array or JSONL), embedded in batches and
+written with batched INSERT ... ON CONFLICT; see `rag/bulk_ingest.py`.
 
 Requirements:
     - .env configured with DB_USER/DB_PASS/DB_HOST/DB_PORT/DB_NAME
@@ -15,9 +19,12 @@ Requirements:
 
 from __future__ import annotations
 
-from rag.embedded_server import embed_text
+from rag.bulk_ingest import ingest_config_samples, iter_samples
+from rag.memory_index import discard_snapshot
 
+import argparse
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -25,7 +32,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
-from models import ConfigSample, Device, User
+from models import Device, User
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -99,35 +106,46 @@ def seed_devices(session: Session) -> None:
     print(f"✅ Seeded {len(rows)} device row(s).")
 
 
-def seed_config_samples(session: Session) -> None:
-    rows = _load_json("config_samples.json")
-    if not rows:
-        print("ℹ️  No config sample rows to insert.")
+def seed_config_samples(session: Session, path: Path | None = None, *, batch_size: int = 64) -> None:
+    path = path or DATA_DIR / "config_samples.json"
+    if not path.exists():
+        print(f"⚠️  Skipping config samples: file not found at {path}")
         return
 
-    for row in rows:
-        sample_id_raw = row.get("sample_id")
-        sample_id = int(sample_id_raw) if sample_id_raw is not None else None
-        payload = {
-            "sample_id": sample_id,
-            "category": row.get("category"),
-            "intent_text": row.get("intent_text"),
-            "config_json": row.get("config_json"),
-            "extra_metadata": row.get("extra_metadata"),
-            "embedding": embed_text(row.get("intent_text")),  # Populate later once an embedding pipeline is ready.
-        }
-        session.merge(ConfigSample(**payload))
+    stats = ingest_config_samples(session, iter_samples(path), batch_size=batch_size, progress=True)
     session.commit()
-    print(f"✅ Seeded {len(rows)} config sample row(s).")
+    # Upserts may re-embed existing sample_ids, which the RAG_BACKEND=memory snapshot cannot detect.
+    if stats["rows"] and discard_snapshot():
+        print("ℹ️  Removed the RAG memory index snapshot; the backend rebuilds it on next start.")
+    if not stats["rows"]:
+        print("ℹ️  No config sample rows to insert.")
+        return
+    print(
+        f"✅ Seeded {int(stats['rows'])} config sample row(s) in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:.1f} rows/s; embedding {stats['embedding_seconds']:.2f}s, "
+        f"writes {stats['write_seconds']:.2f}s)."
+    )
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database from JSON fixtures")
+    parser.add_argument("--samples", type=Path, default=None, help="config samples file (.json array or .jsonl)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.getenv("SEED_BATCH_SIZE", "64")),
+        help="rows embedded and written per batch",
+    )
+    parser.add_argument("--samples-only", action="store_true", help="skip users and devices")
+    args = parser.parse_args()
+
     session: Optional[Session] = None
     try:
         session = SessionLocal()
-        seed_users(session)
-        seed_devices(session)
-        seed_config_samples(session)
+        if not args.samples_only:
+            seed_users(session)
+            seed_devices(session)
+        seed_config_samples(session, args.samples, batch_size=args.batch_size)
     finally:
         if session is not None:
             session.close()
@@ -0,0 +1,183 @@
+"""
+load_test_chat.py
+-----------------
+Fire concurrent chat requests at a running backend and report throughput and
+latency percentiles.
+
+To compare the blocking and async chat pipelines, start the backend once with
+`CHAT_ASYNC_PIPELINE=0` (before) and once with the default (after), and run the
+same command against both. Turn the reply caches off (`LLM_RESPONSE_CACHE=0`
+also disables the semantic tier) and the template fast path (`CHAT_FAST_PATH=0`),
+or requests are answered without an LLM call and the run measures those instead
+of the pipeline:
+
+    export LLM_RESPONSE_CACHE=0 CHAT_FAST_PATH=0
+    uv run uvicorn backend.main:app --port 8000                        # after
+    CHAT_ASYNC_PIPELINE=0 uv run uvicorn backend.main:app --port 8000  # before
+
+    uv run python -m evaluation.load_test_chat --username henry --password ... \
+        --concurrency 8 --requests 128
+
+Each virtual user gets its own conversation so history length stays constant.
+Requests rotate through varied prompts (different hosts, actions and wording);
+`--prompt` pins one instead. The summary counts replies the server answered
+without the LLM (cache or fast path), which should be 0 for a pipeline run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from statistics import mean, median
+from typing import Any, Dict, List
+
+import httpx
+
+PROMPT_TEMPLATES = (
+    "Allow h{a} to talk to h{b} with high priority.",
+    "Block all traffic from h{a} to h{b}.",
+    "Can you connect h{a} and h{b}, and give it priority {p}?",
+    "Route h{a} to h{b} through s{s} only.",
+    "Limit bandwidth between h{a} and h{b} to {p} Mbps.",
+    "Set up a bidirectional path between h{a} and h{b} avoiding s{s}.",
+    "Drop ICMP from h{a} to h{b} but keep TCP working.",
+    "Make sure h{a} reaches h{b} with priority {p}.",
+)
+
+
+_HOST_PAIRS = [(a, b) for a in range(1, 9) for b in range(1, 9) if a != b]
+
+
+def prompt_for(i: int) -> str:
+    """Request `i`'s prompt; the sequence only repeats after len(templates) * 56 requests."""
+    template = PROMPT_TEMPLATES[i % len(PROMPT_TEMPLATES)]
+    a, b = _HOST_PAIRS[(i // len(PROMPT_TEMPLATES)) % len(_HOST_PAIRS)]
+    return template.format(a=a, b=b, p=100 + i % 400, s=1 + i % 4)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    res = await client.post("/auth/login", json={"username_or_email": username, "password": password})
+    res.raise_for_status()
+    return res.json()["access_token"]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        token = args.token or await _login(client, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        convo_ids: List[int] = []
+        if args.endpoint == "messages":
+            for _ in range(args.concurrency):
+                res = await client.post("/chat/conversations", json={"title": "load test"}, headers=headers)
+                res.raise_for_status()
+                convo_ids.append(res.json()["conversation_id"])
+
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(i)
+
+        latencies: List[float] = []
+        server_llm: List[float] = []
+        short_circuited: Dict[str, int] = {"response_cache_hit": 0, "semantic_cache_hit": 0, "fast_path_hit": 0}
+        errors: List[str] = []
+
+        async def user(worker_id: int) -> None:
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                prompt = args.prompt or prompt_for(i)
+                body: Dict[str, Any] = {"model": args.model, "use_rag": not args.no_rag}
+                if args.endpoint == "messages":
+                    url = f"/chat/conversations/{convo_ids[worker_id]}/messages"
+                    body["content"] = prompt
+                else:
+                    url = "/generate"
+                    body["prompt"] = prompt
+                t0 = time.perf_counter()
+                try:
+                    res = await client.post(url, json=body, headers=headers)
+                    elapsed = time.perf_counter() - t0
+                    data = res.json()
+                    if res.status_code != 200 or data.get("status") == "error":
+                        errors.append(str(data.get("detail") or data.get("message") or res.status_code))
+                        continue
+                    latencies.append(elapsed)
+                    timings = data.get("timings") or {}
+                    llm = timings.get("llm_seconds")
+                    if isinstance(llm, (int, float)):
+                        server_llm.append(llm)
+                    for field in short_circuited:
+                        if timings.get(field):
+                            short_circuited[field] += 1
+                except Exception as exc:
+                    errors.append(str(exc))
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(args.concurrency)))
+        wall = time.perf_counter() - t_start
+
+    return {
+        "wall": wall,
+        "ok": len(latencies),
+        "errors": errors,
+        "latencies": latencies,
+        "server_llm": server_llm,
+        "short_circuited": short_circuited,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent chat load test")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="Bearer token (skips login)")
+    parser.add_argument("--endpoint", choices=("messages", "generate"), default="messages")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--prompt", help="send this prompt every time instead of rotating varied prompts")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--no-rag", action="store_true")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    if not args.token and not (args.username and args.password):
+        parser.error("pass --token or --username/--password")
+
+    result = asyncio.run(run(args))
+    latencies = result["latencies"]
+
+    print("\nSummary")
+    print("-" * 40)
+    print(f"Concurrency      : {args.concurrency}")
+    print(f"Requests ok/err  : {result['ok']}/{len(result['errors'])}")
+    print(f"Wall time        : {result['wall']:.2f} s")
+    print(f"Throughput       : {result['ok'] / result['wall']:.2f} req/s")
+    if latencies:
+        print(f"Latency mean     : {mean(latencies):.3f} s")
+        print(f"Latency p50      : {median(latencies):.3f} s")
+        print(f"Latency p95      : {_percentile(latencies, 95):.3f} s")
+    if result["server_llm"]:
+        print(f"Server llm mean  : {mean(result['server_llm']):.3f} s")
+    skipped = ", ".join(f"{k}={v}" for k, v in result["short_circuited"].items() if v)
+    print(f"Answered w/o LLM : {skipped or 0}")
+    if skipped:
+        print("warning: start the backend with LLM_RESPONSE_CACHE=0 CHAT_FAST_PATH=0 to measure the pipeline")
+    for err in result["errors"][:5]:
+        print(f"error: {err}")
+
+
+if __name__ == "__main__":
+    main()
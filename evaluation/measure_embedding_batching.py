@@ -0,0 +1,81 @@
+"""
+measure_embedding_batching.py
+-----------------------------
+Throughput/latency of query embeddings under concurrent callers, one
+`model.encode` per text vs the micro-batching dispatcher.
+
+Run from repo root (no DB or ONOS needed, only the embedding model):
+
+    uv run python -m evaluation.measure_embedding_batching --concurrency 16 --requests 256
+
+The embedding cache is bypassed (every text is unique) so only the encode path
+is measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from database.rag import embedded_server
+from database.rag.embedding_batcher import make_batcher
+
+
+def _texts(n: int) -> List[str]:
+    # Unique suffix so neither the LRU nor in-batch dedup can help.
+    return [f"Allow h{i % 8 + 1} to reach h{(i + 3) % 8 + 1} with priority {100 + i} ({uuid.uuid4().hex[:6]})" for i in range(n)]
+
+
+def _run(label: str, embed: Callable[[str], List[float]], texts: List[str], concurrency: int) -> None:
+    latencies: List[float] = []
+
+    def one(text: str) -> None:
+        t0 = time.perf_counter()
+        embed(text)
+        latencies.append(time.perf_counter() - t0)
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, texts))
+    wall = time.perf_counter() - t_start
+
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(round(0.95 * len(ordered))) - 1)]
+    print(
+        f"{label:<12} {len(texts) / wall:8.1f} texts/s   "
+        f"p50 {1000 * statistics.median(ordered):7.1f} ms   p95 {1000 * p95:7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-call vs micro-batched embedding")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=256)
+    args = parser.parse_args()
+
+    model = embedded_server.get_model()
+    embedded_server.warmup()
+
+    def single(text: str) -> List[float]:
+        return model.encode(text, convert_to_numpy=True).tolist()
+
+    batcher = make_batcher(lambda texts: model.encode(texts, convert_to_numpy=True, batch_size=len(texts)).tolist())
+
+    def batched(text: str) -> List[float]:
+        return batcher.submit(text).result()
+
+    print(f"model={embedded_server.model_name()} concurrency={args.concurrency} requests={args.requests}")
+    # Single caller first: the batching window should cost only a few ms here.
+    _run("single x1", single, _texts(min(32, args.requests)), 1)
+    _run("batched x1", batched, _texts(min(32, args.requests)), 1)
+    _run("single", single, _texts(args.requests), args.concurrency)
+    _run("batched", batched, _texts(args.requests), args.concurrency)
+    print(f"batcher: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
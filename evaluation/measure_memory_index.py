@@ -0,0 +1,121 @@
+"""
+measure_memory_index.py
+-----------------------
+Per-query latency of the in-process RAG index (RAG_BACKEND=memory) against the
+pgvector query, and how often both return the same top-k.
+
+Run from repo root against the config sample library:
+
+    uv run python -m evaluation.measure_memory_index --queries 50 --top-k 3
+
+Or on a synthetic in-memory library (no DB needed), which also times saving
+the `.npy` snapshot and memory-mapping it back:
+
+    uv run python -m evaluation.measure_memory_index --synthetic 50000 --top-k 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+from database.rag.memory_index import DIM, MemoryIndex
+
+
+def _p(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(round(q * len(ordered))) - 1)]
+
+
+def _noisy(vectors: np.ndarray, n: int, seed: int) -> np.ndarray:
+    # Stored vectors plus a little noise, so queries look like real near-duplicates.
+    rng = np.random.default_rng(seed)
+    picks = vectors[rng.integers(0, len(vectors), n)]
+    picks = picks + rng.normal(0, 0.05 / np.sqrt(DIM), picks.shape).astype(np.float32)
+    return picks / np.linalg.norm(picks, axis=1, keepdims=True)
+
+
+def _time(search: Callable[[np.ndarray], List[int]], queries: np.ndarray) -> tuple[List[List[int]], List[float]]:
+    results: List[List[int]] = []
+    lat: List[float] = []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(search(q))
+        lat.append(time.perf_counter() - t0)
+    return results, lat
+
+
+def _report(label: str, lat: Sequence[float]) -> None:
+    print(f"{label:<22} p50 {1000 * statistics.median(lat):8.3f} ms   p95 {1000 * _p(lat, 0.95):8.3f} ms")
+
+
+def _synthetic(rows: int, queries: int, top_k: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((rows, DIM)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    ids = np.arange(1, rows + 1)
+    meta = {int(i): {"sample_id": int(i)} for i in ids}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = MemoryIndex(path=Path(tmp) / "bench.npy")
+        index.replace(ids, matrix, meta)
+        t0 = time.perf_counter()
+        index.save()
+        saved = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        mapped = np.load(index.path, mmap_mode="r")
+        reopened = MemoryIndex()
+        reopened.replace(np.load(Path(tmp) / "bench.ids.npy"), mapped, meta)
+        opened = time.perf_counter() - t0
+
+        print(f"rows={rows} dim={DIM} matrix={matrix.nbytes / 1e6:.1f} MB top_k={top_k}")
+        print(f"snapshot save {1000 * saved:.1f} ms, memory-mapped open {1000 * opened:.1f} ms")
+        qs = _noisy(matrix, queries, seed + 1)
+        _, lat = _time(lambda q: [r["sample_id"] for r in index.search(q, top_k)], qs)
+        _report("memory (in RAM)", lat)
+        _, lat = _time(lambda q: [r["sample_id"] for r in reopened.search(q, top_k)], qs)
+        _report("memory (memory-mapped)", lat)
+
+
+def _library(queries: int, top_k: int, seed: int) -> None:
+    from database.rag.embedded_client import _query_pgvector
+
+    index = MemoryIndex()
+    stats = index.load()
+    if not stats["rows"]:
+        print("No embeddings in config_samples; seed the library or use --synthetic.")
+        return
+    print(f"rows={stats['rows']} loaded in {1000 * stats['load_seconds']:.1f} ms top_k={top_k}")
+    matrix = np.asarray(index.matrix)
+    qs = _noisy(matrix, queries, seed)
+
+    mem, mem_lat = _time(lambda q: [r["sample_id"] for r in index.search(q, top_k)], qs)
+    pg, pg_lat = _time(lambda q: [r["sample_id"] for r in _query_pgvector(q.tolist(), top_k)], qs)
+    _report("pgvector", pg_lat)
+    _report("memory", mem_lat)
+    same = sum(a == b for a, b in zip(mem, pg))
+    print(f"identical top-{top_k}: {same}/{len(qs)} (differences are ANN misses or distance ties)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process RAG index vs pgvector")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--synthetic", type=int, default=0, help="rows of random vectors, in memory only")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        _synthetic(args.synthetic, args.queries, args.top_k, args.seed)
+    else:
+        _library(args.queries, args.top_k, args.seed)
+
+
+if __name__ == "__main__":
+    main()
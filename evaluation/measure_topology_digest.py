@@ -0,0 +1,180 @@
+"""
+measure_topology_digest.py
+--------------------------
+Compare the size of the network-state block in the LLM prompt: the raw ONOS
+snapshot (as the chat service and /generate used to send it), the compact
+topology digest, and the digest focused on the nodes a prompt mentions.
+
+Run from repo root against the live controller:
+
+    uv run python -m evaluation.measure_topology_digest
+
+or against a synthetic fabric (no ONOS needed):
+
+    uv run python -m evaluation.measure_topology_digest --synthetic --switches 20 --hosts 80 --flows-per-switch 40
+
+Token counts use the same ~4 chars/token estimate as the chat context budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Dict, List
+
+from backend.services.llm.context_selector import select_context
+from backend.services.llm.topology_digest import build_topology_digest
+
+
+def _tokens(text: str) -> int:
+    return max(1, int(len(text) / 4))
+
+
+def synthetic_snapshot(switches: int, hosts: int, flows_per_switch: int) -> Dict[str, Any]:
+    devices: List[Dict[str, Any]] = []
+    for i in range(1, switches + 1):
+        devices.append(
+            {
+                "id": f"of:{i:016x}",
+                "type": "SWITCH",
+                "available": True,
+                "role": "MASTER",
+                "mfr": "Nicira, Inc.",
+                "hw": "Open vSwitch",
+                "sw": "2.17.9",
+                "serial": "None",
+                "driver": "ovs",
+                "chassisId": f"{i:x}",
+                "lastUpdate": "1734000000000",
+                "humanReadableLastUpdate": "connected 2h ago",
+                "annotations": {"channelId": f"127.0.0.1:{40000 + i}", "managementAddress": "127.0.0.1", "protocol": "OF_14"},
+                "friendly_name": f"s{i}",
+            }
+        )
+
+    links: List[Dict[str, Any]] = []
+    for i in range(1, switches):
+        a, b = f"of:{i:016x}", f"of:{i + 1:016x}"
+        links.append({"src": {"port": "2", "device": a}, "dst": {"port": "3", "device": b}, "type": "DIRECT", "state": "ACTIVE"})
+        links.append({"src": {"port": "3", "device": b}, "dst": {"port": "2", "device": a}, "type": "DIRECT", "state": "ACTIVE"})
+
+    host_rows: List[Dict[str, Any]] = []
+    for j in range(1, hosts + 1):
+        mac = f"00:00:00:00:{j // 256:02X}:{j % 256:02X}"
+        host_rows.append(
+            {
+                "id": f"{mac}/None",
+                "mac": mac,
+                "vlan": "None",
+                "innerVlan": "None",
+                "outerTpid": "unknown",
+                "configured": False,
+                "suspended": False,
+                "ipAddresses": [f"10.0.{j // 256}.{j % 256}"],
+                "locations": [{"elementId": f"of:{(j - 1) % max(1, switches) + 1:016x}", "port": "1"}],
+                "auxLocations": [],
+                "managed_id": f"host:10.0.{j // 256}.{j % 256}",
+                "friendly_name": f"h{j}",
+            }
+        )
+
+    intents = [
+        {
+            "type": "HostToHostIntent",
+            "id": f"0x{k:x}",
+            "key": f"0x{k:x}",
+            "appId": "org.onosproject.cli",
+            "resources": [host_rows[k - 1]["id"], host_rows[k]["id"]],
+            "state": "INSTALLED",
+        }
+        for k in range(1, min(hosts, 10))
+    ]
+
+    flows: List[Dict[str, Any]] = []
+    for d in devices:
+        for k in range(flows_per_switch):
+            core = k % 4 == 0
+            flows.append(
+                {
+                    "id": f"{len(flows) + 1}",
+                    "tableId": 0,
+                    "appId": "org.onosproject.core" if core else "org.onosproject.net.intent",
+                    "groupId": 0,
+                    "priority": 40000 if core else 100,
+                    "timeout": 0,
+                    "isPermanent": True,
+                    "deviceId": d["id"],
+                    "state": "ADDED",
+                    "life": 7200,
+                    "packets": 10 * k,
+                    "bytes": 1000 * k,
+                    "lastSeen": 1734000000000,
+                    "treatment": {"instructions": [{"type": "OUTPUT", "port": "CONTROLLER" if core else str(k % 4 + 1)}], "deferred": []},
+                    "selector": {
+                        "criteria": [{"type": "ETH_TYPE", "ethType": "0x88cc"}]
+                        if core
+                        else [{"type": "ETH_DST", "mac": f"00:00:00:00:00:{k % 256:02X}"}, {"type": "IN_PORT", "port": k % 4 + 1}]
+                    },
+                }
+            )
+
+    return {
+        "devices": {"devices": devices},
+        "links": {"links": links},
+        "hosts": {"hosts": host_rows},
+        "intents": {"intents": intents},
+        "flows": {"flows": flows},
+    }
+
+
+def live_snapshot() -> Dict[str, Any]:
+    from backend.services.llm.grounding import enrich_network_info
+    from backend.services.onos.onos_client import get_network_info
+    from database import SessionLocal
+
+    network_info = get_network_info(fresh=True)
+    db = SessionLocal()
+    try:
+        enrich_network_info(db, network_info)
+    finally:
+        db.close()
+    return network_info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure raw vs digest network context size")
+    parser.add_argument("--synthetic", action="store_true", help="Use a generated fabric instead of ONOS")
+    parser.add_argument("--switches", type=int, default=10)
+    parser.add_argument("--hosts", type=int, default=40)
+    parser.add_argument("--flows-per-switch", type=int, default=30)
+    parser.add_argument("--prompt", default="Allow h1 to talk to h3.", help="User text for the focused digest")
+    parser.add_argument("--show", action="store_true", help="Print the focused digest")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        network_info = synthetic_snapshot(args.switches, args.hosts, args.flows_per_switch)
+    else:
+        network_info = live_snapshot()
+
+    variants = {
+        "raw repr (chat)": f"{network_info}",
+        "raw json indent=2 (/generate)": json.dumps(network_info, indent=2),
+        "digest": build_topology_digest(network_info, include_flows=False),
+        "digest + flows": build_topology_digest(network_info, include_flows=True),
+        "focused digest": build_topology_digest(network_info, focus=select_context(network_info, args.prompt)),
+    }
+    baseline = _tokens(variants["raw repr (chat)"])
+
+    print("\nSummary")
+    print("-" * 64)
+    for label, text in variants.items():
+        tokens = _tokens(text)
+        print(f"{label:<30}: {len(text):>8} chars  ~{tokens:>7} tokens  ({100 * (1 - tokens / baseline):5.1f}% smaller)")
+
+    if args.show:
+        print()
+        print(variants["focused digest"])
+
+
+if __name__ == "__main__":
+    main()
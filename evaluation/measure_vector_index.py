@@ -0,0 +1,145 @@
+"""
+measure_vector_index.py
+-----------------------
+Recall@k vs latency of the pgvector ANN index against exact (sequential scan)
+search, across a sweep of `hnsw.ef_search` or `ivfflat.probes` values.
+
+Run from repo root against the config sample library (uses the index built by
+`database/create_missing_tables.py`):
+
+    uv run python -m evaluation.measure_vector_index --queries 50 --top-k 3
+
+The bundled library is tiny, so for meaningful numbers build a synthetic table
+of random 768-d vectors with its own index (dropped afterwards):
+
+    uv run python -m evaluation.measure_vector_index --synthetic 20000 --index hnsw --sweep 10,20,40,80,160
+    uv run python -m evaluation.measure_vector_index --synthetic 20000 --index ivfflat --sweep 1,5,10,20,50
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from database import SessionLocal, engine
+from database.rag.vector_index import apply_search_settings, distance_metric, distance_operator, opclass
+
+BENCH_TABLE = "vector_index_bench"
+DIM = 768
+
+
+def _build_synthetic(rows: int, kind: str, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(text(f"CREATE TABLE {BENCH_TABLE} (id SERIAL PRIMARY KEY, embedding vector({DIM}))"))
+        for start in range(0, rows, 1000):
+            block = rng.standard_normal((min(1000, rows - start), DIM)).astype(np.float32)
+            block /= np.linalg.norm(block, axis=1, keepdims=True)  # unit length, like stored samples
+            conn.execute(
+                text(f"INSERT INTO {BENCH_TABLE} (embedding) VALUES (CAST(:v AS vector))"),
+                [{"v": str(v.tolist())} for v in block],
+            )
+        params = "m = 16, ef_construction = 64" if kind == "hnsw" else f"lists = {max(1, rows // 1000)}"
+        t0 = time.perf_counter()
+        conn.execute(text(f"CREATE INDEX ON {BENCH_TABLE} USING {kind} (embedding {opclass()}) WITH ({params})"))
+        print(f"built {kind} index over {rows} rows in {time.perf_counter() - t0:.1f}s")
+        conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+
+
+def _query_vectors(session, table: str, id_column: str, n: int, seed: int) -> List[str]:
+    # Stored vectors plus a little noise, so queries look like real near-duplicates.
+    rng = np.random.default_rng(seed)
+    rows = session.execute(
+        text(f"SELECT embedding FROM {table} WHERE embedding IS NOT NULL ORDER BY random() LIMIT :n"), {"n": n}
+    ).scalars().all()
+    out: List[str] = []
+    for raw in rows:
+        vec = np.array([float(x) for x in str(raw).strip("[]").split(",")], dtype=np.float32)
+        vec += rng.normal(0, 0.05 * (float(np.std(vec)) or 1.0), vec.shape).astype(np.float32)
+        vec /= float(np.linalg.norm(vec)) or 1.0
+        out.append(str(vec.tolist()))
+    return out
+
+
+def _search(session, table: str, id_column: str, vec: str, k: int) -> Tuple[List[int], float]:
+    t0 = time.perf_counter()
+    ids = session.execute(
+        text(f"SELECT {id_column} FROM {table} ORDER BY embedding {distance_operator()} CAST(:v AS vector) LIMIT :k"),
+        {"v": vec, "k": k},
+    ).scalars().all()
+    return list(ids), time.perf_counter() - t0
+
+
+def _p(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(round(q * len(ordered))) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recall vs latency of the pgvector ANN index")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--synthetic", type=int, default=0, help="rows of random vectors in a scratch table")
+    parser.add_argument("--index", choices=("hnsw", "ivfflat"), default="hnsw", help="index type (synthetic / sweep knob)")
+    parser.add_argument("--sweep", default="", help="comma-separated ef_search (hnsw) or probes (ivfflat) values")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    table, id_column = "config_samples", "sample_id"
+    if args.synthetic:
+        _build_synthetic(args.synthetic, args.index, args.seed)
+        table, id_column = BENCH_TABLE, "id"
+    sweep = [int(x) for x in args.sweep.split(",") if x.strip()] or (
+        [10, 20, 40, 80, 160] if args.index == "hnsw" else [1, 5, 10, 20, 50]
+    )
+
+    session = SessionLocal()
+    try:
+        queries = _query_vectors(session, table, id_column, args.queries, args.seed)
+        if not queries:
+            print(f"No embeddings in {table}; seed the library or use --synthetic.")
+            return
+
+        exact: List[List[int]] = []
+        exact_lat: List[float] = []
+        for vec in queries:
+            # Force the sequential scan for ground truth (transaction-local).
+            session.execute(text("SET LOCAL enable_indexscan = off"))
+            ids, seconds = _search(session, table, id_column, vec, args.top_k)
+            session.rollback()
+            exact.append(ids)
+            exact_lat.append(seconds)
+
+        print(f"table={table} queries={len(queries)} top_k={args.top_k} index={args.index} metric={distance_metric()}")
+        print(f"{'setting':<18} {'recall@k':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        print(f"{'exact (seq scan)':<18} {1.0:>9.3f} {1000 * statistics.median(exact_lat):>9.2f} {1000 * _p(exact_lat, 0.95):>9.2f}")
+
+        knob = "ef_search" if args.index == "hnsw" else "probes"
+        for value in sweep:
+            recalls: List[float] = []
+            lat: List[float] = []
+            for vec, truth in zip(queries, exact):
+                apply_search_settings(session, **{knob: value})
+                ids, seconds = _search(session, table, id_column, vec, args.top_k)
+                session.rollback()
+                lat.append(seconds)
+                recalls.append(len(set(ids) & set(truth)) / max(1, len(truth)))
+            print(
+                f"{knob + '=' + str(value):<18} {statistics.mean(recalls):>9.3f} "
+                f"{1000 * statistics.median(lat):>9.2f} {1000 * _p(lat, 0.95):>9.2f}"
+            )
+    finally:
+        session.close()
+        if args.synthetic:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ import {
   createConversation,
   listConversations,
   listMessages,
-  sendMessage,
+  sendMessageStream,
   type Conversation,
   type Message as DbMessage,
 } from "../../utils/chatApi";
@@ -115,12 +115,33 @@ const ChatInterface: React.FC = () => {
 
     const start = performance.now();
 
-    try {
-      const res = await sendMessage(convoId, {
-        content: message,
-        model: selectedModel,
-        use_rag: useRag,
+    // Placeholder agent bubble that fills in as tokens stream in.
+    let streamed = "";
+    let started = false;
+    const updateAgentText = (text: string) =>
+      setMessages((prev) => {
+        const next = prev.slice();
+        next[next.length - 1] = { ...next[next.length - 1], text };
+        return next;
       });
+
+    try {
+      const res = await sendMessageStream(
+        convoId,
+        {
+          content: message,
+          model: selectedModel,
+          use_rag: useRag,
+        },
+        (delta) => {
+          if (!started) {
+            started = true;
+            setMessages((prev) => [...prev, { role: "Agent", text: "" }]);
+          }
+          streamed += delta;
+          updateAgentText(streamed);
+        }
+      );
       const latency = performance.now() - start;
 
       setLastLatencyMs(latency);
@@ -131,16 +152,14 @@ const ChatInterface: React.FC = () => {
         else next.unshift(res.conversation);
         return next;
       });
-      setMessages((prev) => [
-        ...prev,
-        {
-          role: "Agent",
-          text: res.assistant_message.content,
-          latencyMs: latency,
-          model: selectedModel,
-          useRag: useRag,
-        },
-      ]);
+      const agentMessage: Message = {
+        role: "Agent",
+        text: res.assistant_message.content,
+        latencyMs: latency,
+        model: selectedModel,
+        useRag: useRag,
+      };
+      setMessages((prev) => (started ? [...prev.slice(0, -1), agentMessage] : [...prev, agentMessage]));
     } catch (err) {
       console.error("Error contacting LLM API:", err);
       const msg = (err as any)?.message || "";
@@ -153,10 +172,8 @@ const ChatInterface: React.FC = () => {
       } else {
         setError(msg || "Unable to contact LLM Agent. Please try again.");
       }
-      setMessages((prev) => [
-        ...prev,
-        { role: "Agent", text: "Error: Unable to contact LLM Agent." },
-      ]);
+      const errorMessage: Message = { role: "Agent", text: "Error: Unable to contact LLM Agent." };
+      setMessages((prev) => (started ? [...prev.slice(0, -1), errorMessage] : [...prev, errorMessage]));
     } finally {
       setIsSubmitting(false);
     }
@@ -76,3 +76,62 @@ export async function sendMessage(conversationId: number, payload: { content: st
   };
 }
 
+
+export type SendMessageResult = {
+  conversation: Conversation;
+  user_message: Message;
+  assistant_message: Message;
+  model?: string | null;
+  use_rag?: boolean | null;
+  timings?: Record<string, number> | null;
+};
+
+// Streams the reply over Server-Sent Events (POST, so EventSource can't be used).
+// `onToken` gets each delta as it arrives; resolves with the persisted messages.
+export async function sendMessageStream(
+  conversationId: number,
+  payload: { content: string; model?: string; use_rag?: boolean },
+  onToken: (delta: string) => void
+): Promise<SendMessageResult> {
+  const res = await fetch(`${API_BASE}/chat/conversations/${conversationId}/messages/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream", ...authHeaders() },
+    body: JSON.stringify({
+      content: payload.content,
+      model: payload.model,
+      use_rag: payload.use_rag ?? true,
+    }),
+  });
+  if (!res.ok || !res.body) throw new Error(await readError(res));
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result: SendMessageResult | null = null;
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) >= 0) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+      const parsed = JSON.parse(data);
+      if (event === "token") onToken(parsed.content ?? "");
+      else if (event === "done") result = parsed as SendMessageResult;
+      else if (event === "error") throw new Error(parsed.detail || "Stream failed");
+    }
+  }
+
+  if (!result) throw new Error("Stream ended before the reply was saved");
+  return result;
+}
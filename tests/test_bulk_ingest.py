@@ -0,0 +1,43 @@
+import io
+import json
+import unittest
+
+from database.rag.bulk_ingest import _iter_json_array
+
+
+def parse(text, chunk_size):
+    return list(_iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def test_every_chunk_boundary(self):
+        values = [123456, -7.25e3, True, False, None, "a, ]b", {"sample_id": 42, "tags": [1, 2]}, [3, [4]], 0]
+        text = json.dumps(values, indent=1)
+        for chunk_size in (1, 2, 3, 5, 7, len(text)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(parse(text, chunk_size), values)
+
+    def test_number_split_at_chunk_end(self):
+        # "[12" | "34]": the first chunk alone decodes as 12.
+        self.assertEqual(parse("[1234]", 3), [1234])
+        self.assertEqual(parse("[true,1e5 ,null]", 4), [True, 1e5, None])
+
+    def test_empty_array(self):
+        self.assertEqual(parse(" [ ] ", 1), [])
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            parse('{"sample_id": 1}', 4)
+
+    def test_truncated_file(self):
+        for text in ("[1, 2", "[123", '[{"a": 1}'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse(text, 2)
+
+    def test_missing_separator(self):
+        with self.assertRaises(ValueError):
+            parse("[1 2]", 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from backend.services.llm.fast_path import compile_host_to_host
+
+MACS = ["CE:52:DD:E0:04:42", "4A:69:B2:E4:1F:44", "46:8D:D5:AE:0A:52"]
+NETWORK = {
+    "hosts": [
+        {"id": f"{mac}/None", "mac": mac, "ipAddresses": [f"10.0.0.{i + 1}"], "friendly_name": f"h{i + 1}"}
+        for i, mac in enumerate(MACS)
+    ]
+}
+
+
+def compile_(text):
+    return compile_host_to_host(text, NETWORK, min_confidence=0.9)
+
+
+class CompileHostToHostTest(unittest.TestCase):
+    def test_connect_request_compiles(self):
+        result = compile_("Make sure h1 can communicate with h2")
+        self.assertTrue(result.hit)
+        self.assertEqual(result.config["one"], f"{MACS[0]}/None")
+        self.assertEqual(result.config["two"], f"{MACS[1]}/None")
+        self.assertEqual(result.config["priority"], 100)
+
+    def test_priority_slot(self):
+        result = compile_("connect h1 and h3 with priority 300")
+        self.assertTrue(result.hit)
+        self.assertEqual(result.config["priority"], 300)
+
+    def test_questions_fall_back(self):
+        for text in (
+            "Is h1 reachable from h2?",
+            "Can h1 talk to h2?",
+            "Does h1 reach h2",
+            "Are h1 and h2 connected",
+            "h1 can reach h2?",
+        ):
+            with self.subTest(text=text):
+                result = compile_(text)
+                self.assertFalse(result.hit)
+                self.assertEqual(result.reason, "question")
+
+    def test_veto_words_fall_back(self):
+        for text in ("block h1 from reaching h2", "h1 should not reach h2", "connect h1 and h2 over tcp"):
+            with self.subTest(text=text):
+                self.assertEqual(compile_(text).reason, "veto")
+
+    def test_unfilled_number_falls_back(self):
+        self.assertEqual(compile_("connect h1 and h2 on 8080").reason, "unfilled_slot")
+
+    def test_needs_two_hosts(self):
+        self.assertEqual(compile_("connect h1 to the internet").reason, "not_two_hosts")
+
+
+if __name__ == "__main__":
+    unittest.main()